@@ -0,0 +1,61 @@
+"""
+Configuração compartilhada do Pytest.
+
+Com o pacote `pytest-xdist` instalado (extra `dev`), os testes rodam em
+paralelo, um processo por CPU, distribuídos um a um entre os processos: os
+testes não compartilham estado além do parser (imutável) e do cache de
+ASTs. Passar `-n` explicitamente (por exemplo `-n 0`) tem precedência.
+
+Testes marcados com `@pytest.mark.hot` executam o programa SimpleLang com o
+rastreamento (sys.settrace, usado por coverage e depuradores) desligado: a
+recursão interpretada fica de fora da medição, o resto do teste não.
+
+O cache de ASTs dos testes (lox/testing_utils.py) fica no diretório de cache
+do pytest, então `pytest --cache-clear` também o limpa.
+
+As fixtures `parser` e `interpreter` ficam disponíveis para todos os testes:
+o parser é criado uma vez por sessão (por processo, com o xdist), e cada
+teste recebe um Interpreter novo.
+"""
+
+import pytest
+
+from lox import testing_utils
+from lox.parser import create_parser
+from lox.runtime import Interpreter
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_cmdline_main(config):
+    # Roda antes do pytest_cmdline_main do xdist, que traduz "auto" para o
+    # número de CPUs e escolhe `--dist=load`; nos processos filhos
+    # (workerinput) nada muda
+    if not config.pluginmanager.hasplugin("xdist") or hasattr(config, "workerinput"):
+        return
+    if config.option.numprocesses is None:
+        config.option.numprocesses = "auto"
+
+
+def pytest_configure(config):
+    # Sem o plugin de cache (-p no:cacheprovider) fica o ~/.cache/lox/tests
+    cache = getattr(config, "cache", None)
+    if cache is not None:
+        testing_utils._AST_CACHE_PATH = cache.mkdir("simplelang_asts")
+
+
+@pytest.fixture(autouse=True)
+def _untraced_when_hot(request, monkeypatch):
+    if request.node.get_closest_marker("hot") is not None:
+        monkeypatch.setattr(testing_utils, "_TRACE_INTERPRETER", False)
+
+
+@pytest.fixture(scope="session")
+def parser():
+    """Parser compartilhado por toda a sessão de testes."""
+    return create_parser()
+
+
+@pytest.fixture
+def interpreter():
+    """Interpreter novo, sem variáveis de testes anteriores."""
+    return Interpreter()
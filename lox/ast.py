@@ -5,16 +5,134 @@ Este módulo converte a árvore de parsing do Lark em uma AST mais estruturada
 usando as classes de nós definidas em node.py.
 """
 
+import operator as op
+from sys import intern
+
 from lark import Tree, Token
 from .node import *
 from .errors import SimpleLangSyntaxError
 
 
+# Marca "não dobrar"; None não serve porque é o valor de `nil`
+_NO_FOLD = object()
+
+
+# Regra de veracidade da SimpleLang (a mesma de `Interpreter._is_truthy`)
+_truthy = bool
+
+
+def _is_number(value):
+    return isinstance(value, (int, float))
+
+
+def _fold_arith(func):
+    """Só dobra aritmética entre números; o resto fica para o runtime."""
+    return lambda left, right: func(left, right) if _is_number(left) and _is_number(right) else _NO_FOLD
+
+
+def _fold_add(left, right):
+    if _is_number(left) and _is_number(right):
+        return left + right
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    return _NO_FOLD
+
+
+def _fold_div(left, right):
+    # Divisão por zero não é dobrada: o erro deve acontecer na execução
+    if not (_is_number(left) and _is_number(right)) or right == 0:
+        return _NO_FOLD
+    return left / right
+
+
+def _fold_mod(left, right):
+    if not (isinstance(left, int) and isinstance(right, int)) or right == 0:
+        return _NO_FOLD
+    return left % right
+
+
+def _fold_compare(func):
+    """Comparações de ordem só entre números ou só entre strings."""
+    def fold(left, right):
+        if (_is_number(left) and _is_number(right)) or (isinstance(left, str) and isinstance(right, str)):
+            return func(left, right)
+        return _NO_FOLD
+    return fold
+
+
+# Operadores binários que podem ser avaliados em tempo de construção da AST
+_FOLD = {
+    '+': _fold_add,
+    '-': _fold_arith(op.sub),
+    '*': _fold_arith(op.mul),
+    '/': _fold_div,
+    '%': _fold_mod,
+    '==': op.eq,
+    '!=': op.ne,
+    '>': _fold_compare(op.gt),
+    '>=': _fold_compare(op.ge),
+    '<': _fold_compare(op.lt),
+    '<=': _fold_compare(op.le),
+    'and': lambda left, right: _truthy(left) and _truthy(right),
+    'or': lambda left, right: _truthy(left) or _truthy(right),
+}
+
+_UNARY_FOLD = {
+    '-': lambda right: -right if _is_number(right) else _NO_FOLD,
+    '!': lambda right: not _truthy(right),
+}
+
+# Literais compartilhados para as constantes mais comuns. Nós da AST não são
+# alterados durante a execução, então um mesmo Literal pode aparecer em
+# vários pontos do programa (perdendo apenas a posição no código fonte).
+_TRUE = Literal(True)
+_FALSE = Literal(False)
+_NIL = Literal(None)
+_SMALL_INTS = {i: Literal(i) for i in range(-1, 33)}
+
+
+def _meta(meta):
+    """
+    Reduz a posição do Lark (Meta ou Token) a uma tupla (linha, coluna, linha final).
+
+    O Meta do Lark é um objeto completo com vários atributos; nos nós da AST
+    basta a posição, guardada numa tupla pequena e fácil de serializar.
+    """
+    return (getattr(meta, 'line', None), getattr(meta, 'column', None), getattr(meta, 'end_line', None))
+
+
+def _literal(value, meta=None):
+    """Retorna um Literal para `value`, reaproveitando os compartilhados."""
+    if value is None:
+        return _NIL
+    if value is True:
+        return _TRUE
+    if value is False:
+        return _FALSE
+    # `type(...) is int` evita confundir True com 1 na busca por chave
+    if type(value) is int:
+        cached = _SMALL_INTS.get(value)
+        if cached is not None:
+            return cached
+    return Literal(value, meta)
+
+
 class ASTBuilder:
     """
     Constrói a AST a partir da árvore de parsing do Lark.
     """
     
+    def __init__(self):
+        """Monta a tabela de despacho regra -> método `_build_*`."""
+        prefix = '_build_'
+        helpers = {'_build_tree', '_build_statement', '_build_expression',
+                   '_build_token', '_build_binary_expression'}
+        self._dispatch = {
+            name[len(prefix):]: getattr(self, name)
+            for name in dir(type(self))
+            if name.startswith(prefix) and name not in helpers
+        }
+    
     def build(self, parse_tree):
         """
         Constrói a AST a partir da árvore de parsing.
@@ -25,228 +143,276 @@ class ASTBuilder:
         Returns:
             list: Lista de statements que compõem o programa
         """
-        if not isinstance(parse_tree, Tree) or parse_tree.data != 'program':
+        if type(parse_tree) is not Tree or parse_tree.data != 'program':
             raise SimpleLangSyntaxError("Árvore de parsing inválida")
         
-        statements = []
-        for child in parse_tree.children:
-            stmt = self._build_statement(child)
-            if stmt:
-                statements.append(stmt)
+        return self._build_tree(parse_tree)
+    
+    def _build_tree(self, root):
+        """
+        Percorre a árvore em pós-ordem com uma pilha explícita.
         
-        return statements
+        Cada `Tree` é visitada duas vezes: na primeira seus filhos são
+        empilhados; na segunda os resultados dos filhos já estão no topo de
+        `results` e são entregues ao método `_build_*` da regra. Tokens são
+        repassados crus para o método do nó pai.
+        """
+        dispatch = self._dispatch
+        # Comparação de identidade do tipo: o Lark não cria subclasses de
+        # Tree, então não é preciso o isinstance (que percorre o MRO)
+        tree_type = Tree
+        stack = [(root, False)]
+        push = stack.append
+        pop = stack.pop
+        results = []
+        
+        while stack:
+            node, expanded = pop()
+            if type(node) is not tree_type:
+                results.append(node)
+            elif expanded:
+                count = len(node.children)
+                children = results[len(results) - count:]
+                del results[len(results) - count:]
+                method = dispatch.get(node.data)
+                if method is None:
+                    raise SimpleLangSyntaxError(f"Regra não implementada: {node.data}")
+                results.append(method(node, children))
+            else:
+                push((node, True))
+                for child in reversed(node.children):
+                    push((child, False))
+        
+        return results[0]
     
     def _build_statement(self, tree):
         """Constrói um statement a partir de um nó da árvore."""
-        if not isinstance(tree, Tree):
+        if type(tree) is not Tree:
             return None
-        
-        method_name = f'_build_{tree.data}'
-        method = getattr(self, method_name, None)
-        if method:
-            return method(tree)
-        else:
-            raise SimpleLangSyntaxError(f"Statement não implementado: {tree.data}")
+        return self._build_tree(tree)
     
     def _build_expression(self, tree):
         """Constrói uma expressão a partir de um nó da árvore."""
-        if isinstance(tree, Token):
+        if type(tree) is Token:
             return self._build_token(tree)
         
-        if not isinstance(tree, Tree):
+        if type(tree) is not Tree:
             return None
-        
-        method_name = f'_build_{tree.data}'
-        method = getattr(self, method_name, None)
-        if method:
-            return method(tree)
-        else:
-            raise SimpleLangSyntaxError(f"Expressão não implementada: {tree.data}")
+        return self._build_tree(tree)
     
     def _build_token(self, token):
         """Constrói um literal a partir de um token."""
         if token.type == 'NUMBER':
             value = float(token.value) if '.' in token.value else int(token.value)
-            return Literal(value, token)
+            return _literal(value, _meta(token))
         elif token.type == 'STRING':
             # Remove as aspas
             value = token.value[1:-1]
-            return Literal(value, token)
+            return Literal(value, _meta(token))
         elif token.type == 'IDENTIFIER':
-            return Variable(token.value, token)
+            return Variable(intern(token.value), _meta(token))
         else:
             raise SimpleLangSyntaxError(f"Token não reconhecido: {token}")
     
+    # --- Programa ---
+    
+    def _build_program(self, tree, children):
+        """Constrói a lista de statements do programa."""
+        return [stmt for stmt in children if stmt]
+    
     # --- Statements ---
     
-    def _build_expression_stmt(self, tree):
+    def _build_expression_stmt(self, tree, children):
         """Constrói um expression statement."""
-        expr = self._build_expression(tree.children[0])
-        return ExpressionStatement(expr, tree.meta)
+        return ExpressionStatement(children[0], _meta(tree.meta))
     
-    def _build_print_statement(self, tree):
+    def _build_print_statement(self, tree, children):
         """Constrói um print statement."""
-        expr = self._build_expression(tree.children[0])
-        return PrintStatement(expr, tree.meta)
+        return PrintStatement(children[0], _meta(tree.meta))
     
-    def _build_var_declaration(self, tree):
+    def _build_var_declaration(self, tree, children):
         """Constrói uma declaração de variável."""
-        name = tree.children[0].value  # IDENTIFIER
+        name = intern(children[0].value)  # IDENTIFIER
         initializer = None
-        if len(tree.children) > 1:
-            initializer = self._build_expression(tree.children[1])
-        return VarDeclaration(name, initializer, tree.meta)
+        if len(children) > 1:
+            initializer = children[1]
+        return VarDeclaration(name, initializer, _meta(tree.meta))
     
-    def _build_block_statement(self, tree):
+    def _build_block_statement(self, tree, children):
         """Constrói um bloco de statements."""
-        statements = []
-        for child in tree.children:
-            stmt = self._build_statement(child)
-            if stmt:
-                statements.append(stmt)
-        return BlockStatement(statements, tree.meta)
-    
-    def _build_if_statement(self, tree):
+        statements = [stmt for stmt in children if stmt]
+        # Um bloco com um único statement que não declara nada não precisa
+        # de escopo próprio: devolver o statement poupa um Environment
+        if len(statements) == 1 and not isinstance(statements[0], (VarDeclaration, FunctionDeclaration)):
+            return statements[0]
+        return BlockStatement(statements, _meta(tree.meta))
+    
+    def _build_if_statement(self, tree, children):
         """Constrói um if statement."""
-        condition = self._build_expression(tree.children[0])
-        then_branch = self._build_statement(tree.children[1])
+        condition = children[0]
+        then_branch = children[1]
         else_branch = None
-        if len(tree.children) > 2:
-            else_branch = self._build_statement(tree.children[2])
-        return IfStatement(condition, then_branch, else_branch, tree.meta)
+        if len(children) > 2:
+            else_branch = children[2]
+        return IfStatement(condition, then_branch, else_branch, _meta(tree.meta))
     
-    def _build_while_statement(self, tree):
+    def _build_while_statement(self, tree, children):
         """Constrói um while statement."""
-        condition = self._build_expression(tree.children[0])
-        body = self._build_statement(tree.children[1])
-        return WhileStatement(condition, body, tree.meta)
+        return WhileStatement(children[0], children[1], _meta(tree.meta))
     
-    def _build_function_declaration(self, tree):
+    def _build_function_declaration(self, tree, children):
         """Constrói uma declaração de função."""
-        name = tree.children[0].value  # IDENTIFIER
+        name = intern(children[0].value)  # IDENTIFIER
         parameters = []
-        body_index = 1
         
-        # Verifica se há parâmetros
-        if len(tree.children) > 2 and isinstance(tree.children[1], Tree) and tree.children[1].data == 'parameters':
-            params_tree = tree.children[1]
-            for param in params_tree.children:
-                parameters.append(param.value)
-            body_index = 2
+        # Verifica se há parâmetros (já convertidos por `_build_parameters`)
+        if len(children) > 2 and type(children[1]) is list:
+            parameters = children[1]
         
-        body = self._build_statement(tree.children[body_index])
-        return FunctionDeclaration(name, parameters, body, tree.meta)
-    
-    def _build_return_statement(self, tree):
+        # O corpo da função é sempre um BlockStatement (a chamada executa
+        # `body.statements`), mesmo que o bloco tenha sido achatado
+        body = children[-1]
+        if type(body) is not BlockStatement:
+            body = BlockStatement([body], body.token)
+        return FunctionDeclaration(name, parameters, body, _meta(tree.meta))
+    
+    def _build_parameters(self, tree, children):
+        """Constrói a lista de nomes de parâmetros."""
+        return [intern(param.value) for param in children]
+    
+    def _build_return_statement(self, tree, children):
         """Constrói um return statement."""
         value = None
-        if tree.children:
-            value = self._build_expression(tree.children[0])
-        return ReturnStatement("return", value, tree.meta)
+        if children:
+            value = children[0]
+        return ReturnStatement("return", value, _meta(tree.meta))
     
     # --- Expressões ---
     
-    def _build_assignment(self, tree):
+    def _build_assignment(self, tree, children):
         """Constrói uma atribuição."""
-        name = tree.children[0].value  # IDENTIFIER
-        value = self._build_expression(tree.children[1])
-        return Assignment(name, value, tree.meta)
+        name = intern(children[0].value)  # IDENTIFIER
+        return Assignment(name, children[1], _meta(tree.meta))
     
-    def _build_logical_or(self, tree):
+    def _build_logical_or(self, tree, children):
         """Constrói uma expressão OR lógica."""
-        return self._build_binary_expression(tree, "or")
+        return self._build_binary_expression(tree, children, "or")
     
-    def _build_logical_and(self, tree):
+    def _build_logical_and(self, tree, children):
         """Constrói uma expressão AND lógica."""
-        return self._build_binary_expression(tree, "and")
+        return self._build_binary_expression(tree, children, "and")
     
-    def _build_equality(self, tree):
+    def _build_equality(self, tree, children):
         """Constrói uma expressão de igualdade."""
-        return self._build_binary_expression(tree)
+        return self._build_binary_expression(tree, children)
     
-    def _build_comparison(self, tree):
+    def _build_comparison(self, tree, children):
         """Constrói uma expressão de comparação."""
-        return self._build_binary_expression(tree)
+        return self._build_binary_expression(tree, children)
     
-    def _build_term(self, tree):
+    def _build_term(self, tree, children):
         """Constrói uma expressão de termo (+ -)."""
-        return self._build_binary_expression(tree)
+        return self._build_binary_expression(tree, children)
     
-    def _build_factor(self, tree):
+    def _build_factor(self, tree, children):
         """Constrói uma expressão de fator (* / %)."""
-        return self._build_binary_expression(tree)
+        return self._build_binary_expression(tree, children)
     
-    def _build_binary_expression(self, tree, default_op=None):
+    def _build_binary_expression(self, tree, children, default_op=None):
         """Constrói uma expressão binária genérica."""
-        if len(tree.children) == 1:
-            return self._build_expression(tree.children[0])
+        if len(children) == 1:
+            return children[0]
         
-        left = self._build_expression(tree.children[0])
-        for i in range(1, len(tree.children), 2):
-            operator = tree.children[i] if default_op is None else default_op
-            right = self._build_expression(tree.children[i + 1])
-            left = Binary(left, operator, right, tree.meta)
+        position = _meta(tree.meta)
+        left = children[0]
+        # Operações seguidas com o mesmo operador viram um único BinaryChain
+        # (a + b + c), avaliado num laço em vez de Binary aninhados
+        chain_op = None
+        for i in range(1, len(children), 2):
+            operator = children[i] if default_op is None else default_op
+            right = children[i + 1]
+            folded = self._fold_binary(operator, left, right)
+            if folded is not _NO_FOLD:
+                left = _literal(folded, position)
+                chain_op = None
+                continue
+            
+            op = BINARY_OPERATORS.get(getattr(operator, 'value', operator))
+            if op is not None and op == chain_op:
+                if type(left) is BinaryChain:
+                    left.operands.append(right)
+                else:
+                    left = BinaryChain(operator, [left.left, left.right, right], position)
+            else:
+                left = Binary(left, operator, right, position)
+                chain_op = op
         
         return left
     
-    def _build_unary(self, tree):
-        """Constrói uma expressão unária."""
-        if len(tree.children) == 1:
-            return self._build_expression(tree.children[0])
-        
-        operator = tree.children[0]
-        right = self._build_expression(tree.children[1])
-        return Unary(operator, right, tree.meta)
+    def _fold_binary(self, operator, left, right):
+        """Avalia `left operator right` se ambos forem literais dobráveis."""
+        if type(left) is not Literal or type(right) is not Literal:
+            return _NO_FOLD
+        fold = _FOLD.get(getattr(operator, 'value', operator))
+        if fold is None:
+            return _NO_FOLD
+        return fold(left.value, right.value)
     
-    def _build_call(self, tree):
+    def _build_unary(self, tree, children):
+        """Constrói uma expressão unária."""
+        operator, right = children
+        if type(right) is Literal:
+            fold = _UNARY_FOLD.get(getattr(operator, 'value', operator))
+            if fold is not None:
+                folded = fold(right.value)
+                if folded is not _NO_FOLD:
+                    return _literal(folded, _meta(tree.meta))
+        return Unary(operator, right, _meta(tree.meta))
+    
+    def _build_call(self, tree, children):
         """Constrói uma chamada de função."""
-        callee = self._build_expression(tree.children[0])
-        
-        # Se há apenas um filho, não é uma chamada
-        if len(tree.children) == 1:
-            return callee
-        
-        # Processa argumentos se existirem
-        arguments = []
-        if len(tree.children) > 1 and isinstance(tree.children[1], Tree) and tree.children[1].data == 'arguments':
-            args_tree = tree.children[1]
-            for arg in args_tree.children:
-                arguments.append(self._build_expression(arg))
-        
-        return Call(callee, tree.meta, arguments, tree.meta)
+        # A regra `arguments` sempre produz uma lista, mesmo vazia
+        callee, arguments = children
+        position = _meta(tree.meta)
+        return Call(callee, position, arguments, position)
+    
+    def _build_arguments(self, tree, children):
+        """Constrói a lista de argumentos de uma chamada."""
+        return children
     
-    def _build_grouping(self, tree):
+    def _build_grouping(self, tree, children):
         """Constrói uma expressão agrupada."""
-        expr = self._build_expression(tree.children[0])
-        return Grouping(expr, tree.meta)
+        # Parênteses em volta de um literal não mudam nada na execução
+        if type(children[0]) is Literal:
+            return children[0]
+        return Grouping(children[0], _meta(tree.meta))
     
-    def _build_identifier(self, tree):
+    def _build_identifier(self, tree, children):
         """Constrói uma referência a variável."""
-        return Variable(tree.children[0].value, tree.meta)
+        return Variable(intern(children[0].value), _meta(tree.meta))
     
-    def _build_number(self, tree):
+    def _build_number(self, tree, children):
         """Constrói um literal numérico."""
-        value = tree.children[0].value
+        value = children[0].value
         num_value = float(value) if '.' in value else int(value)
-        return Literal(num_value, tree.meta)
+        return _literal(num_value, _meta(tree.meta))
     
-    def _build_string(self, tree):
+    def _build_string(self, tree, children):
         """Constrói um literal string."""
-        value = tree.children[0].value[1:-1]  # Remove aspas
-        return Literal(value, tree.meta)
+        value = children[0].value[1:-1]  # Remove aspas
+        return Literal(value, _meta(tree.meta))
     
-    def _build_true(self, tree):
+    def _build_true(self, tree, children):
         """Constrói um literal true."""
-        return Literal(True, tree.meta)
+        return _TRUE
     
-    def _build_false(self, tree):
+    def _build_false(self, tree, children):
         """Constrói um literal false."""
-        return Literal(False, tree.meta)
+        return _FALSE
     
-    def _build_nil(self, tree):
+    def _build_nil(self, tree, children):
         """Constrói um literal nil."""
-        return Literal(None, tree.meta)
-
+        return _NIL
 
 def build_ast(parse_tree):
     """
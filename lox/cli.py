@@ -8,25 +8,34 @@ import argparse
 import sys
 from pathlib import Path
 
-from .parser import Parser
+from .parser import create_parser
 from .transformer import transform_to_ast
 from .runtime import Interpreter
+from .vm import VM
+from .pybackend import PythonBackend
 from .errors import SimpleLangError, SimpleLangSyntaxError
 
-def run_file(filepath: Path):
+
+def run_file(filepath: Path, bytecode: bool = False, python: bool = False):
     """
     Executa um arquivo SimpleLang.
     
     Args:
         filepath: Caminho para o arquivo SimpleLang.
+        bytecode: Compila para bytecode e executa na VM em vez de percorrer a AST.
+        python: Traduz o programa para Python e o executa no CPython.
     """
-    parser = Parser()
-    interpreter = Interpreter()
+    parser = create_parser()
+    if python:
+        interpreter = PythonBackend()
+    elif bytecode:
+        interpreter = VM()
+    else:
+        interpreter = Interpreter()
     
     try:
         source_code = filepath.read_text(encoding="utf-8")
-        tree = parser.parse(source_code, str(filepath))
-        ast = transform_to_ast(tree)
+        ast = parser.parse_ast(source_code, str(filepath))
         interpreter.interpret(ast)
     except SimpleLangError as e:
         print(f"Erro: {e}", file=sys.stderr)
@@ -39,7 +48,7 @@ def run_prompt():
     """
     Inicia o modo interativo (REPL) do SimpleLang.
     """
-    parser = Parser()
+    parser = create_parser()
     interpreter = Interpreter()
     
     print("SimpleLang REPL (Ctrl+C para sair)")
@@ -49,26 +58,21 @@ def run_prompt():
             if not code.strip():
                 continue
             
-            # Permite declarações e expressões no REPL
-            # Tenta como statement, se falhar, tenta como expressão
+            # Permite declarações e expressões no REPL: tenta primeiro como
+            # programa; se não for válido, avalia como expressão e mostra o valor
             try:
-                tree = parser.parse(code + ";") # Adiciona ; para forçar statement
-                ast = transform_to_ast(tree)
-                interpreter.interpret(ast)
-            except SimpleLangSyntaxError:
-                # Tenta como expressão se falhar como statement
                 try:
-                    # Para expressões, precisamos de uma regra de entrada diferente
-                    # ou adaptar a gramática para REPL
-                    # Por simplicidade, vamos apenas tentar avaliar a expressão
-                    # Isso pode ser melhorado com uma gramática específica para REPL
-                    tree = parser.parser.parse(code, start='expression')
-                    expr_ast = SimpleLangTransformer().transform(tree)
-                    result = interpreter.evaluate(expr_ast)
+                    ast = parser.parse_ast(code)
+                except SimpleLangSyntaxError as statement_error:
+                    try:
+                        tree = parser.parse_expression(code)
+                    except SimpleLangSyntaxError:
+                        raise statement_error
+                    result = interpreter.evaluate(transform_to_ast(tree))
                     if result is not None:
                         print(interpreter._stringify(result))
-                except Exception as le:
-                    print(f"Erro de sintaxe: {le}", file=sys.stderr)
+                else:
+                    interpreter.interpret(ast)
             except SimpleLangError as e:
                 print(f"Erro: {e}", file=sys.stderr)
             except Exception as e:
@@ -83,11 +87,14 @@ def run_prompt():
 def main():
     parser = argparse.ArgumentParser(description="Interpretador SimpleLang")
     parser.add_argument("file", nargs="?", help="Caminho para o arquivo SimpleLang")
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument("--bytecode", action="store_true", help="Executa o arquivo na VM de bytecode")
+    backend.add_argument("--python", action="store_true", help="Traduz o arquivo para Python e o executa no CPython")
     
     args = parser.parse_args()
     
     if args.file:
-        run_file(Path(args.file))
+        run_file(Path(args.file), bytecode=args.bytecode, python=args.python)
     else:
         run_prompt()
 
@@ -0,0 +1,355 @@
+"""
+Compilador de AST para bytecode da SimpleLang.
+
+Este módulo traduz a AST (já anotada pelo Resolver) para uma sequência plana
+de instruções (opcode + argumento), executada depois pela VM em lox/vm.py.
+Cada função declarada vira um Chunk próprio, guardado como constante do
+Chunk que a declara.
+"""
+
+from enum import IntEnum
+
+from .node import *
+from .ast import _FOLD, _UNARY_FOLD, _NO_FOLD
+from .resolver import Resolver
+from .errors import SimpleLangRuntimeError
+
+
+class OpCode(IntEnum):
+    """Instruções da VM."""
+    # Os operadores binários usam os mesmos códigos de BinOp
+    ADD = BinOp.ADD
+    SUB = BinOp.SUB
+    MUL = BinOp.MUL
+    DIV = BinOp.DIV
+    MOD = BinOp.MOD
+    EQ = BinOp.EQ
+    NE = BinOp.NE
+    GT = BinOp.GT
+    GE = BinOp.GE
+    LT = BinOp.LT
+    LE = BinOp.LE
+    LOAD_CONST = 11
+    LOAD_LOCAL = 12
+    LOAD_GLOBAL = 13
+    STORE_LOCAL = 14
+    STORE_GLOBAL = 15
+    DEFINE_LOCAL = 16
+    DEFINE_GLOBAL = 17
+    POP = 18
+    NEGATE = 19
+    NOT = 20
+    BOOL = 21
+    JUMP = 22
+    JUMP_IF_FALSE = 23
+    JUMP_IF_FALSE_OR_POP = 24
+    JUMP_IF_TRUE_OR_POP = 25
+    BEGIN_SCOPE = 26
+    END_SCOPE = 27
+    FUNCTION = 28
+    CALL = 29
+    RETURN = 30
+    PRINT = 31
+
+
+class Chunk:
+    """
+    Código compilado de um programa ou do corpo de uma função.
+
+    As instruções ficam em arrays paralelos (estrutura de arrays): `ops`
+    guarda um opcode por byte e `args[i]` o argumento da instrução i. Não
+    há uma tupla por instrução. `consts` é o pool de constantes
+    referenciado por LOAD_CONST e FUNCTION.
+    """
+
+    def __init__(self, name, declaration=None):
+        """
+        Args:
+            name (str): Nome usado em mensagens e na desmontagem
+            declaration (FunctionDeclaration): Declaração de origem, se for uma função
+        """
+        self.name = name
+        self.declaration = declaration
+        self.ops = bytearray()
+        self.args = []
+        self.consts = []
+        self._const_index = {}
+
+    def __len__(self):
+        return len(self.ops)
+
+    def instruction(self, index):
+        """Retorna a instrução `index` como `(OpCode, argumento)`."""
+        return OpCode(self.ops[index]), self.args[index]
+
+    def emit(self, opcode, arg=None):
+        """Acrescenta uma instrução e retorna sua posição."""
+        self.ops.append(opcode)
+        self.args.append(arg)
+        return len(self.ops) - 1
+
+    def patch(self, index, target=None):
+        """Faz o salto em `index` apontar para `target` (padrão: a próxima instrução)."""
+        self.args[index] = len(self.ops) if target is None else target
+
+    def truncate(self, length):
+        """Descarta as instruções a partir de `length`."""
+        del self.ops[length:]
+        del self.args[length:]
+
+    def add_const(self, value):
+        """Adiciona `value` ao pool (sem repetir) e retorna seu índice."""
+        # O tipo entra na chave para que 1, 1.0 e true não se confundam
+        key = (type(value), value) if not isinstance(value, Chunk) else id(value)
+        index = self._const_index.get(key)
+        if index is None:
+            index = len(self.consts)
+            self.consts.append(value)
+            self._const_index[key] = index
+        return index
+
+    def disassemble(self):
+        """Retorna uma listagem legível das instruções, útil para depuração."""
+        lines = [f"== {self.name} =="]
+        for index in range(len(self.ops)):
+            opcode, arg = self.instruction(index)
+            line = f"{index:04d} {opcode.name}"
+            if opcode == OpCode.LOAD_CONST or opcode == OpCode.FUNCTION:
+                line += f" {arg} ({self.consts[arg]!r})"
+            elif arg is not None:
+                line += f" {arg}"
+            lines.append(line)
+        for const in self.consts:
+            if isinstance(const, Chunk):
+                lines.append(const.disassemble())
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"<chunk {self.name}>"
+
+
+class Compiler(Visitor):
+    """
+    Gera bytecode a partir da AST.
+
+    Variáveis locais usam os índices (depth, slot) calculados pelo Resolver;
+    as globais continuam sendo acessadas pelo nome.
+    """
+
+    def __init__(self):
+        """Inicializa o compilador."""
+        self.chunk = None
+
+    def compile(self, statements):
+        """
+        Compila um programa.
+
+        Args:
+            statements (list): Lista de statements da AST
+
+        Returns:
+            Chunk: Código do programa
+        """
+        Resolver().resolve(statements)
+        chunk = Chunk("<programa>")
+        self._compile_body(chunk, statements)
+        return chunk
+
+    def _compile_body(self, chunk, statements):
+        enclosing = self.chunk
+        self.chunk = chunk
+        try:
+            for statement in statements:
+                statement.accept(self)
+            # Retorno implícito: nil
+            self._emit_const(None)
+            chunk.emit(OpCode.RETURN)
+        finally:
+            self.chunk = enclosing
+
+    def _emit_const(self, value):
+        self.chunk.emit(OpCode.LOAD_CONST, self.chunk.add_const(value))
+
+    # --- Expressões ---
+
+    def _constant_since(self, start):
+        """Retorna a constante emitida desde `start`, se o trecho for só um LOAD_CONST."""
+        chunk = self.chunk
+        if len(chunk) - start == 1 and chunk.ops[start] == OpCode.LOAD_CONST:
+            return chunk.consts[chunk.args[start]]
+        return _NO_FOLD
+
+    def _fold(self, start, fold, *operands):
+        """Troca as instruções desde `start` pelo valor dobrado, se possível."""
+        if fold is None or _NO_FOLD in operands:
+            return False
+        folded = fold(*operands)
+        if folded is _NO_FOLD:
+            return False
+        self.chunk.truncate(start)
+        self._emit_const(folded)
+        return True
+
+    def visit_binary_expr(self, expr):
+        op = expr.op
+        operator = getattr(expr.operator, 'value', expr.operator)
+        if op is None:
+            raise SimpleLangRuntimeError(f"Operador binário desconhecido: {operator}")
+
+        start = len(self.chunk)
+        expr.left.accept(self)
+        if op == BinOp.AND or op == BinOp.OR:
+            # Curto-circuito: o resultado é sempre um booleano
+            left = self._constant_since(start)
+            self.chunk.emit(OpCode.BOOL)
+            jump_op = OpCode.JUMP_IF_FALSE_OR_POP if op == BinOp.AND else OpCode.JUMP_IF_TRUE_OR_POP
+            jump = self.chunk.emit(jump_op)
+            right_start = len(self.chunk)
+            expr.right.accept(self)
+            right = self._constant_since(right_start)
+            self.chunk.emit(OpCode.BOOL)
+            self.chunk.patch(jump)
+            self._fold(start, _FOLD[operator], left, right)
+            return
+
+        left = self._constant_since(start)
+        right_start = len(self.chunk)
+        expr.right.accept(self)
+        # Operandos constantes (inclusive subexpressões já dobradas) viram
+        # um único LOAD_CONST
+        if not self._fold(start, _FOLD.get(operator), left, self._constant_since(right_start)):
+            self.chunk.emit(OpCode(op))
+
+    def visit_binary_chain_expr(self, expr):
+        # Mesmo código de Binary aninhados à esquerda
+        return expr.as_binary().accept(self)
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        self._emit_const(expr.value)
+
+    def visit_unary_expr(self, expr):
+        operator = getattr(expr.operator, 'value', expr.operator)
+        if expr.op == UnaryOp.NEG:
+            opcode = OpCode.NEGATE
+        elif expr.op == UnaryOp.NOT:
+            opcode = OpCode.NOT
+        else:
+            raise SimpleLangRuntimeError(f"Operador unário desconhecido: {operator}")
+
+        start = len(self.chunk)
+        expr.right.accept(self)
+        if not self._fold(start, _UNARY_FOLD[operator], self._constant_since(start)):
+            self.chunk.emit(opcode)
+
+    def visit_variable_expr(self, expr):
+        if expr.slot is not None:
+            self.chunk.emit(OpCode.LOAD_LOCAL, (expr.depth, expr.slot))
+        else:
+            self.chunk.emit(OpCode.LOAD_GLOBAL, expr.name)
+
+    def visit_assignment_expr(self, expr):
+        expr.value.accept(self)
+        if expr.slot is not None:
+            self.chunk.emit(OpCode.STORE_LOCAL, (expr.depth, expr.slot))
+        else:
+            self.chunk.emit(OpCode.STORE_GLOBAL, expr.name)
+
+    def visit_call_expr(self, expr):
+        expr.callee.accept(self)
+        for argument in expr.arguments:
+            argument.accept(self)
+        self.chunk.emit(OpCode.CALL, len(expr.arguments))
+
+    # --- Statements ---
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.chunk.emit(OpCode.POP)
+
+    def visit_print_stmt(self, stmt):
+        stmt.expression.accept(self)
+        self.chunk.emit(OpCode.PRINT)
+
+    def visit_var_declaration_stmt(self, stmt):
+        if stmt.initializer:
+            stmt.initializer.accept(self)
+        else:
+            self._emit_const(None)
+        self._emit_define(stmt.name, stmt.slot)
+
+    def _emit_define(self, name, slot):
+        if slot is not None:
+            self.chunk.emit(OpCode.DEFINE_LOCAL, slot)
+        else:
+            self.chunk.emit(OpCode.DEFINE_GLOBAL, name)
+
+    def visit_block_stmt(self, stmt):
+        self.chunk.emit(OpCode.BEGIN_SCOPE, stmt.slot_count or 0)
+        for statement in stmt.statements:
+            statement.accept(self)
+        self.chunk.emit(OpCode.END_SCOPE)
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        else_jump = self.chunk.emit(OpCode.JUMP_IF_FALSE)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch:
+            end_jump = self.chunk.emit(OpCode.JUMP)
+            self.chunk.patch(else_jump)
+            stmt.else_branch.accept(self)
+            self.chunk.patch(end_jump)
+        else:
+            self.chunk.patch(else_jump)
+
+    def visit_while_stmt(self, stmt):
+        loop_start = len(self.chunk)
+        stmt.condition.accept(self)
+        exit_jump = self.chunk.emit(OpCode.JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        self.chunk.emit(OpCode.JUMP, loop_start)
+        self.chunk.patch(exit_jump)
+
+    def visit_for_stmt(self, stmt):
+        chunk = self.chunk
+        chunk.emit(OpCode.BEGIN_SCOPE, stmt.slot_count or 0)
+        if stmt.init is not None:
+            stmt.init.accept(self)
+        loop_start = len(chunk)
+        stmt.condition.accept(self)
+        exit_jump = chunk.emit(OpCode.JUMP_IF_FALSE)
+        stmt.body.accept(self)
+        if stmt.increment is not None:
+            stmt.increment.accept(self)
+            chunk.emit(OpCode.POP)
+        chunk.emit(OpCode.JUMP, loop_start)
+        chunk.patch(exit_jump)
+        chunk.emit(OpCode.END_SCOPE)
+
+    def visit_function_declaration_stmt(self, stmt):
+        function = Chunk(stmt.name, stmt)
+        self._compile_body(function, stmt.body.statements)
+        self.chunk.emit(OpCode.FUNCTION, self.chunk.add_const(function))
+        self._emit_define(stmt.name, stmt.slot)
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is not None:
+            stmt.value.accept(self)
+        else:
+            self._emit_const(None)
+        self.chunk.emit(OpCode.RETURN)
+
+
+def compile_program(statements):
+    """
+    Função utilitária para compilar um programa.
+
+    Args:
+        statements (list): Lista de statements da AST
+
+    Returns:
+        Chunk: Código do programa
+    """
+    return Compiler().compile(statements)
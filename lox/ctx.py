@@ -6,7 +6,19 @@ durante a análise semântica e execução de programas SimpleLang.
 """
 
 from typing import Dict, Any, Optional, List
-from .errors import SimpleLangUndefinedVariableError, SimpleLangUndefinedFunctionError
+from .errors import (
+    SimpleLangUndefinedVariableError, SimpleLangUndefinedFunctionError, SimpleLangArityError,
+    SimpleLangRuntimeError,
+)
+from .jit import compile_kernel, call_kernel, NUMERIC_TYPES, NumbaError, RECURSIVE_KERNELS
+from .transpiler import compile_function
+
+
+# Marca "não encontrado" nas buscas; None é um valor válido (nil)
+_SENTINEL = object()
+
+# Chamadas de uma mesma função antes de traduzi-la para Python
+HOT_CALL_THRESHOLD = 50
 
 
 class Environment:
@@ -14,17 +26,22 @@ class Environment:
     Representa um ambiente/escopo de execução.
     
     Cada ambiente mantém um mapeamento de nomes para valores
-    e uma referência ao ambiente pai (escopo externo).
+    e uma referência ao ambiente pai (escopo externo). Variáveis locais
+    resolvidas pelo Resolver ficam na lista `slots`, acessada por índice.
     """
     
-    def __init__(self, enclosing: Optional["Environment"] = None):
+    __slots__ = ("values", "slots", "enclosing")
+    
+    def __init__(self, enclosing: Optional["Environment"] = None, size: int = 0):
         """
         Inicializa um novo ambiente.
         
         Args:
             enclosing: Ambiente pai (escopo externo)
+            size: Número de slots para variáveis locais resolvidas
         """
         self.values: Dict[str, Any] = {}
+        self.slots: List[Any] = [None] * size
         self.enclosing = enclosing
     
     def define(self, name: str, value: Any) -> None:
@@ -50,11 +67,12 @@ class Environment:
         Raises:
             SimpleLangUndefinedVariableError: Se a variável não existe
         """
-        if name in self.values:
-            return self.values[name]
-        
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
+        env = self
+        while env is not None:
+            value = env.values.get(name, _SENTINEL)
+            if value is not _SENTINEL:
+                return value
+            env = env.enclosing
         
         raise SimpleLangUndefinedVariableError(name)
     
@@ -69,16 +87,59 @@ class Environment:
         Raises:
             SimpleLangUndefinedVariableError: Se a variável não existe
         """
-        if name in self.values:
-            self.values[name] = value
-            return
-        
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
-            return
+        env = self
+        while env is not None:
+            values = env.values
+            if name in values:
+                values[name] = value
+                return
+            env = env.enclosing
         
         raise SimpleLangUndefinedVariableError(name)
     
+    def ancestor(self, depth: int) -> "Environment":
+        """
+        Retorna o ambiente `depth` níveis acima deste.
+        
+        Args:
+            depth: Distância calculada pelo Resolver
+        """
+        env = self
+        for _ in range(depth):
+            env = env.enclosing
+        return env
+    
+    def define_at_slot(self, slot: int, value: Any) -> None:
+        """
+        Define uma variável local resolvida no ambiente atual.
+        
+        Args:
+            slot: Índice calculado pelo Resolver
+            value: Valor da variável
+        """
+        self.slots[slot] = value
+    
+    def get_at(self, depth: int, slot: int) -> Any:
+        """
+        Obtém o valor de uma variável local resolvida.
+        
+        Args:
+            depth: Distância até o ambiente que declara a variável
+            slot: Índice da variável nesse ambiente
+        """
+        return self.ancestor(depth).slots[slot]
+    
+    def assign_at(self, depth: int, slot: int, value: Any) -> None:
+        """
+        Atribui um valor a uma variável local resolvida.
+        
+        Args:
+            depth: Distância até o ambiente que declara a variável
+            slot: Índice da variável nesse ambiente
+            value: Novo valor
+        """
+        self.ancestor(depth).slots[slot] = value
+    
     def contains(self, name: str) -> bool:
         """
         Verifica se uma variável existe no ambiente ou em seus pais.
@@ -89,11 +150,11 @@ class Environment:
         Returns:
             True se a variável existe, False caso contrário
         """
-        if name in self.values:
-            return True
-        
-        if self.enclosing is not None:
-            return self.enclosing.contains(name)
+        env = self
+        while env is not None:
+            if name in env.values:
+                return True
+            env = env.enclosing
         
         return False
 
@@ -103,6 +164,8 @@ class SimpleLangCallable:
     Interface para objetos que podem ser chamados (funções).
     """
     
+    __slots__ = ()
+    
     def call(self, interpreter, arguments: List[Any]) -> Any:
         """Chama o objeto com os argumentos fornecidos."""
         raise NotImplementedError
@@ -117,16 +180,33 @@ class SimpleLangFunction(SimpleLangCallable):
     Representa uma função definida pelo usuário em SimpleLang.
     """
     
-    def __init__(self, declaration, closure: Environment):
+    __slots__ = ("declaration", "closure", "name", "param_names", "arity_value",
+                 "body_statements", "_memo", "_calls", "_compiled")
+    
+    def __init__(self, declaration, closure: Environment, memoize=False):
         """
         Inicializa uma função.
         
         Args:
             declaration: Nó AST da declaração da função
             closure: Ambiente onde a função foi declarada (closure)
+            memoize (bool): Guarda os resultados mesmo que a função não
+                tenha sido marcada como pura
         """
         self.declaration = declaration
         self.closure = closure
+        # Dados da declaração usados em toda chamada; não mudam depois daqui
+        self.name = declaration.name
+        self.param_names = tuple(declaration.parameters)
+        self.arity_value = len(self.param_names)
+        self.body_statements = declaration.body.statements
+        # Funções puras (marcadas pelo Resolver) guardam os resultados
+        # já calculados, indexados pelos argumentos
+        self._memo = {} if declaration.pure or memoize else None
+        # Chamadas feitas até aqui e a versão traduzida para Python
+        # (None: ainda não tentada; False: não traduzível)
+        self._calls = 0
+        self._compiled = None
     
     def call(self, interpreter, arguments: List[Any]) -> Any:
         """
@@ -139,41 +219,155 @@ class SimpleLangFunction(SimpleLangCallable):
         Returns:
             Valor retornado pela função
         """
-        from .errors import SimpleLangArityError, SimpleLangReturnException
+        memo = self._memo
+        if memo is None or not interpreter.memoize or not self._is_bound():
+            return self._invoke(interpreter, arguments)
         
+        # O tipo entra na chave para que f(1), f(1.0) e f(true) não se confundam
+        key = (tuple(arguments), tuple(map(type, arguments)))
+        value = memo.get(key, _SENTINEL)
+        if value is _SENTINEL:
+            value = self._invoke(interpreter, arguments)
+            memo[key] = value
+        return value
+    
+    def _invoke(self, interpreter, arguments: List[Any]) -> Any:
+        """Executa o corpo da função, sem consultar a memoização."""
         # Verifica aridade
-        if len(arguments) != len(self.declaration.parameters):
-            raise SimpleLangArityError(
-                self.declaration.name,
-                len(self.declaration.parameters),
-                len(arguments)
-            )
+        if len(arguments) != self.arity_value:
+            raise SimpleLangArityError(self.name, self.arity_value, len(arguments))
+        
+        if interpreter.jit:
+            value = self._run_kernel(interpreter, arguments)
+            if value is not _SENTINEL:
+                return value
+            compiled = self._compiled
+            if compiled is None:
+                self._calls += 1
+                if self._calls >= HOT_CALL_THRESHOLD:
+                    compiled = self._compiled = compile_function(
+                        self.declaration, _python_namespace(interpreter))
+            if compiled:
+                try:
+                    return compiled(*arguments)
+                except KeyError as error:
+                    # Leitura de uma global que não existe
+                    raise SimpleLangUndefinedVariableError(error.args[0]) from None
         
         # Cria novo ambiente para a função
         # O ambiente da função deve ter o closure como seu ambiente pai
-        environment = Environment(self.closure)
+        slot_count = self.declaration.slot_count
+        if slot_count is None:
+            environment = Environment(self.closure)
+            # Vincula parâmetros aos argumentos
+            values = environment.values
+            for param, argument in zip(self.param_names, arguments):
+                values[param] = argument
+        else:
+            # Declaração resolvida: o parâmetro i ocupa o slot i
+            environment = Environment(self.closure, slot_count)
+            environment.slots[:len(arguments)] = arguments
         
-        # Vincula parâmetros aos argumentos
-        for i, param in enumerate(self.declaration.parameters):
-            environment.define(param, arguments[i])
+        # Executa o corpo da função no novo ambiente; um `return` preenche
+        # `interpreter._return_value` e interrompe a execução do bloco
+        interpreter.execute_block(self.body_statements, environment)
+        value = interpreter._return_value
+        if value is _SENTINEL:
+            # Sem return explícito, retorna nil
+            return None
+        interpreter._return_value = _SENTINEL
+        return value
+    
+    def _run_kernel(self, interpreter, arguments: List[Any]) -> Any:
+        """
+        Executa a versão compilada por lox.jit, se houver uma.
         
-        # Executa o corpo da função no novo ambiente
+        Returns:
+            O valor retornado, ou _SENTINEL se a função (ou algum argumento)
+            não for numérico, ou se for recursiva e memoizada
+        """
+        declaration = self.declaration
+        kernel = declaration.kernel
+        if kernel is None:
+            # Compilada na primeira chamada e guardada na declaração
+            kernel = declaration.kernel = compile_kernel(declaration)
+        if not kernel:
+            return _SENTINEL
+        if kernel in RECURSIVE_KERNELS and self._memo is not None and interpreter.memoize:
+            return _SENTINEL
+        for argument in arguments:
+            if type(argument) not in NUMERIC_TYPES:
+                return _SENTINEL
+        # A recursão dentro do kernel pressupõe que o nome da função ainda é
+        # ela mesma
+        if not self._is_bound():
+            return _SENTINEL
         try:
-            interpreter.execute_block(self.declaration.body.statements, environment)
-        except SimpleLangReturnException as return_value:
-            return return_value.value
-        
-        # Se não houve return explícito, retorna nil
-        return None
+            return call_kernel(kernel, arguments)
+        except NumbaError:
+            declaration.kernel = False
+            return _SENTINEL
+        except TypeError:
+            # Ex.: nil (de uma chamada recursiva sem return) numa conta. O
+            # kernel não tem efeitos colaterais, então o interpretador pode
+            # refazer a chamada e produzir o erro da SimpleLang
+            return _SENTINEL
+    
+    def _is_bound(self) -> bool:
+        """
+        Diz se o nome da função, no ambiente onde foi declarada, ainda se
+        refere a ela.
+
+        Uma função pura que chama a si mesma faz isso pelo nome; se ele
+        passar a apontar para outra função, os resultados memoizados (e o
+        kernel recursivo) deixam de valer.
+        """
+        slot = self.declaration.slot
+        closure = self.closure
+        if slot is None:
+            return closure.values.get(self.name, self) is self
+        slots = closure.slots
+        return slot >= len(slots) or slots[slot] is self
     
     def arity(self) -> int:
         """
         Retorna o número de parâmetros da função.
         """
-        return len(self.declaration.parameters)
+        return self.arity_value
     
     def __str__(self) -> str:
-        return f"<função {self.declaration.name}>"
+        return f"<função {self.name}>"
+
+
+def _python_namespace(interpreter):
+    """Auxiliares usados pelas funções traduzidas por `compile_function`."""
+    def call(callee, *arguments):
+        if not isinstance(callee, SimpleLangCallable):
+            raise SimpleLangRuntimeError(f"Não é possível chamar: {interpreter._stringify(callee)}")
+        return callee.call(interpreter, list(arguments))
+
+    def assign_global(name, value):
+        interpreter.context.globals.assign(name, value)
+        return value
+
+    def print_(*values):
+        # `output` é lido a cada chamada: a função traduzida continua viva
+        # quando o interpretador troca de saída (ex.: capture_output)
+        print(*values, file=interpreter.output)
+
+    return {
+        "print": print_,
+        "_globals": interpreter.context.globals.values,
+        "_call": call,
+        "_assign_global": assign_global,
+        "_add": interpreter._add,
+        "_sub": interpreter._subtract,
+        "_mul": interpreter._multiply,
+        "_div": interpreter._divide,
+        "_mod": interpreter._modulo,
+        "_neg": interpreter._negate,
+        "_str": interpreter._stringify,
+    }
 
 
 class Context:
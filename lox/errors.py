@@ -14,23 +14,27 @@ class SimpleLangError(Exception):
         self.line = line
         self.column = column
         self.filename = filename
-        super().__init__(self.format_error())
+        # A mensagem com a localização só é montada em __str__, quando o
+        # erro é de fato exibido
+        super().__init__(message)
+    
+    def __str__(self):
+        return self.format_error()
     
     def format_error(self):
         """Formata a mensagem de erro com informações de localização."""
-        location = ""
+        parts = []
         if self.filename:
-            location += f"Arquivo '{self.filename}'"
+            parts.append(f"Arquivo '{self.filename}'")
         if self.line is not None:
-            if location:
-                location += f", linha {self.line}"
-            else:
-                location += f"Linha {self.line}"
+            parts.append(f", linha {self.line}" if parts else f"Linha {self.line}")
         if self.column is not None:
-            location += f", coluna {self.column}"
+            parts.append(f", coluna {self.column}")
         
-        if location:
-            return f"{location}: {self.message}"
+        if parts:
+            parts.append(": ")
+            parts.append(self.message)
+            return "".join(parts)
         return self.message
 
 
@@ -0,0 +1,281 @@
+"""
+Compilação de funções numéricas da SimpleLang para funções Python.
+
+Funções cujo corpo só faz contas com números (parâmetros, variáveis locais,
+literais numéricos, aritmética, comparações, if, while, return e chamadas
+recursivas a si mesmas) são traduzidas para código fonte Python e executadas
+direto, sem passar pelo interpretador a cada nó da AST.
+
+Com a variável de ambiente LOX_JIT_NUMBA=1 e o pacote `numba` instalado, a
+função gerada é ainda compilada com `numba.njit`. Isso é opcional porque o
+Numba usa inteiros de 64 bits, enquanto os inteiros da SimpleLang (e do
+Python) não têm limite: um cálculo que estoure 64 bits daria outro
+resultado.
+"""
+
+import os
+
+from .node import *
+from .errors import SimpleLangDivisionByZeroError
+
+try:
+    if os.environ.get("LOX_JIT_NUMBA") != "1":
+        raise ImportError
+    import numba
+    from numba.core.errors import NumbaError
+except ImportError:
+    numba = None
+    NumbaError = ()
+
+
+# Tipos de argumento aceitos pelas funções compiladas (bool fica de fora:
+# `true + 1` teria outro significado no código gerado)
+NUMERIC_TYPES = (int, float)
+
+# Código fonte gerado -> função compilada, compartilhado entre declarações
+_KERNELS = {}
+
+# Funções compiladas que chamam a si mesmas. A recursão não passa pela
+# memoização da SimpleLangFunction, então com ela ativa o interpretador é
+# mais rápido (ex.: fibonacci recursivo seria exponencial no kernel).
+RECURSIVE_KERNELS = set()
+
+_OPERATORS = {
+    BinOp.ADD: "+", BinOp.SUB: "-", BinOp.MUL: "*", BinOp.DIV: "/", BinOp.MOD: "%",
+    BinOp.EQ: "==", BinOp.NE: "!=", BinOp.GT: ">", BinOp.GE: ">=",
+    BinOp.LT: "<", BinOp.LE: "<=",
+}
+
+
+class NotAKernel(Exception):
+    """A função usa algo que o gerador de código não traduz."""
+
+
+class KernelEmitter(Visitor):
+    """
+    Gera o código fonte Python de uma função numérica.
+
+    Depende dos índices (depth, slot) do Resolver: cada declaração local
+    recebe um nome Python próprio (`v0`, `v1`, ...), de modo que variáveis
+    com o mesmo nome em blocos diferentes não se confundem.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.indent = 1
+        # Pilha de escopos: slot -> nome Python
+        self.scopes = []
+        self.count = 0
+        self.declaration = None
+        self.recursive = False
+
+    def emit(self, declaration):
+        """
+        Retorna o código fonte de `declaration`.
+
+        Raises:
+            NotAKernel: Se a função não for puramente numérica
+        """
+        if declaration.slot_count is None:
+            raise NotAKernel("declaração não resolvida")
+        self.declaration = declaration
+        parameters = [self._new_name() for _ in declaration.parameters]
+        self.scopes.append(dict(enumerate(parameters)))
+        self._body(declaration.body.statements)
+        header = f"def _kernel({', '.join(parameters)}):"
+        return "\n".join([header] + self.lines) + "\n"
+
+    def _new_name(self):
+        name = f"v{self.count}"
+        self.count += 1
+        return name
+
+    def _line(self, text):
+        self.lines.append("    " * self.indent + text)
+
+    def _body(self, statements):
+        start = len(self.lines)
+        for statement in statements:
+            statement.accept(self)
+        if len(self.lines) == start:
+            self._line("pass")
+
+    def _nested(self, statement):
+        self.indent += 1
+        try:
+            self._body([statement])
+        finally:
+            self.indent -= 1
+
+    def _lookup(self, expr):
+        if expr.slot is None or expr.depth >= len(self.scopes):
+            # Global ou variável capturada de fora da função
+            raise NotAKernel(f"variável externa '{expr.name}'")
+        return self.scopes[-1 - expr.depth][expr.slot]
+
+    # --- Expressões ---
+
+    def visit_binary_expr(self, expr):
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if expr.op == BinOp.AND:
+            return f"(bool({left}) and bool({right}))"
+        if expr.op == BinOp.OR:
+            return f"(bool({left}) or bool({right}))"
+        if expr.op not in _OPERATORS:
+            raise NotAKernel("operador desconhecido")
+        return f"({left} {_OPERATORS[expr.op]} {right})"
+
+    def visit_binary_chain_expr(self, expr):
+        # Mesmo código de Binary aninhados à esquerda
+        return expr.as_binary().accept(self)
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        if type(expr.value) not in (int, float, bool):
+            raise NotAKernel("literal não numérico")
+        return repr(expr.value)
+
+    def visit_unary_expr(self, expr):
+        right = expr.right.accept(self)
+        if expr.op == UnaryOp.NEG:
+            return f"(-{right})"
+        if expr.op == UnaryOp.NOT:
+            return f"(not {right})"
+        raise NotAKernel("operador desconhecido")
+
+    def visit_variable_expr(self, expr):
+        return self._lookup(expr)
+
+    def visit_assignment_expr(self, expr):
+        return f"({self._lookup(expr)} := {expr.value.accept(self)})"
+
+    def visit_call_expr(self, expr):
+        # Só a recursão direta, com o número certo de argumentos: o nome
+        # global da própria função vira uma chamada a `_kernel`. Quem chama o
+        # kernel confere antes que o nome ainda se refere a esta função.
+        callee = expr.callee
+        declaration = self.declaration
+        if (type(callee) is not Variable or callee.slot is not None
+                or callee.name != declaration.name
+                or len(expr.arguments) != len(declaration.parameters)):
+            raise NotAKernel("chamada de função")
+        self.recursive = True
+        arguments = ", ".join(argument.accept(self) for argument in expr.arguments)
+        return f"_kernel({arguments})"
+
+    # --- Statements ---
+
+    def visit_expression_stmt(self, stmt):
+        self._expression_line(stmt.expression)
+
+    def _expression_line(self, expression):
+        if type(expression) is Assignment:
+            self._line(f"{self._lookup(expression)} = {expression.value.accept(self)}")
+        else:
+            self._line(expression.accept(self))
+
+    def visit_print_stmt(self, stmt):
+        raise NotAKernel("print")
+
+    def visit_var_declaration_stmt(self, stmt):
+        if stmt.initializer is None:
+            raise NotAKernel("variável sem valor inicial")
+        value = stmt.initializer.accept(self)
+        # Redeclaração no mesmo escopo usa o mesmo slot (ver Resolver._declare)
+        # e, portanto, o mesmo nome Python: um nome novo ficaria sem valor no
+        # caminho em que a redeclaração não é executada
+        scope = self.scopes[-1]
+        name = scope.get(stmt.slot)
+        if name is None:
+            name = scope[stmt.slot] = self._new_name()
+        self._line(f"{name} = {value}")
+
+    def visit_block_stmt(self, stmt):
+        self.scopes.append({})
+        try:
+            self._body(stmt.statements)
+        finally:
+            self.scopes.pop()
+
+    def visit_if_stmt(self, stmt):
+        self._line(f"if {stmt.condition.accept(self)}:")
+        self._nested(stmt.then_branch)
+        if stmt.else_branch:
+            self._line("else:")
+            self._nested(stmt.else_branch)
+
+    def visit_while_stmt(self, stmt):
+        self._line(f"while {stmt.condition.accept(self)}:")
+        self._nested(stmt.body)
+
+    def visit_for_stmt(self, stmt):
+        self.scopes.append({})
+        try:
+            if stmt.init is not None:
+                stmt.init.accept(self)
+            self._line(f"while {stmt.condition.accept(self)}:")
+            self._nested(stmt.body)
+            if stmt.increment is not None:
+                self.indent += 1
+                try:
+                    self._expression_line(stmt.increment)
+                finally:
+                    self.indent -= 1
+        finally:
+            self.scopes.pop()
+
+    def visit_function_declaration_stmt(self, stmt):
+        raise NotAKernel("função aninhada")
+
+    def visit_return_stmt(self, stmt):
+        if stmt.value is None:
+            self._line("return None")
+        else:
+            self._line(f"return {stmt.value.accept(self)}")
+
+
+def compile_kernel(declaration):
+    """
+    Compila `declaration` para uma função Python, se ela for numérica.
+
+    Args:
+        declaration (FunctionDeclaration): Declaração já resolvida
+
+    Returns:
+        A função compilada, ou False se a declaração não puder ser compilada
+    """
+    emitter = KernelEmitter()
+    try:
+        source = emitter.emit(declaration)
+    except NotAKernel:
+        return False
+
+    kernel = _KERNELS.get(source)
+    if kernel is None:
+        namespace = {}
+        exec(source, namespace)
+        kernel = namespace["_kernel"]
+        if numba is not None:
+            # A chamada recursiva precisa ir para a versão compilada
+            kernel = namespace["_kernel"] = numba.njit(kernel)
+        _KERNELS[source] = kernel
+        if emitter.recursive:
+            RECURSIVE_KERNELS.add(kernel)
+    return kernel
+
+
+def call_kernel(kernel, arguments):
+    """
+    Executa uma função compilada, convertendo os erros para os da SimpleLang.
+
+    Raises:
+        SimpleLangDivisionByZeroError: Em divisão ou resto por zero
+        NumbaError: Se o Numba não conseguir compilar a função para estes tipos
+    """
+    try:
+        return kernel(*arguments)
+    except ZeroDivisionError:
+        raise SimpleLangDivisionByZeroError()
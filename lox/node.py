@@ -4,10 +4,50 @@ Definição dos nós da Árvore Sintática Abstrata (AST) para SimpleLang.
 Cada classe representa um tipo de nó na AST, facilitando a travessia e a interpretação.
 """
 
+from enum import IntEnum
+
+
+class BinOp(IntEnum):
+    """Código numérico de cada operador binário, usado como índice de despacho."""
+    ADD = 0
+    SUB = 1
+    MUL = 2
+    DIV = 3
+    MOD = 4
+    EQ = 5
+    NE = 6
+    GT = 7
+    GE = 8
+    LT = 9
+    LE = 10
+    AND = 11
+    OR = 12
+
+BINARY_OPERATORS = {
+    "+": BinOp.ADD, "-": BinOp.SUB, "*": BinOp.MUL, "/": BinOp.DIV, "%": BinOp.MOD,
+    "==": BinOp.EQ, "!=": BinOp.NE, ">": BinOp.GT, ">=": BinOp.GE,
+    "<": BinOp.LT, "<=": BinOp.LE, "and": BinOp.AND, "or": BinOp.OR,
+}
+
+class UnaryOp(IntEnum):
+    """Código numérico de cada operador unário."""
+    NEG = 0
+    NOT = 1
+
+UNARY_OPERATORS = {"-": UnaryOp.NEG, "!": UnaryOp.NOT}
+
 class Node:
-    """Classe base para todos os nós da AST."""
+    """
+    Classe base para todos os nós da AST.
+
+    Todos os nós declaram `__slots__`: programas grandes criam muitos nós e
+    assim eles não carregam um `__dict__` por instância.
+    """
+    __slots__ = ("token",)
     def __init__(self, token=None):
-        self.token = token  # O token Lark associado a este nó, para informações de linha/coluna
+        # Posição no código fonte: token do Lark ou, vindo do ASTBuilder, a
+        # tupla (linha, coluna, linha final)
+        self.token = token
 
     def accept(self, visitor):
         """Método para o padrão Visitor, a ser implementado por subclasses."""
@@ -15,27 +55,53 @@ class Node:
 
 class Expression(Node):
     """Classe base para nós que representam expressões."""
-    pass
+    __slots__ = ()
 
 class Statement(Node):
     """Classe base para nós que representam declarações (statements)."""
-    pass
+    __slots__ = ()
 
 # --- Expressões ---
 
 class Binary(Expression):
     """Expressão binária (ex: 1 + 2, a == b)."""
+    __slots__ = ("left", "operator", "right", "op", "numeric")
     def __init__(self, left, operator, right, token=None):
         super().__init__(token or operator)
         self.left = left
         self.operator = operator
         self.right = right
+        # Código do operador (BinOp), resolvido uma vez na construção do nó
+        self.op = BINARY_OPERATORS.get(getattr(operator, "value", operator))
+        # Preenchido pelo Resolver: os dois operandos são sempre números
+        self.numeric = False
 
     def accept(self, visitor):
         return visitor.visit_binary_expr(self)
 
+class BinaryChain(Expression):
+    """Sequência de um mesmo operador binário (ex: a + b + c), avaliada da esquerda para a direita."""
+    __slots__ = ("op", "operator", "operands")
+    def __init__(self, operator, operands, token=None):
+        super().__init__(token or operator)
+        self.operator = operator
+        self.operands = operands
+        self.op = BINARY_OPERATORS.get(getattr(operator, "value", operator))
+
+    def as_binary(self):
+        """Reescreve a cadeia como Binary aninhados à esquerda: ((a + b) + c)."""
+        operands = self.operands
+        expr = operands[0]
+        for i in range(1, len(operands)):
+            expr = Binary(expr, self.operator, operands[i], self.token)
+        return expr
+
+    def accept(self, visitor):
+        return visitor.visit_binary_chain_expr(self)
+
 class Grouping(Expression):
     """Expressão agrupada por parênteses (ex: (1 + 2))."""
+    __slots__ = ("expression",)
     def __init__(self, expression, token=None):
         super().__init__(token)
         self.expression = expression
@@ -45,6 +111,7 @@ class Grouping(Expression):
 
 class Literal(Expression):
     """Literal (número, string, booleano, nil)."""
+    __slots__ = ("value",)
     def __init__(self, value, token=None):
         super().__init__(token)
         self.value = value
@@ -54,35 +121,47 @@ class Literal(Expression):
 
 class Unary(Expression):
     """Expressão unária (ex: -1, !true)."""
+    __slots__ = ("operator", "right", "op")
     def __init__(self, operator, right, token=None):
         super().__init__(token or operator)
         self.operator = operator
         self.right = right
+        # Código do operador (UnaryOp), resolvido uma vez na construção do nó
+        self.op = UNARY_OPERATORS.get(getattr(operator, "value", operator))
 
     def accept(self, visitor):
         return visitor.visit_unary_expr(self)
 
 class Variable(Expression):
     """Referência a uma variável."""
+    __slots__ = ("name", "depth", "slot")
     def __init__(self, name, token=None):
         super().__init__(token or name)
         self.name = name
+        # Preenchidos pelo Resolver para variáveis locais
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
 
 class Assignment(Expression):
     """Atribuição de valor a uma variável."""
+    __slots__ = ("name", "value", "depth", "slot")
     def __init__(self, name, value, token=None):
         super().__init__(token or name)
         self.name = name
         self.value = value
+        # Preenchidos pelo Resolver para variáveis locais
+        self.depth = None
+        self.slot = None
 
     def accept(self, visitor):
         return visitor.visit_assignment_expr(self)
 
 class Call(Expression):
     """Chamada de função."""
+    __slots__ = ("callee", "paren", "arguments")
     def __init__(self, callee, paren, arguments, token=None):
         super().__init__(token or paren)
         self.callee = callee
@@ -96,6 +175,7 @@ class Call(Expression):
 
 class ExpressionStatement(Statement):
     """Statement que consiste apenas em uma expressão (ex: 1 + 2;)."""
+    __slots__ = ("expression",)
     def __init__(self, expression, token=None):
         super().__init__(token)
         self.expression = expression
@@ -105,6 +185,7 @@ class ExpressionStatement(Statement):
 
 class PrintStatement(Statement):
     """Statement de impressão (ex: print "hello";)."""
+    __slots__ = ("expression",)
     def __init__(self, expression, token=None):
         super().__init__(token)
         self.expression = expression
@@ -114,25 +195,32 @@ class PrintStatement(Statement):
 
 class VarDeclaration(Statement):
     """Declaração de variável (ex: var x = 10;)."""
+    __slots__ = ("name", "initializer", "slot")
     def __init__(self, name, initializer, token=None):
         super().__init__(token or name)
         self.name = name
         self.initializer = initializer
+        self.slot = None  # Preenchido pelo Resolver fora do escopo global
 
     def accept(self, visitor):
         return visitor.visit_var_declaration_stmt(self)
 
 class BlockStatement(Statement):
     """Bloco de statements (ex: { statement1; statement2; })."""
+    __slots__ = ("statements", "slot_count")
     def __init__(self, statements, token=None):
         super().__init__(token)
-        self.statements = statements
+        # Tupla: compacta (sem espaço de sobra para crescer) e imutável,
+        # já que o bloco não muda depois de construído
+        self.statements = tuple(statements)
+        self.slot_count = None  # Preenchido pelo Resolver
 
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
 class IfStatement(Statement):
     """Statement condicional if/else."""
+    __slots__ = ("condition", "then_branch", "else_branch")
     def __init__(self, condition, then_branch, else_branch, token=None):
         super().__init__(token)
         self.condition = condition
@@ -144,6 +232,7 @@ class IfStatement(Statement):
 
 class WhileStatement(Statement):
     """Loop while."""
+    __slots__ = ("condition", "body")
     def __init__(self, condition, body, token=None):
         super().__init__(token)
         self.condition = condition
@@ -152,19 +241,42 @@ class WhileStatement(Statement):
     def accept(self, visitor):
         return visitor.visit_while_stmt(self)
 
+class ForStatement(Statement):
+    """Loop for: `init` roda uma vez; `increment`, ao fim de cada iteração."""
+    __slots__ = ("init", "condition", "increment", "body", "slot_count")
+    def __init__(self, init, condition, increment, body, token=None):
+        super().__init__(token)
+        self.init = init
+        self.condition = condition
+        self.increment = increment
+        self.body = body
+        self.slot_count = None  # Preenchido pelo Resolver (escopo de `init`)
+
+    def accept(self, visitor):
+        return visitor.visit_for_stmt(self)
+
 class FunctionDeclaration(Statement):
     """Declaração de função."""
+    __slots__ = ("name", "parameters", "body", "slot", "slot_count", "pure", "kernel")
     def __init__(self, name, parameters, body, token=None):
         super().__init__(token or name)
         self.name = name
         self.parameters = parameters
         self.body = body
+        # Preenchidos pelo Resolver: slot do nome, tamanho do ambiente da
+        # chamada e se o resultado depende só dos argumentos
+        self.slot = None
+        self.slot_count = None
+        self.pure = False
+        # Versão compilada por lox.jit (None: ainda não tentada; False: não compilável)
+        self.kernel = None
 
     def accept(self, visitor):
         return visitor.visit_function_declaration_stmt(self)
 
 class ReturnStatement(Statement):
     """Statement de retorno de função."""
+    __slots__ = ("keyword", "value")
     def __init__(self, keyword, value, token=None):
         super().__init__(token or keyword)
         self.keyword = keyword
@@ -180,6 +292,9 @@ class Visitor:
     def visit_binary_expr(self, expr):
         raise NotImplementedError
 
+    def visit_binary_chain_expr(self, expr):
+        raise NotImplementedError
+
     def visit_grouping_expr(self, expr):
         raise NotImplementedError
 
@@ -216,6 +331,9 @@ class Visitor:
     def visit_while_stmt(self, stmt):
         raise NotImplementedError
 
+    def visit_for_stmt(self, stmt):
+        raise NotImplementedError
+
     def visit_function_declaration_stmt(self, stmt):
         raise NotImplementedError
 
@@ -3,12 +3,79 @@ Parser para SimpleLang usando Lark.
 
 Este módulo implementa o analisador léxico e sintático para a linguagem SimpleLang.
 Utiliza a biblioteca Lark para parsing LALR baseado na gramática definida em grammar.lark.
+A construção direta da AST usa, por padrão, o parser descendente recursivo de
+lox/recursive_parser.py, que reconhece a mesma gramática sem passar pelo Lark.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from lark import Lark, LarkError
 from .errors import SimpleLangSyntaxError
+from .transformer import SimpleLangTransformer
+from .recursive_parser import RDParser
+
+# Com LOX_LARK_CYTHON=1 e o pacote `lark-cython` instalado, o laço do
+# analisador LALR roda em Cython. É opcional: os tokens gerados não são
+# instâncias de lark.Token.
+try:
+    if os.environ.get("LOX_LARK_CYTHON") != "1":
+        raise ImportError
+    import lark_cython
+except ImportError:
+    lark_cython = None
+
+
+# Tabelas LALR serializadas pelo Lark; o arquivo guarda o hash da gramática
+# e das opções, então uma gramática alterada invalida o cache sozinha.
+_PARSER_CACHE_PATH = Path(
+    "~/.cache/lox/parser-cython.pkl" if lark_cython else "~/.cache/lox/parser.pkl"
+).expanduser()
+
+
+def _parser_cache_file(with_positions=False):
+    """Retorna o caminho do cache em disco, ou False se não puder ser criado."""
+    try:
+        _PARSER_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return False
+    # `propagate_positions` entra no hash: cada variante tem seu arquivo,
+    # senão uma sobrescreveria o cache da outra
+    if with_positions:
+        return str(_PARSER_CACHE_PATH.with_name(_PARSER_CACHE_PATH.stem + "-positions.pkl"))
+    return str(_PARSER_CACHE_PATH)
+
+
+@lru_cache(maxsize=4)
+def _build_lark(grammar, inline_transformer=False, with_positions=False):
+    """
+    Constrói o Lark de `grammar` uma única vez por processo.
+
+    O objeto não guarda estado entre chamadas de `parse`, então todas as
+    instâncias de Parser podem compartilhá-lo.
+
+    Com `inline_transformer`, o SimpleLangTransformer é chamado a cada
+    redução do LALR e o parse já devolve a AST, sem criar a árvore do Lark.
+
+    Com `with_positions`, cada nó da árvore recebe linha e coluna em `meta`
+    (usadas só pelo ASTBuilder); sem ele, o Lark não preenche esses campos.
+    """
+    options = {}
+    if lark_cython is not None:
+        options["_plugins"] = lark_cython.plugins
+    if inline_transformer:
+        options["transformer"] = SimpleLangTransformer()
+    # As duas regras iniciais compartilham as mesmas tabelas LALR;
+    # `expression` é usada pelo REPL para avaliar expressões soltas
+    return Lark(
+        grammar,
+        start=['program', 'expression'],
+        parser='lalr',
+        propagate_positions=with_positions,
+        maybe_placeholders=False,
+        cache=_parser_cache_file(with_positions),
+        **options
+    )
 
 
 class Parser:
@@ -19,16 +86,25 @@ class Parser:
     para fazer parsing de código fonte SimpleLang.
     """
     
-    def __init__(self):
-        """Inicializa o parser carregando a gramática."""
+    def __init__(self, recursive=True, with_positions=False):
+        """
+        Inicializa o parser carregando a gramática.
+        
+        Args:
+            recursive (bool): `parse_ast` usa o parser descendente recursivo;
+                com False, usa o Lark com o transformer embutido
+            with_positions (bool): Guarda linha e coluna nos nós da árvore do
+                Lark (necessário para as posições do ASTBuilder). Erros de
+                sintaxe informam a posição de qualquer forma.
+        """
+        self.recursive = recursive
         self._load_grammar()
-        self.parser = Lark(
-            self.grammar,
-            start='program',
-            parser='lalr',
-            propagate_positions=True,
-            maybe_placeholders=False
-        )
+        self.parser = _build_lark(self.grammar, with_positions=with_positions)
+    
+    @property
+    def ast_parser(self):
+        """Lark com o transformer embutido, carregado só se `parse_ast` o usar."""
+        return _build_lark(self.grammar, inline_transformer=True)
     
     def _load_grammar(self):
         """Carrega a gramática do arquivo grammar.lark."""
@@ -55,8 +131,49 @@ class Parser:
         Raises:
             SimpleLangSyntaxError: Em caso de erro de sintaxe
         """
+        return self._parse(source_code, 'program', filename)
+    
+    def parse_ast(self, source_code, filename="<string>"):
+        """
+        Faz o parsing do código fonte e já constrói a AST.
+        
+        Equivale a `transform_to_ast(parse(...))`, mas os nós são criados
+        durante o parsing, sem a árvore intermediária do Lark.
+        Por padrão nem o Lark é usado (ver RDParser).
+        
+        Args:
+            source_code (str): Código fonte a ser analisado
+            filename (str): Nome do arquivo (para relatórios de erro)
+            
+        Returns:
+            list: Lista de statements da AST
+            
+        Raises:
+            SimpleLangSyntaxError: Em caso de erro de sintaxe
+        """
+        if self.recursive:
+            return RDParser(source_code, filename).parse_program()
+        return self._parse(source_code, 'program', filename, self.ast_parser)
+    
+    def parse_expression(self, source_code, filename="<string>"):
+        """
+        Faz o parsing de uma única expressão (sem `;`).
+        
+        Args:
+            source_code (str): Código fonte da expressão
+            filename (str): Nome do arquivo (para relatórios de erro)
+            
+        Returns:
+            Tree: Árvore sintática da expressão
+            
+        Raises:
+            SimpleLangSyntaxError: Em caso de erro de sintaxe
+        """
+        return self._parse(source_code, 'expression', filename)
+    
+    def _parse(self, source_code, start, filename, lark=None):
         try:
-            return self.parser.parse(source_code)
+            return (lark or self.parser).parse(source_code, start=start)
         except LarkError as e:
             # Converte erros do Lark para nosso formato de erro
             raise SimpleLangSyntaxError(f"Erro de sintaxe em {filename}: {e}")
@@ -84,7 +201,18 @@ class Parser:
             raise SimpleLangSyntaxError(f"Erro ao ler arquivo {filepath}: {e}")
 
 
+_PARSER = None
+
+
 def create_parser():
-    """Factory function para criar uma instância do parser."""
-    return Parser()
+    """
+    Retorna o parser compartilhado pelo processo, criando-o na primeira chamada.
+    
+    O Lark já é compartilhado entre instâncias (ver `_build_lark`); com uma
+    única instância também a gramática é lida do disco uma só vez.
+    """
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = Parser()
+    return _PARSER
 
@@ -0,0 +1,138 @@
+"""
+Execução de programas SimpleLang traduzidos para Python.
+
+O programa é traduzido por lox/transpiler.py, compilado com `compile()` e
+executado com `exec()` no interpretador de bytecode do CPython.
+"""
+
+from functools import partial
+from types import FunctionType
+
+from .ctx import _SENTINEL
+from .runtime import Interpreter
+from .transpiler import GLOBAL_PREFIX, NotTranspilable, transpile
+from .errors import (
+    SimpleLangRuntimeError, SimpleLangUndefinedVariableError
+)
+
+
+class PythonBackend(Interpreter):
+    """
+    Executa programas SimpleLang traduzidos para Python.
+
+    Herda do Interpreter as regras de operadores e formatação, usadas pelos
+    auxiliares do código gerado. Programas que não podem ser traduzidos
+    são executados pelo próprio Interpreter.
+    """
+
+    def __init__(self, memoize=True, jit=True, output=None):
+        """
+        Args:
+            memoize (bool | Iterable[str]): Reaproveita resultados de funções
+                puras (e das funções com esses nomes; ver Interpreter)
+            jit (bool): Usado só quando o programa volta para o Interpreter
+            output: Arquivo onde `print` escreve (None: o sys.stdout atual)
+        """
+        super().__init__(memoize, jit, output)
+        # Globais do código gerado, mantidas entre chamadas de `interpret`
+        self.namespace = {
+            "_add": self._add,
+            "_sub": self._subtract,
+            "_mul": self._multiply,
+            "_div": self._divide,
+            "_mod": self._modulo,
+            "_neg": self._negate,
+            "_str": self._stringify,
+            "_function": self._function,
+            "_assign_global": self._assign_global,
+        }
+
+    def interpret(self, statements, filename="<simplelang>"):
+        """
+        Traduz e executa uma lista de statements.
+
+        Args:
+            statements (list): Lista de nós AST (statements)
+            filename (str): Nome mostrado nos tracebacks do Python
+        """
+        try:
+            module = transpile(statements)
+        except NotTranspilable:
+            super().interpret(statements)
+            return
+
+        code = compile(module, filename, "exec")
+        # O código gerado chama `print` direto; com `output` definido, o nome
+        # aponta para um print que já escreve nele
+        output = self.output
+        self.namespace["print"] = print if output is None else partial(print, file=output)
+        try:
+            exec(code, self.namespace)
+        except NameError as error:
+            # Só as globais podem faltar; um UnboundLocalError (ou outro nome)
+            # seria um erro do próprio tradutor e segue como está
+            name = error.name or ""
+            if isinstance(error, UnboundLocalError) or not name.startswith(GLOBAL_PREFIX):
+                raise
+            raise SimpleLangUndefinedVariableError(name[len(GLOBAL_PREFIX):]) from None
+        except RecursionError:
+            raise SimpleLangRuntimeError("Recursão muito profunda") from None
+        except TypeError as error:
+            # Chamada de algo que não é função ou com o número errado de argumentos
+            raise SimpleLangRuntimeError(f"Erro de execução: {error}") from None
+
+    def reset(self):
+        """Descarta também as globais do código gerado."""
+        super().reset()
+        namespace = self.namespace
+        for key in [key for key in namespace if key.startswith(GLOBAL_PREFIX)]:
+            del namespace[key]
+
+    def _assign_global(self, name, value):
+        key = GLOBAL_PREFIX + name
+        namespace = self.namespace
+        if key not in namespace:
+            raise SimpleLangUndefinedVariableError(name)
+        namespace[key] = value
+        return value
+
+    def _function(self, name, pure, python_name):
+        """
+        Decorador das funções geradas: nome da SimpleLang e memoização.
+
+        `python_name` é a variável Python que guarda a função. Se a função
+        chama a si mesma por ela, a memoização só vale enquanto a variável
+        ainda aponta para a função (como em SimpleLangFunction._is_bound).
+        """
+        def decorate(function):
+            function.__name__ = name
+            if not self.memoize or not (pure or name in self.memoize_names):
+                return function
+            memo = {}
+            code = function.__code__
+            if python_name in code.co_freevars:
+                cell = function.__closure__[code.co_freevars.index(python_name)]
+                is_bound = lambda: cell.cell_contents is memoized
+            elif python_name in code.co_names:
+                is_bound = lambda: function.__globals__.get(python_name) is memoized
+            else:
+                is_bound = None
+
+            def memoized(*arguments):
+                if is_bound is not None and not is_bound():
+                    return function(*arguments)
+                # O tipo entra na chave para que f(1), f(1.0) e f(true) não se confundam
+                key = (arguments, tuple(map(type, arguments)))
+                value = memo.get(key, _SENTINEL)
+                if value is _SENTINEL:
+                    value = memo[key] = function(*arguments)
+                return value
+
+            memoized.__name__ = name
+            return memoized
+        return decorate
+
+    def _stringify(self, obj):
+        if type(obj) is FunctionType:
+            return f"<função {obj.__name__}>"
+        return super()._stringify(obj)
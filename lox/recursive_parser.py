@@ -0,0 +1,399 @@
+"""
+Parser descendente recursivo para SimpleLang.
+
+Reconhece a mesma linguagem de grammar.lark, mas sem o Lark: um analisador
+léxico baseado numa única expressão regular gera a lista de tokens, e um
+método por nível de precedência constrói diretamente os nós da AST (os
+mesmos que o SimpleLangTransformer produziria), sem a árvore intermediária.
+"""
+
+import re
+from sys import intern
+
+from .node import *
+from .ast import _FOLD, _UNARY_FOLD, _NO_FOLD, _literal
+from .transformer import _constant
+from .errors import SimpleLangSyntaxError
+
+
+# Espaços e comentários são descartados; o grupo que casou (lastgroup) dá o
+# tipo do token. "!=", "==", ">=" e "<=" vêm antes dos operadores de um
+# caractere para que o casamento seja o mais longo.
+_TOKEN_RE = re.compile(r"""
+    (?P<SKIP>\s+|//[^\n]*)
+  | (?P<NUMBER>\d+(?:\.\d+)?)
+  | (?P<STRING>"(?:[^"\\]|\\.)*")
+  | (?P<IDENTIFIER>[a-zA-Z_][a-zA-Z0-9_]*)
+  | (?P<PUNCTUATION>!=|==|>=|<=|[-+*/%!=<>(){},;])
+""", re.VERBOSE)
+
+# O tipo de palavras-chave e pontuação é o próprio lexema; os demais tipos
+# são os nomes dos terminais da gramática
+_KEYWORDS = {
+    word: word for word in (
+        "var", "fun", "if", "else", "while", "for", "return", "print",
+        "true", "false", "nil", "and", "or",
+    )
+}
+_PUNCTUATION = {
+    symbol: symbol for symbol in (
+        "!=", "==", ">=", "<=", "-", "+", "*", "/", "%", "!", "=", "<", ">",
+        "(", ")", "{", "}", ",", ";",
+    )
+}
+
+_EQUALITY = ("!=", "==")
+_COMPARISON = (">", ">=", "<", "<=")
+_TERM = ("-", "+")
+_FACTOR = ("/", "*", "%")
+_UNARY = ("!", "-")
+
+_LITERALS = {"true": True, "false": False, "nil": None}
+
+
+def tokenize(source, filename="<string>"):
+    """
+    Divide `source` em tokens.
+
+    Returns:
+        list: Tuplas (tipo, lexema, posição), terminadas por ("EOF", "", len(source))
+
+    Raises:
+        SimpleLangSyntaxError: Se houver um caractere que não inicia nenhum token
+    """
+    tokens = []
+    append = tokens.append
+    match = _TOKEN_RE.match
+    position = 0
+    end = len(source)
+    while position < end:
+        found = match(source, position)
+        if found is None:
+            line, column = _location(source, position)
+            raise SimpleLangSyntaxError(
+                f"Caractere inesperado {source[position]!r}", line, column, filename
+            )
+        kind = found.lastgroup
+        text = found.group()
+        if kind == "IDENTIFIER":
+            keyword = _KEYWORDS.get(text)
+            if keyword is None:
+                # Nomes internados: cada ocorrência de `i` é o mesmo objeto
+                append((kind, intern(text), position))
+            else:
+                append((keyword, text, position))
+        elif kind == "PUNCTUATION":
+            append((_PUNCTUATION[text], text, position))
+        elif kind != "SKIP":
+            append((kind, text, position))
+        position = found.end()
+    append(("EOF", "", end))
+    return tokens
+
+
+def _location(source, position):
+    """Converte um índice de `source` em (linha, coluna), ambas a partir de 1."""
+    line = source.count("\n", 0, position) + 1
+    column = position - source.rfind("\n", 0, position)
+    return line, column
+
+
+class RDParser:
+    """
+    Parser descendente recursivo de SimpleLang.
+
+    Cada nível de precedência da gramática tem seu método, do menos para o
+    mais prioritário: assignment, logical_or, logical_and, equality,
+    comparison, term, factor, unary, call e primary.
+    """
+
+    def __init__(self, source, filename="<string>"):
+        """
+        Args:
+            source (str): Código fonte
+            filename (str): Nome do arquivo (para relatórios de erro)
+        """
+        self.source = source
+        self.filename = filename
+        self.tokens = tokenize(source, filename)
+        self.current = 0
+
+    def parse_program(self):
+        """
+        Analisa um programa completo.
+
+        Returns:
+            list: Lista de statements da AST
+
+        Raises:
+            SimpleLangSyntaxError: Em caso de erro de sintaxe
+        """
+        statements = []
+        while self.tokens[self.current][0] != "EOF":
+            statements.append(self.statement())
+        return statements
+
+    def parse_expression(self):
+        """
+        Analisa uma única expressão (sem `;`), que deve ocupar toda a entrada.
+
+        Returns:
+            Expression: Nó da expressão
+        """
+        expr = self.expression()
+        self._expect("EOF", "fim da expressão")
+        return expr
+
+    # --- Tokens ---
+
+    def _peek(self):
+        return self.tokens[self.current][0]
+
+    def _advance(self):
+        token = self.tokens[self.current]
+        self.current += 1
+        return token
+
+    def _match(self, kind):
+        """Consome o token atual se ele for do tipo `kind`."""
+        if self.tokens[self.current][0] == kind:
+            self.current += 1
+            return True
+        return False
+
+    def _expect(self, kind, description=None):
+        """Consome e retorna o token atual, que precisa ser do tipo `kind`."""
+        token = self.tokens[self.current]
+        if token[0] != kind:
+            raise self._error(token, description or f"'{kind}'")
+        self.current += 1
+        return token
+
+    def _error(self, token, expected):
+        line, column = _location(self.source, token[2])
+        found = "fim do arquivo" if token[0] == "EOF" else repr(token[1])
+        return SimpleLangSyntaxError(
+            f"Esperado {expected}, encontrado {found}", line, column, self.filename
+        )
+
+    # --- Statements ---
+
+    def statement(self):
+        kind = self._peek()
+        if kind == "var":
+            return self.var_declaration()
+        if kind == "fun":
+            return self.function_declaration()
+        if kind == "if":
+            return self.if_statement()
+        if kind == "while":
+            return self.while_statement()
+        if kind == "for":
+            return self.for_statement()
+        if kind == "return":
+            return self.return_statement()
+        if kind == "{":
+            return self.block_statement()
+        if kind == "print":
+            self.current += 1
+            value = self.expression()
+            self._expect(";")
+            return PrintStatement(value)
+        return self.expression_statement()
+
+    def expression_statement(self):
+        expr = self.expression()
+        self._expect(";")
+        return ExpressionStatement(expr)
+
+    def var_declaration(self):
+        self.current += 1
+        name = self._expect("IDENTIFIER", "nome da variável")[1]
+        initializer = self.expression() if self._match("=") else None
+        self._expect(";")
+        return VarDeclaration(name, initializer)
+
+    def function_declaration(self):
+        self.current += 1
+        name = self._expect("IDENTIFIER", "nome da função")[1]
+        self._expect("(")
+        parameters = []
+        if self._peek() != ")":
+            parameters.append(self._expect("IDENTIFIER", "nome do parâmetro")[1])
+            while self._match(","):
+                parameters.append(self._expect("IDENTIFIER", "nome do parâmetro")[1])
+        self._expect(")")
+        if self._peek() != "{":
+            raise self._error(self.tokens[self.current], "'{'")
+        return FunctionDeclaration(name, parameters, self.block_statement())
+
+    def if_statement(self):
+        self.current += 1
+        self._expect("(")
+        condition = self.expression()
+        self._expect(")")
+        then_branch = self.statement()
+        else_branch = self.statement() if self._match("else") else None
+        return IfStatement(condition, then_branch, else_branch)
+
+    def while_statement(self):
+        self.current += 1
+        self._expect("(")
+        condition = self.expression()
+        self._expect(")")
+        return WhileStatement(condition, self.statement())
+
+    def for_statement(self):
+        """For statement."""
+        self.current += 1
+        self._expect("(")
+        kind = self._peek()
+        if kind == ";":
+            self.current += 1
+            init = None
+        elif kind == "var":
+            init = self.var_declaration()
+        else:
+            init = self.expression_statement()
+
+        condition = _literal(True) if self._peek() == ";" else self.expression()
+        self._expect(";")
+        increment = None if self._peek() == ")" else self.expression()
+        self._expect(")")
+        return ForStatement(init, condition, increment, self.statement())
+
+    def return_statement(self):
+        self.current += 1
+        value = None if self._peek() == ";" else self.expression()
+        self._expect(";")
+        return ReturnStatement("return", value)
+
+    def block_statement(self):
+        self._expect("{")
+        statements = []
+        while self._peek() != "}":
+            if self._peek() == "EOF":
+                raise self._error(self.tokens[self.current], "'}'")
+            statements.append(self.statement())
+        self.current += 1
+        return BlockStatement(statements)
+
+    # --- Expressões ---
+
+    def expression(self):
+        return self.assignment()
+
+    def assignment(self):
+        expr = self.logical_or()
+        if self._peek() == "=":
+            # Só um identificador pode receber atribuição
+            if type(expr) is not Variable:
+                raise self._error(self.tokens[self.current], "';'")
+            self.current += 1
+            return Assignment(expr.name, self.assignment())
+        return expr
+
+    def logical_or(self):
+        expr = self.logical_and()
+        while self._peek() == "or":
+            operator = self._advance()[1]
+            expr = _fold_binary(expr, operator, self.logical_and())
+        return expr
+
+    def logical_and(self):
+        expr = self.equality()
+        while self._peek() == "and":
+            operator = self._advance()[1]
+            expr = _fold_binary(expr, operator, self.equality())
+        return expr
+
+    def equality(self):
+        expr = self.comparison()
+        while self._peek() in _EQUALITY:
+            operator = self._advance()[1]
+            expr = _fold_binary(expr, operator, self.comparison())
+        return expr
+
+    def comparison(self):
+        expr = self.term()
+        while self._peek() in _COMPARISON:
+            operator = self._advance()[1]
+            expr = _fold_binary(expr, operator, self.term())
+        return expr
+
+    def term(self):
+        expr = self.factor()
+        while self._peek() in _TERM:
+            operator = self._advance()[1]
+            expr = _fold_binary(expr, operator, self.factor())
+        return expr
+
+    def factor(self):
+        expr = self.unary()
+        while self._peek() in _FACTOR:
+            operator = self._advance()[1]
+            expr = _fold_binary(expr, operator, self.unary())
+        return expr
+
+    def unary(self):
+        if self._peek() in _UNARY:
+            operator = self._advance()[1]
+            right = self.unary()
+            value = _constant(right)
+            if value is not _NO_FOLD:
+                folded = _UNARY_FOLD[operator](value)
+                if folded is not _NO_FOLD:
+                    return _literal(folded)
+            return Unary(operator, right)
+        return self.call()
+
+    def call(self):
+        expr = self.primary()
+        while self._match("("):
+            arguments = []
+            if self._peek() != ")":
+                arguments.append(self.expression())
+                while self._match(","):
+                    arguments.append(self.expression())
+            self._expect(")")
+            expr = Call(expr, None, arguments)
+        return expr
+
+    def primary(self):
+        kind, text, _ = token = self._advance()
+        if kind == "NUMBER":
+            return _literal(float(text) if "." in text else int(text))
+        if kind == "IDENTIFIER":
+            return Variable(text)
+        if kind == "STRING":
+            return Literal(text[1:-1])
+        if kind in _LITERALS:
+            return _literal(_LITERALS[kind])
+        if kind == "(":
+            expr = self.expression()
+            self._expect(")")
+            return Grouping(expr)
+        raise self._error(token, "expressão")
+
+
+def _fold_binary(left, operator, right):
+    """Dobra operações entre literais (ex: 2 * 3600) em um único Literal."""
+    fold = _FOLD.get(operator)
+    if fold is not None:
+        left_value = _constant(left)
+        right_value = _constant(right)
+        if left_value is not _NO_FOLD and right_value is not _NO_FOLD:
+            folded = fold(left_value, right_value)
+            if folded is not _NO_FOLD:
+                return _literal(folded)
+    return Binary(left, operator, right)
+
+
+def parse_program(source, filename="<string>"):
+    """
+    Função utilitária: analisa `source` e retorna a lista de statements da AST.
+
+    Raises:
+        SimpleLangSyntaxError: Em caso de erro de sintaxe
+    """
+    return RDParser(source, filename).parse_program()
@@ -0,0 +1,334 @@
+"""
+Resolução estática de variáveis para SimpleLang.
+
+Este módulo percorre a AST uma vez antes da execução e anota cada acesso
+a variável local com a distância até o escopo que a declara (`depth`) e a
+posição dela nesse escopo (`slot`). Em tempo de execução o interpretador
+usa esses índices para ler e escrever direto na lista de slots do ambiente,
+sem procurar o nome em dicionários a cada acesso.
+
+Variáveis globais não são resolvidas: continuam sendo buscadas pelo nome,
+o que permite declarar funções que chamam outras definidas mais adiante.
+
+Na mesma passada o resolvedor marca como puras (`FunctionDeclaration.pure`)
+as funções cujo resultado depende só dos argumentos, que podem então ser
+memoizadas por SimpleLangFunction.
+
+Ao final, uma inferência de tipos simples marca as expressões binárias
+cujos operandos são sempre números (`Binary.numeric`); o interpretador pula
+as verificações de tipo nelas.
+"""
+
+from .node import *
+from .errors import SimpleLangSyntaxError
+
+
+# Operadores que, entre números, dispensam as verificações do interpretador
+# (divisão e resto ainda precisam checar o zero)
+_NUMERIC_FAST_OPS = frozenset((
+    BinOp.ADD, BinOp.SUB, BinOp.MUL,
+    BinOp.GT, BinOp.GE, BinOp.LT, BinOp.LE,
+))
+_ARITHMETIC_OPS = frozenset((BinOp.ADD, BinOp.SUB, BinOp.MUL, BinOp.DIV, BinOp.MOD))
+
+
+class _Binding:
+    """
+    Uma variável local declarada e os valores que ela pode receber.
+
+    `values` é None quando o valor não é conhecido estaticamente
+    (parâmetros, funções, `var x;`).
+    """
+
+    __slots__ = ("values", "numeric")
+
+    def __init__(self, values=None):
+        self.values = values
+        self.numeric = values is not None
+
+
+class Resolver(Visitor):
+    """
+    Anota a AST com os índices (depth, slot) das variáveis locais.
+
+    Mantém uma pilha de escopos; cada escopo é um dicionário nome -> slot,
+    e `sizes` guarda quantos slots cada escopo já reservou.
+    """
+
+    def __init__(self):
+        """Inicializa o resolvedor com a pilha de escopos vazia (global)."""
+        self.scopes = []
+        self.sizes = []
+        # Paralela a `scopes`: nome -> _Binding
+        self.bindings = []
+        # Variable/Assignment locais -> _Binding, e os Binary vistos, para a
+        # inferência de tipos numéricos
+        self.references = {}
+        self.binaries = []
+        # Funções sendo resolvidas: (declaração, índice do escopo da função)
+        self.functions = []
+
+    def resolve(self, statements):
+        """
+        Resolve uma lista de statements.
+
+        Args:
+            statements (list): Lista de nós AST (statements)
+        """
+        self._resolve_statements(statements)
+        self._infer_numeric()
+
+    def _resolve_statements(self, statements):
+        for statement in statements:
+            statement.accept(self)
+
+    def _resolve_expr(self, expr):
+        if expr is not None:
+            expr.accept(self)
+
+    def _declare(self, name, value=None):
+        """
+        Declara `name` no escopo atual e retorna seu slot (None se global).
+
+        `value` é a expressão atribuída na declaração, se conhecida.
+        """
+        if not self.scopes:
+            return None
+        scope = self.scopes[-1]
+        slot = scope.get(name)
+        if slot is None:
+            slot = self.sizes[-1]
+            scope[name] = slot
+            self.sizes[-1] = slot + 1
+            self.bindings[-1][name] = _Binding([] if value is not None else None)
+        # Redeclaração no mesmo escopo reaproveita o slot
+        self._add_value(self.bindings[-1][name], value)
+        return slot
+
+    def _add_value(self, binding, value):
+        if value is None:
+            binding.values = None
+            binding.numeric = False
+        elif binding.values is not None:
+            binding.values.append(value)
+
+    def _begin_scope(self, scope=None, size=0):
+        scope = scope if scope is not None else {}
+        self.scopes.append(scope)
+        self.sizes.append(size)
+        self.bindings.append({name: _Binding() for name in scope})
+
+    def _end_scope(self):
+        """Fecha o escopo atual e retorna quantos slots ele usa."""
+        self.scopes.pop()
+        self.bindings.pop()
+        return self.sizes.pop()
+
+    def _resolve_local(self, expr, name):
+        """Procura `name` do escopo mais interno para o mais externo."""
+        for depth, scope in enumerate(reversed(self.scopes)):
+            slot = scope.get(name)
+            if slot is not None:
+                expr.depth = depth
+                expr.slot = slot
+                self.references[expr] = self.bindings[-1 - depth][name]
+                break
+        else:
+            # Não é local: fica para a busca por nome no ambiente global
+            expr.depth = None
+            expr.slot = None
+        
+        if self.functions and not self._is_function_local(expr):
+            self._mark_impure()
+    
+    def _is_function_local(self, expr):
+        """Diz se `expr` (já resolvida) aponta para um escopo da função atual."""
+        if expr.slot is None:
+            return False
+        _, base = self.functions[-1]
+        return len(self.scopes) - 1 - expr.depth >= base
+    
+    def _is_self_call(self, callee):
+        """Diz se `callee` é o nome da própria função sendo resolvida."""
+        function, base = self.functions[-1]
+        if not isinstance(callee, Variable) or callee.name != function.name:
+            return False
+        if function.slot is None:
+            return callee.slot is None
+        return callee.slot == function.slot and len(self.scopes) - 1 - callee.depth == base - 1
+    
+    def _mark_impure(self):
+        """O resultado da função atual pode depender de algo além dos argumentos."""
+        if self.functions:
+            self.functions[-1][0].pure = False
+
+    def _infer_numeric(self):
+        """
+        Marca `Binary.numeric` nas expressões cujos operandos são sempre números.
+
+        Parte do otimismo (toda variável local com valores conhecidos é
+        numérica) e descarta as que recebem algum valor não numérico até
+        nada mudar; assim `i = i + 1` continua numérica.
+        """
+        bindings = set(self.references.values())
+        changed = True
+        while changed:
+            changed = False
+            for binding in bindings:
+                if binding.numeric and not all(self._is_numeric(value) for value in binding.values):
+                    binding.numeric = False
+                    changed = True
+        for expr in self.binaries:
+            expr.numeric = (
+                expr.op in _NUMERIC_FAST_OPS
+                and self._is_numeric(expr.left)
+                and self._is_numeric(expr.right)
+            )
+
+    def _is_numeric(self, expr):
+        expr_type = type(expr)
+        if expr_type is Literal:
+            # bool fica de fora: true + 1 não é uma soma de números
+            return type(expr.value) is int or type(expr.value) is float
+        if expr_type is Variable:
+            binding = self.references.get(expr)
+            return binding is not None and binding.numeric
+        if expr_type is Grouping:
+            return self._is_numeric(expr.expression)
+        if expr_type is Assignment:
+            return self._is_numeric(expr.value)
+        if expr_type is Unary:
+            return expr.op == UnaryOp.NEG and self._is_numeric(expr.right)
+        if expr_type is Binary:
+            return expr.op in _ARITHMETIC_OPS and self._is_numeric(expr.left) and self._is_numeric(expr.right)
+        if expr_type is BinaryChain:
+            return expr.op in _ARITHMETIC_OPS and all(self._is_numeric(operand) for operand in expr.operands)
+        return False
+
+    # --- Expressões ---
+
+    def visit_binary_expr(self, expr):
+        expr.left.accept(self)
+        expr.right.accept(self)
+        self.binaries.append(expr)
+
+    def visit_binary_chain_expr(self, expr):
+        for operand in expr.operands:
+            operand.accept(self)
+
+    def visit_grouping_expr(self, expr):
+        expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        pass
+
+    def visit_unary_expr(self, expr):
+        expr.right.accept(self)
+
+    def visit_variable_expr(self, expr):
+        self._resolve_local(expr, expr.name)
+
+    def visit_assignment_expr(self, expr):
+        expr.value.accept(self)
+        self._resolve_local(expr, expr.name)
+        binding = self.references.get(expr)
+        if binding is not None:
+            self._add_value(binding, expr.value)
+
+    def visit_call_expr(self, expr):
+        if self.functions and isinstance(expr.callee, Variable):
+            # Chamar a si mesma não quebra a pureza; chamar qualquer outra
+            # coisa pode ter efeitos colaterais
+            pure = self.functions[-1][0].pure
+            expr.callee.accept(self)
+            if self._is_self_call(expr.callee):
+                self.functions[-1][0].pure = pure
+            else:
+                self._mark_impure()
+        else:
+            expr.callee.accept(self)
+            self._mark_impure()
+        for argument in expr.arguments:
+            argument.accept(self)
+
+    # --- Statements ---
+
+    def visit_expression_stmt(self, stmt):
+        stmt.expression.accept(self)
+
+    def visit_print_stmt(self, stmt):
+        self._mark_impure()
+        stmt.expression.accept(self)
+
+    def visit_var_declaration_stmt(self, stmt):
+        # O inicializador é resolvido antes: `var x = x;` lê o x de fora
+        self._resolve_expr(stmt.initializer)
+        stmt.slot = self._declare(stmt.name, stmt.initializer)
+
+    def visit_block_stmt(self, stmt):
+        self._begin_scope()
+        try:
+            self._resolve_statements(stmt.statements)
+        finally:
+            stmt.slot_count = self._end_scope()
+
+    def visit_if_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.then_branch.accept(self)
+        if stmt.else_branch:
+            stmt.else_branch.accept(self)
+
+    def visit_while_stmt(self, stmt):
+        stmt.condition.accept(self)
+        stmt.body.accept(self)
+
+    def visit_for_stmt(self, stmt):
+        # `init` ganha um escopo que envolve todo o laço
+        self._begin_scope()
+        try:
+            if stmt.init is not None:
+                stmt.init.accept(self)
+            stmt.condition.accept(self)
+            stmt.body.accept(self)
+            self._resolve_expr(stmt.increment)
+        finally:
+            stmt.slot_count = self._end_scope()
+
+    def visit_function_declaration_stmt(self, stmt):
+        # O nome é declarado antes do corpo para permitir recursão
+        stmt.slot = self._declare(stmt.name)
+        # Uma closure criada a cada chamada não pode ser reaproveitada
+        self._mark_impure()
+
+        # Parâmetros e statements do corpo dividem o mesmo ambiente na chamada;
+        # o parâmetro i ocupa o slot i
+        scope = {parameter: index for index, parameter in enumerate(stmt.parameters)}
+        self._begin_scope(scope, len(stmt.parameters))
+        self.functions.append((stmt, len(self.scopes) - 1))
+        stmt.pure = True
+        try:
+            self._resolve_statements(stmt.body.statements)
+        finally:
+            self.functions.pop()
+            stmt.slot_count = self._end_scope()
+
+    def visit_return_stmt(self, stmt):
+        # O retorno é sinalizado ao SimpleLangFunction.call; fora de uma
+        # função não há quem o receba
+        if not self.functions:
+            raise SimpleLangSyntaxError("'return' fora de uma função")
+        self._resolve_expr(stmt.value)
+
+
+def resolve(statements):
+    """
+    Função utilitária para resolver as variáveis de um programa.
+
+    Args:
+        statements (list): Lista de statements da AST
+
+    Returns:
+        list: A mesma lista, com os nós anotados
+    """
+    Resolver().resolve(statements)
+    return statements
@@ -4,9 +4,29 @@ Interpretador para SimpleLang.
 Este módulo contém a lógica para percorrer a AST e executar o código SimpleLang.
 """
 
+import operator
+
 from .node import *
-from .ctx import Context, SimpleLangFunction, SimpleLangCallable, Environment
-from .errors import SimpleLangRuntimeError, SimpleLangDivisionByZeroError, SimpleLangReturnException, SimpleLangTypeError
+from .ctx import Context, SimpleLangFunction, SimpleLangCallable, Environment, _SENTINEL
+from .resolver import Resolver
+from .errors import SimpleLangRuntimeError, SimpleLangDivisionByZeroError, SimpleLangTypeError
+
+
+# Operações entre dois números que dispensam as verificações de tipo,
+# indexadas por BinOp (None: divisão e resto precisam checar o zero)
+_NUMERIC_BINARY_OPERATORS = (
+    operator.add,
+    operator.sub,
+    operator.mul,
+    None,
+    None,
+    operator.eq,
+    operator.ne,
+    operator.gt,
+    operator.ge,
+    operator.lt,
+    operator.le,
+)
 
 
 class Interpreter(Visitor):
@@ -17,9 +37,80 @@ class Interpreter(Visitor):
     os statements e expressões.
     """
     
-    def __init__(self):
-        """Inicializa o interpretador com um contexto global."""
+    def __init__(self, memoize=True, jit=True, output=None):
+        """
+        Inicializa o interpretador com um contexto global.
+        
+        Args:
+            memoize (bool | Iterable[str]): Reaproveita resultados de funções
+                puras. Uma coleção de nomes liga a memoização e a estende a
+                essas funções, mesmo que o Resolver não as marque como puras
+                (útil em testes; quem passa os nomes garante que não há
+                efeitos colaterais)
+            jit (bool): Executa funções numéricas compiladas por lox.jit
+            output: Arquivo onde `print` escreve (None: o sys.stdout atual)
+        """
+        self.context = Context()
+        if isinstance(memoize, bool):
+            self.memoize = memoize
+            self.memoize_names = frozenset()
+        else:
+            self.memoize = True
+            self.memoize_names = frozenset(memoize)
+        self.jit = jit
+        self.output = output
+        # Protocolo de retorno: `return` guarda o valor em `_return_value`;
+        # os laços de execução param assim que ele deixa de ser _SENTINEL e
+        # a chamada da função (SimpleLangFunction.call) lê o valor e volta o
+        # campo para _SENTINEL.
+        self._return_value = _SENTINEL
+        # Tabela de despacho indexada por BinOp (and/or são tratados à parte)
+        self._binary_handlers = [
+            self._add,
+            self._subtract,
+            self._multiply,
+            self._divide,
+            self._modulo,
+            operator.eq,
+            operator.ne,
+            operator.gt,
+            operator.ge,
+            operator.lt,
+            operator.le,
+        ]
+        # Despacho direto pelo tipo do nó: um acesso a dicionário e uma
+        # chamada, sem o par accept -> visit_* do Visitor
+        self._expr_dispatch = {
+            Binary: self.visit_binary_expr,
+            BinaryChain: self.visit_binary_chain_expr,
+            Grouping: self.visit_grouping_expr,
+            Literal: self.visit_literal_expr,
+            Unary: self.visit_unary_expr,
+            Variable: self.visit_variable_expr,
+            Assignment: self.visit_assignment_expr,
+            Call: self.visit_call_expr,
+        }
+        self._stmt_dispatch = {
+            ExpressionStatement: self.visit_expression_stmt,
+            PrintStatement: self.visit_print_stmt,
+            VarDeclaration: self.visit_var_declaration_stmt,
+            BlockStatement: self.visit_block_stmt,
+            IfStatement: self.visit_if_stmt,
+            WhileStatement: self.visit_while_stmt,
+            ForStatement: self.visit_for_stmt,
+            FunctionDeclaration: self.visit_function_declaration_stmt,
+            ReturnStatement: self.visit_return_stmt,
+        }
+    
+    def reset(self):
+        """
+        Descarta as variáveis e funções globais, como num interpretador novo.
+        
+        As tabelas de despacho e as opções são mantidas, então vários
+        programas independentes podem rodar na mesma instância.
+        """
         self.context = Context()
+        self._return_value = _SENTINEL
     
     def interpret(self, statements):
         """
@@ -28,16 +119,18 @@ class Interpreter(Visitor):
         Args:
             statements (list): Lista de nós AST (statements)
         """
+        Resolver().resolve(statements)
+        dispatch = self._stmt_dispatch
         for statement in statements:
-            self.execute(statement)
+            dispatch[type(statement)](statement)
     
     def execute(self, statement):
         """Executa um único statement."""
-        statement.accept(self)
+        self._stmt_dispatch[type(statement)](statement)
     
     def evaluate(self, expression):
         """Avalia uma única expressão."""
-        return expression.accept(self)
+        return self._expr_dispatch[type(expression)](expression)
     
     def execute_block(self, statements, environment):
         """
@@ -47,66 +140,98 @@ class Interpreter(Visitor):
             statements (list): Lista de statements
             environment (Environment): O novo ambiente para o bloco
         """
-        previous_environment = self.context.environment
+        # Atributos usados no laço ficam em variáveis locais
+        context = self.context
+        dispatch = self._stmt_dispatch
+        previous_environment = context.environment
+        context.environment = environment
         try:
-            self.context.push_environment(environment)
             for statement in statements:
-                self.execute(statement)
+                dispatch[type(statement)](statement)
+                if self._return_value is not _SENTINEL:
+                    return
         finally:
-            self.context.environment = previous_environment
+            context.environment = previous_environment
     
     # --- Visitor Methods for Expressions ---
     
     def visit_binary_expr(self, expr):
+        op = expr.op
+        
+        # and/or avaliam o operando direito só quando necessário
+        if op == BinOp.AND:
+            return bool(self.evaluate(expr.left)) and bool(self.evaluate(expr.right))
+        if op == BinOp.OR:
+            return bool(self.evaluate(expr.left)) or bool(self.evaluate(expr.right))
+        if op is None:
+            raise SimpleLangRuntimeError(f"Operador binário desconhecido: {getattr(expr.operator, 'value', expr.operator)}")
+        
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
+        if expr.numeric:
+            # O Resolver provou que os operandos são números
+            try:
+                return _NUMERIC_BINARY_OPERATORS[op](left, right)
+            except TypeError:
+                # Suposição quebrada: volta ao caminho genérico de vez
+                expr.numeric = False
+        elif type(left) is int and type(right) is int:
+            handler = _NUMERIC_BINARY_OPERATORS[op]
+            if handler is not None:
+                return handler(left, right)
+        return self._binary_handlers[op](left, right)
+    
+    def visit_binary_chain_expr(self, expr):
+        operands = expr.operands
+        op = expr.op
         
-        operator_value = expr.operator.value
-        
-        if operator_value == "+":
-            if isinstance(left, (int, float)) and isinstance(right, (int, float)):
-                return left + right
-            elif isinstance(left, str) or isinstance(right, str):
-                # Ensure both operands are stringified before concatenation
-                return str(left) + str(right)
-            else:
-                raise SimpleLangTypeError(f"Operação inválida: {self._stringify(left)} {operator_value} {self._stringify(right)}")
-        elif operator_value == "-":
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise SimpleLangTypeError(f"Operação inválida: {self._stringify(left)} {operator_value} {self._stringify(right)}")
-            return left - right
-        elif operator_value == "*":
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise SimpleLangTypeError(f"Operação inválida: {self._stringify(left)} {operator_value} {self._stringify(right)}")
-            return left * right
-        elif operator_value == "/":
-            if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
-                raise SimpleLangTypeError(f"Operação inválida: {self._stringify(left)} {operator_value} {self._stringify(right)}")
-            if right == 0:
-                raise SimpleLangDivisionByZeroError()
-            return left / right
-        elif operator_value == "%" and isinstance(left, int) and isinstance(right, int):
-            if right == 0:
-                raise SimpleLangDivisionByZeroError()
-            return left % right
-        elif operator_value == "==":
-            return left == right
-        elif operator_value == "!=":
-            return left != right
-        elif operator_value == ">":
-            return left > right
-        elif operator_value == ">=":
-            return left >= right
-        elif operator_value == "<":
-            return left < right
-        elif operator_value == "<=":
-            return left <= right
-        elif operator_value == "and":
-            return self._is_truthy(left) and self._is_truthy(right)
-        elif operator_value == "or":
-            return self._is_truthy(left) or self._is_truthy(right)
+        if op == BinOp.AND:
+            for operand in operands:
+                if not self.evaluate(operand):
+                    return False
+            return True
+        if op == BinOp.OR:
+            for operand in operands:
+                if self.evaluate(operand):
+                    return True
+            return False
         
-        raise SimpleLangRuntimeError(f"Operador binário desconhecido: {operator_value}")
+        handler = self._binary_handlers[op]
+        value = self.evaluate(operands[0])
+        for i in range(1, len(operands)):
+            value = handler(value, self.evaluate(operands[i]))
+        return value
+    
+    def _check_numbers(self, symbol, left, right):
+        if not (isinstance(left, (int, float)) and isinstance(right, (int, float))):
+            raise SimpleLangTypeError(f"Operação inválida: {self._stringify(left)} {symbol} {self._stringify(right)}")
+    
+    def _add(self, left, right):
+        if isinstance(left, (int, float)) and isinstance(right, (int, float)):
+            return left + right
+        if isinstance(left, str) or isinstance(right, str):
+            return self._stringify(left) + self._stringify(right)
+        raise SimpleLangTypeError(f"Operação inválida: {self._stringify(left)} + {self._stringify(right)}")
+    
+    def _subtract(self, left, right):
+        self._check_numbers("-", left, right)
+        return left - right
+    
+    def _multiply(self, left, right):
+        self._check_numbers("*", left, right)
+        return left * right
+    
+    def _divide(self, left, right):
+        self._check_numbers("/", left, right)
+        if right == 0:
+            raise SimpleLangDivisionByZeroError()
+        return left / right
+    
+    def _modulo(self, left, right):
+        self._check_numbers("%", left, right)
+        if right == 0:
+            raise SimpleLangDivisionByZeroError()
+        return left % right
     
     def visit_grouping_expr(self, expr):
         return self.evaluate(expr.expression)
@@ -115,31 +240,54 @@ class Interpreter(Visitor):
         return expr.value
     
     def visit_unary_expr(self, expr):
-        right = self.evaluate(expr.right)
-        
-        operator_value = expr.operator.value
-        
-        if operator_value == "-":
-            if not isinstance(right, (int, float)):
-                raise SimpleLangTypeError(f"Operação inválida: {operator_value}{self._stringify(right)}")
-            return -right
-        elif operator_value == "!":
-            return not self._is_truthy(right)
+        op = expr.op
+        if op is None:
+            raise SimpleLangRuntimeError(f"Operador unário desconhecido: {getattr(expr.operator, 'value', expr.operator)}")
         
-        raise SimpleLangRuntimeError(f"Operador unário desconhecido: {operator_value}")
+        right = self.evaluate(expr.right)
+        if op == UnaryOp.NOT:
+            return not right
+        return self._negate(right)
+    
+    def _negate(self, right):
+        if not isinstance(right, (int, float)):
+            raise SimpleLangTypeError(f"Operação inválida: -{self._stringify(right)}")
+        return -right
     
     def visit_variable_expr(self, expr):
+        slot = expr.slot
+        if slot is not None:
+            env = self.context.environment
+            for _ in range(expr.depth):
+                env = env.enclosing
+            return env.slots[slot]
+        # Não resolvida: só pode ser global
+        values = self.context.globals.values
+        if expr.name in values:
+            return values[expr.name]
         return self.context.get_variable(expr.name)
     
     def visit_assignment_expr(self, expr):
         value = self.evaluate(expr.value)
-        self.context.assign_variable(expr.name, value)
+        slot = expr.slot
+        if slot is not None:
+            env = self.context.environment
+            for _ in range(expr.depth):
+                env = env.enclosing
+            env.slots[slot] = value
+        else:
+            values = self.context.globals.values
+            if expr.name in values:
+                values[expr.name] = value
+            else:
+                self.context.assign_variable(expr.name, value)
         return value
     
     def visit_call_expr(self, expr):
-        callee = self.evaluate(expr.callee)
+        evaluate = self.evaluate
+        callee = evaluate(expr.callee)
         
-        arguments = [self.evaluate(arg) for arg in expr.arguments]
+        arguments = [evaluate(arg) for arg in expr.arguments]
         
         if not isinstance(callee, SimpleLangCallable):
             raise SimpleLangRuntimeError(f"Não é possível chamar: {self._stringify(callee)}")
@@ -153,49 +301,103 @@ class Interpreter(Visitor):
     
     def visit_print_stmt(self, stmt):
         value = self.evaluate(stmt.expression)
-        print(self._stringify(value))
+        print(self._stringify(value), file=self.output)
     
     def visit_var_declaration_stmt(self, stmt):
         value = None
         if stmt.initializer:
             value = self.evaluate(stmt.initializer)
-        self.context.define_variable(stmt.name, value)
+        if stmt.slot is not None:
+            self.context.environment.slots[stmt.slot] = value
+        else:
+            # Escritas diretas, sem passar por Context/Environment.define
+            self.context.environment.values[stmt.name] = value
     
     def visit_block_stmt(self, stmt):
-        self.execute_block(stmt.statements, Environment(self.context.environment))
+        environment = Environment(self.context.environment, stmt.slot_count or 0)
+        self.execute_block(stmt.statements, environment)
     
     def visit_if_stmt(self, stmt):
-        if self._is_truthy(self.evaluate(stmt.condition)):
+        # Testes de veracidade usam o `if` do Python direto (ver _is_truthy)
+        if self.evaluate(stmt.condition):
             self.execute(stmt.then_branch)
         elif stmt.else_branch:
             self.execute(stmt.else_branch)
     
     def visit_while_stmt(self, stmt):
-        while self._is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+        condition = stmt.condition
+        body = stmt.body
+        evaluate = self.evaluate
+        if type(body) is not BlockStatement:
+            while evaluate(condition):
+                self.execute(body)
+                if self._return_value is not _SENTINEL:
+                    return
+            return
+        
+        # Corpo em bloco: executa os statements direto, sem passar por
+        # execute -> visit_block_stmt -> execute_block a cada iteração
+        statements = body.statements
+        slot_count = body.slot_count or 0
+        dispatch = self._stmt_dispatch
+        context = self.context
+        previous_environment = context.environment
+        try:
+            while evaluate(condition):
+                context.environment = Environment(previous_environment, slot_count)
+                for statement in statements:
+                    dispatch[type(statement)](statement)
+                    if self._return_value is not _SENTINEL:
+                        return
+                # A condição é avaliada no ambiente de fora do bloco
+                context.environment = previous_environment
+        finally:
+            context.environment = previous_environment
+    
+    def visit_for_stmt(self, stmt):
+        condition = stmt.condition
+        increment = stmt.increment
+        body = stmt.body
+        evaluate = self.evaluate
+        execute = self.execute
+        context = self.context
+        previous_environment = context.environment
+        # Um único ambiente para `init`; o incremento é avaliado direto,
+        # sem o bloco { body; increment; } criado a cada iteração
+        context.environment = Environment(previous_environment, stmt.slot_count or 0)
+        try:
+            if stmt.init is not None:
+                execute(stmt.init)
+            while evaluate(condition):
+                execute(body)
+                if self._return_value is not _SENTINEL:
+                    return
+                if increment is not None:
+                    evaluate(increment)
+        finally:
+            context.environment = previous_environment
     
     def visit_function_declaration_stmt(self, stmt):
-        function = SimpleLangFunction(stmt, self.context.environment)
-        self.context.define_function(stmt.name, function)
+        function = SimpleLangFunction(stmt, self.context.environment, stmt.name in self.memoize_names)
+        if stmt.slot is not None:
+            self.context.environment.slots[stmt.slot] = function
+        else:
+            self.context.environment.values[stmt.name] = function
     
     def visit_return_stmt(self, stmt):
         value = None
         if stmt.value:
             value = self.evaluate(stmt.value)
-        raise SimpleLangReturnException(value)
+        self._return_value = value
     
     # --- Helper Methods ---
     
-    def _is_truthy(self, obj):
-        if obj is None:
-            return False
-        if isinstance(obj, bool):
-            return obj
-        if isinstance(obj, (int, float)):
-            return obj != 0
-        if isinstance(obj, str):
-            return len(obj) > 0
-        return True
+    # A veracidade da SimpleLang (nil, false, 0 e "" são falsos; o resto é
+    # verdadeiro) coincide com a do Python para todos os valores da
+    # linguagem, então o teste é o próprio `bool`. Um tipo novo cujo
+    # `bool` do Python divirja (ex: listas vazias) exigiria voltar a uma
+    # função própria aqui e nos testes diretos de veracidade.
+    _is_truthy = staticmethod(bool)
     
     def _stringify(self, obj):
         if obj is None:
@@ -5,33 +5,51 @@ Contém testes unitários para verificar o funcionamento correto
 do parser, AST, interpretador e outras funcionalidades.
 """
 
-import unittest
+import ast as pyast
+from contextlib import redirect_stdout
 from io import StringIO
 import sys
 
-from .parser import Parser
+import pytest
+from lark import Tree, Token
+
+from . import testing_utils
+from .testing_utils import capture_output, expect_error
+from .parser import Parser, create_parser
 from .transformer import transform_to_ast
+from .ast import build_ast
 from .runtime import Interpreter
-from .errors import SimpleLangError, SimpleLangSyntaxError, SimpleLangRuntimeError
+from .resolver import Resolver
+from .compiler import Compiler, OpCode
+from .vm import VM
+from .jit import compile_kernel
+from .transpiler import NotTranspilable, transpile
+from .pybackend import PythonBackend
+from .node import *
+from .errors import (
+    SimpleLangError, SimpleLangSyntaxError, SimpleLangRuntimeError,
+    SimpleLangTypeError, SimpleLangDivisionByZeroError, SimpleLangUndefinedVariableError,
+)
 
 
-class TestSimpleLangParser(unittest.TestCase):
+class TestSimpleLangParser:
     """Testes para o parser SimpleLang."""
     
-    def setUp(self):
-        self.parser = Parser()
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser):
+        self.parser = parser
     
     def test_parse_simple_expression(self):
         """Testa parsing de expressão simples."""
         code = "print 42;"
         tree = self.parser.parse(code)
-        self.assertIsNotNone(tree)
+        assert tree is not None
     
     def test_parse_variable_declaration(self):
         """Testa parsing de declaração de variável."""
         code = "var x = 10;"
         tree = self.parser.parse(code)
-        self.assertIsNotNone(tree)
+        assert tree is not None
     
     def test_parse_function_declaration(self):
         """Testa parsing de declaração de função."""
@@ -41,7 +59,7 @@ class TestSimpleLangParser(unittest.TestCase):
         }
         """
         tree = self.parser.parse(code)
-        self.assertIsNotNone(tree)
+        assert tree is not None
     
     def test_parse_if_statement(self):
         """Testa parsing de statement if."""
@@ -53,7 +71,7 @@ class TestSimpleLangParser(unittest.TestCase):
         }
         """
         tree = self.parser.parse(code)
-        self.assertIsNotNone(tree)
+        assert tree is not None
     
     def test_parse_while_loop(self):
         """Testa parsing de loop while."""
@@ -64,49 +82,148 @@ class TestSimpleLangParser(unittest.TestCase):
         }
         """
         tree = self.parser.parse(code)
-        self.assertIsNotNone(tree)
+        assert tree is not None
     
     def test_parse_syntax_error(self):
         """Testa detecção de erro de sintaxe."""
         code = "var x = ;"  # Sintaxe inválida
-        with self.assertRaises(SimpleLangSyntaxError):
+        with pytest.raises(SimpleLangSyntaxError):
             self.parser.parse(code)
+    
+    def test_parse_expression(self):
+        """Testa parsing de uma expressão solta (usado pelo REPL)."""
+        expr = transform_to_ast(self.parser.parse_expression("1 + x * 2"))
+        assert isinstance(expr, Binary)
+        assert expr.op == BinOp.ADD
+        with pytest.raises(SimpleLangSyntaxError):
+            self.parser.parse_expression("var x = 1;")
+
+    def test_parse_ast_inline(self):
+        """Testa o parsing que já constrói a AST durante as reduções."""
+        for parser in (self.parser, Parser(recursive=False)):
+            ast = parser.parse_ast("var x = 1; while (x < 3) x = x + 1; print x;")
+            assert isinstance(ast, list)
+            assert [type(stmt) for stmt in ast] == [VarDeclaration, WhileStatement, PrintStatement]
+            assert ast[1].condition.op == BinOp.LT
+            with pytest.raises(SimpleLangSyntaxError):
+                parser.parse_ast("var = ;")
+
+    def test_recursive_parser(self):
+        """Testa que o parser descendente recursivo gera a mesma AST do Lark."""
+        code = """
+        // comentário
+        fun soma(a, b) { return a + b * 2 - -1; }
+        for (var i = 0; i < 3; i = i + 1) {
+            if (!(i == 1) and i >= 0 or false) print soma(i, 2 * 3); else print "x";
+        }
+        """
+        ast = self.parser.parse_ast(code)
+        expected = transform_to_ast(self.parser.parse(code))
+        assert len(ast) == len(expected)
+        function, loop = ast
+        assert function.parameters == ["a", "b"]
+        assert function.body.statements[0].value.op == BinOp.SUB
+        assert function.body.statements[0].value.right.value == -1
+        assert isinstance(loop, ForStatement)
+        assert isinstance(loop.init, VarDeclaration)
+        assert loop.increment.value.op == BinOp.ADD
+        branch = loop.body.statements[0]
+        assert branch.condition.op == BinOp.OR
+        assert branch.then_branch.expression.arguments[1].value == 6
+
+    def test_call_arguments_are_lists(self):
+        """Testa chamadas sem argumento, com um argumento e encadeadas."""
+        code = "f(); g(1); h(1)(2, 3);"
+        for ast in (transform_to_ast(self.parser.parse(code)), build_ast(self.parser.parse(code))):
+            empty, single, chained = (stmt.expression for stmt in ast)
+            assert isinstance(empty, Call) and empty.arguments == []
+            assert [arg.value for arg in single.arguments] == [1]
+            assert [arg.value for arg in chained.arguments] == [2, 3]
+            assert [arg.value for arg in chained.callee.arguments] == [1]
+
+    def test_recursive_parser_errors(self):
+        """Testa a posição informada nos erros do parser descendente recursivo."""
+        with pytest.raises(SimpleLangSyntaxError) as ctx:
+            self.parser.parse_ast("var x = 1;\nprint x", "teste.sl")
+        assert (ctx.value.line, ctx.value.column) == (2, 8)
+        assert ctx.value.filename == "teste.sl"
+        for code in ("(a) = 1;", "x = @;", "{ print 1;", "fun f( {}"):
+            with pytest.raises(SimpleLangSyntaxError):
+                self.parser.parse_ast(code)
+
+    def test_parsers_share_lark_instance(self):
+        """Testa que as tabelas LALR são construídas uma vez por processo."""
+        assert Parser().parser is self.parser.parser
+
+    def test_create_parser_singleton(self):
+        """Testa que create_parser sempre retorna a mesma instância."""
+        assert create_parser() is create_parser()
+
+    def test_ast_disk_cache(self, tmp_path, monkeypatch):
+        """Testa que a AST gravada em disco é lida de volta na próxima vez."""
+        monkeypatch.setattr(testing_utils, "_AST_CACHE_PATH", tmp_path)
+        code = "var x = 1; while (x < 3) x = x + 1; print x;"
+        first = testing_utils._load_or_parse(code)
+        assert len(list(tmp_path.iterdir())) == 1
+        second = testing_utils._load_or_parse(code)
+        assert second is not first
+        assert [type(stmt) for stmt in second] == [VarDeclaration, WhileStatement, PrintStatement]
+        assert second[1].condition.op == BinOp.LT
 
 
-class TestSimpleLangInterpreter(unittest.TestCase):
+class TestSimpleLangInterpreter:
     """Testes para o interpretador SimpleLang."""
     
-    def setUp(self):
-        self.parser = Parser()
-        self.interpreter = Interpreter()
-    
-    def _run_code(self, code):
-        """Helper para executar código SimpleLang."""
-        tree = self.parser.parse(code)
-        ast = transform_to_ast(tree)
-        self.interpreter.interpret(ast)
-    
-    def _capture_output(self, code):
-        """Helper para capturar saída de print."""
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        try:
-            self._run_code(code)
-            return captured_output.getvalue().strip()
-        finally:
-            sys.stdout = old_stdout
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser, interpreter):
+        self.parser = parser
+        self.interpreter = interpreter
     
     def test_variable_declaration_and_access(self):
         """Testa declaração e acesso a variáveis."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         var x = 42;
         print x;
         """)
-        self.assertEqual(output, "42")
+        assert output == "42"
     
+    def test_truthiness(self):
+        """nil, false, 0 e "" são falsos; o resto é verdadeiro."""
+        output = capture_output(self.interpreter, """
+        print !nil; print !false; print !0; print !0.0; print !"";
+        print !"a"; print !-1; print !true;
+        if (0) print "sim"; else print "não";
+        print 0 or "x";
+        """)
+        assert output == "true\ntrue\ntrue\ntrue\ntrue\nfalse\nfalse\nfalse\nnão\ntrue"
+
+    def test_while_block_scope(self):
+        """Cada iteração do while tem seu próprio escopo de bloco."""
+        output = capture_output(self.interpreter, """
+        var x = "fora";
+        var n = 0;
+        fun primeiro_par(limite) {
+            var k = 1;
+            while (k < limite) {
+                var dobro = k * 2;
+                if (dobro > 4) return dobro;
+                k = k + 1;
+            }
+            return nil;
+        }
+        while (n < 3) {
+            var x = n;
+            n = n + 1;
+        }
+        print x;
+        print n;
+        print primeiro_par(10);
+        """)
+        assert output == "fora\n3\n6"
+
     def test_arithmetic_operations(self):
         """Testa operações aritméticas."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         print 2 + 3;
         print 10 - 4;
         print 3 * 7;
@@ -114,31 +231,31 @@ class TestSimpleLangInterpreter(unittest.TestCase):
         print 17 % 5;
         """)
         expected = "5\n6\n21\n5\n2"
-        self.assertEqual(output, expected)
+        assert output == expected
     
     def test_string_operations(self):
         """Testa operações com strings."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         var greeting = "Hello";
         var name = "World";
         print greeting + ", " + name + "!";
         """)
-        self.assertEqual(output, "Hello, World!")
+        assert output == "Hello, World!"
     
     def test_boolean_operations(self):
         """Testa operações booleanas."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         print true and false;
         print true or false;
         print !true;
         print !false;
         """)
         expected = "false\ntrue\nfalse\ntrue"
-        self.assertEqual(output, expected)
+        assert output == expected
     
     def test_comparison_operations(self):
         """Testa operações de comparação."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         print 5 > 3;
         print 2 < 1;
         print 4 >= 4;
@@ -147,11 +264,11 @@ class TestSimpleLangInterpreter(unittest.TestCase):
         print 3 != 4;
         """)
         expected = "true\nfalse\ntrue\nfalse\ntrue\ntrue"
-        self.assertEqual(output, expected)
+        assert output == expected
     
     def test_if_statement(self):
         """Testa statement if."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         var x = 10;
         if (x > 5) {
             print "greater";
@@ -159,11 +276,11 @@ class TestSimpleLangInterpreter(unittest.TestCase):
             print "not greater";
         }
         """)
-        self.assertEqual(output, "greater")
+        assert output == "greater"
     
     def test_while_loop(self):
         """Testa loop while."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         var i = 0;
         while (i < 3) {
             print i;
@@ -171,11 +288,11 @@ class TestSimpleLangInterpreter(unittest.TestCase):
         }
         """)
         expected = "0\n1\n2"
-        self.assertEqual(output, expected)
+        assert output == expected
     
     def test_function_declaration_and_call(self):
         """Testa declaração e chamada de função."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         fun greet(name) {
             print "Hello, " + name + "!";
         }
@@ -183,22 +300,22 @@ class TestSimpleLangInterpreter(unittest.TestCase):
         greet("Bob");
         """)
         expected = "Hello, Alice!\nHello, Bob!"
-        self.assertEqual(output, expected)
+        assert output == expected
     
     def test_function_with_return(self):
         """Testa função com retorno."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         fun add(a, b) {
             return a + b;
         }
         var result = add(3, 4);
         print result;
         """)
-        self.assertEqual(output, "7")
+        assert output == "7"
     
     def test_recursive_function(self):
         """Testa função recursiva (fibonacci)."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         fun fib(n) {
             if (n <= 1) {
                 return n;
@@ -207,11 +324,11 @@ class TestSimpleLangInterpreter(unittest.TestCase):
         }
         print fib(5);
         """)
-        self.assertEqual(output, "5")
+        assert output == "5"
     
     def test_scope(self):
         """Testa escopo de variáveis."""
-        output = self._capture_output("""
+        output = capture_output(self.interpreter, """
         var global = "global";
         {
             var local = "local";
@@ -221,37 +338,48 @@ class TestSimpleLangInterpreter(unittest.TestCase):
         print global;
         """)
         expected = "global\nlocal\nglobal"
-        self.assertEqual(output, expected)
+        assert output == expected
     
     def test_division_by_zero(self):
         """Testa erro de divisão por zero."""
-        with self.assertRaises(SimpleLangRuntimeError):
-            self._run_code("print 5 / 0;")
+        expect_error(self.interpreter, "print 5 / 0;", SimpleLangRuntimeError)
     
     def test_undefined_variable(self):
         """Testa erro de variável não definida."""
-        with self.assertRaises(SimpleLangError):
-            self._run_code("print undefined_var;")
+        expect_error(self.interpreter, "print undefined_var;", SimpleLangError)
+
+    def test_memoize_named_functions(self):
+        """Funções listadas em `memoize` são memoizadas mesmo com efeitos."""
+        code = """
+        fun conta(n) { print "calculando"; return n * 2; }
+        print conta(3);
+        print conta(3);
+        """
+        for engine in (Interpreter, VM, PythonBackend):
+            assert capture_output(engine(), code) == "calculando\n6\ncalculando\n6"
+            assert capture_output(engine(memoize=["conta"]), code) == "calculando\n6\n6"
+
+    def test_program_segments(self):
+        """Trechos passados separadamente formam um único programa."""
+        assert capture_output(self.interpreter, "var a = 2;", "print a * 3;") == "6"
+
+    def test_output_file(self):
+        """Testa que `print` escreve no arquivo `output`, sem tocar no sys.stdout."""
+        for engine in (Interpreter, VM, PythonBackend):
+            output = StringIO()
+            with redirect_stdout(StringIO()) as stdout:
+                engine(output=output).interpret(self.parser.parse_ast("print 1 + 1;"))
+            assert output.getvalue() == "2\n"
+            assert stdout.getvalue() == ""
 
 
-class TestSimpleLangExamples(unittest.TestCase):
+class TestSimpleLangExamples:
     """Testes com exemplos mais complexos."""
     
-    def setUp(self):
-        self.parser = Parser()
-        self.interpreter = Interpreter()
-    
-    def _capture_output(self, code):
-        """Helper para capturar saída de print."""
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        try:
-            tree = self.parser.parse(code)
-            ast = transform_to_ast(tree)
-            self.interpreter.interpret(ast)
-            return captured_output.getvalue().strip()
-        finally:
-            sys.stdout = old_stdout
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser, interpreter):
+        self.parser = parser
+        self.interpreter = interpreter
     
     def test_factorial(self):
         """Testa cálculo de fatorial."""
@@ -264,8 +392,8 @@ class TestSimpleLangExamples(unittest.TestCase):
         }
         print factorial(5);
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "120")
+        output = capture_output(self.interpreter, code)
+        assert output == "120"
     
     def test_fibonacci_sequence(self):
         """Testa sequência de Fibonacci."""
@@ -283,27 +411,65 @@ class TestSimpleLangExamples(unittest.TestCase):
             i = i + 1;
         }
         """
-        output = self._capture_output(code)
+        output = capture_output(self.interpreter, code)
         expected = "0\n1\n1\n2\n3\n5\n8"
-        self.assertEqual(output, expected)
+        assert output == expected
+
+    def test_fibonacci_iterative_matches_recursive(self):
+        """A versão iterativa e a recursiva (memoizada ou não) de fib concordam."""
+        iterative = """
+        var i = 0;
+        while (i <= LIMITE) {
+            var a = 0;
+            var b = 1;
+            var k = 0;
+            while (k < i) {
+                var t = a + b;
+                a = b;
+                b = t;
+                k = k + 1;
+            }
+            print a;
+            i = i + 1;
+        }
+        """
+        recursive = """
+        fun fib(n) {
+            if (n <= 1) return n;
+            return fib(n - 1) + fib(n - 2);
+        }
+        var i = 0;
+        while (i <= LIMITE) {
+            print fib(i);
+            i = i + 1;
+        }
+        """
+        # Com memoização fib(n) é linear: n = 40 roda rápido
+        expected = capture_output(self.interpreter, iterative.replace("LIMITE", "40"))
+        assert expected.split("\n")[-1] == "102334155"
+        assert capture_output(self.interpreter, recursive.replace("LIMITE", "40")) == expected
+
+        # Sem memoização só um n pequeno, como teste de corretude
+        self.interpreter = Interpreter(memoize=False)
+        naive = capture_output(self.interpreter, recursive.replace("LIMITE", "10"))
+        assert naive == "\n".join(expected.split("\n")[:11])
 
 
 def run_tests():
     """Executa todos os testes."""
-    unittest.main(module=__name__, verbosity=2)
+    return pytest.main([__file__, "-v"])
 
 
 if __name__ == "__main__":
-    run_tests()
+    sys.exit(run_tests())
 
 
-
-
-class TestSimpleLangAST(unittest.TestCase):
+class TestSimpleLangAST:
     """Testes para a construção da AST."""
 
-    def setUp(self):
-        self.parser = Parser()
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser):
+        self.parser = parser
 
     def _get_ast(self, code):
         tree = self.parser.parse(code)
@@ -313,165 +479,714 @@ class TestSimpleLangAST(unittest.TestCase):
         code = "print 1 + 2 * 3;"
         ast = self._get_ast(code)
         # Espera-se uma AST que represente (1 + (2 * 3))
-        self.assertIsInstance(ast[0], ExpressionStatement)
+        assert isinstance(ast[0], ExpressionStatement)
         expr = ast[0].expression
-        self.assertIsInstance(expr, Binary)
-        self.assertEqual(expr.operator.value, "+")
-        self.assertIsInstance(expr.left, Literal)
-        self.assertEqual(expr.left.value, 1)
-        self.assertIsInstance(expr.right, Binary)
-        self.assertEqual(expr.right.operator.value, "*")
-        self.assertIsInstance(expr.right.left, Literal)
-        self.assertEqual(expr.right.left.value, 2)
-        self.assertIsInstance(expr.right.right, Literal)
-        self.assertEqual(expr.right.right.value, 3)
+        assert isinstance(expr, Binary)
+        assert expr.operator.value == "+"
+        assert isinstance(expr.left, Literal)
+        assert expr.left.value == 1
+        assert isinstance(expr.right, Binary)
+        assert expr.right.operator.value == "*"
+        assert isinstance(expr.right.left, Literal)
+        assert expr.right.left.value == 2
+        assert isinstance(expr.right.right, Literal)
+        assert expr.right.right.value == 3
 
     def test_unary_expression_ast(self):
         code = "print -10;"
         ast = self._get_ast(code)
-        self.assertIsInstance(ast[0], ExpressionStatement)
+        assert isinstance(ast[0], ExpressionStatement)
         expr = ast[0].expression
-        self.assertIsInstance(expr, Unary)
-        self.assertEqual(expr.operator.value, "-")
-        self.assertIsInstance(expr.right, Literal)
-        self.assertEqual(expr.right.value, 10)
+        assert isinstance(expr, Unary)
+        assert expr.operator.value == "-"
+        assert isinstance(expr.right, Literal)
+        assert expr.right.value == 10
 
     def test_assignment_ast(self):
         code = "var x = 10; x = 20;"
         ast = self._get_ast(code)
-        self.assertIsInstance(ast[1], ExpressionStatement)
+        assert isinstance(ast[1], ExpressionStatement)
         assign_expr = ast[1].expression
-        self.assertIsInstance(assign_expr, Assignment)
-        self.assertEqual(assign_expr.name, "x")
-        self.assertIsInstance(assign_expr.value, Literal)
-        self.assertEqual(assign_expr.value.value, 20)
+        assert isinstance(assign_expr, Assignment)
+        assert assign_expr.name == "x"
+        assert isinstance(assign_expr.value, Literal)
+        assert assign_expr.value.value == 20
 
     def test_if_else_ast(self):
         code = "if (true) { print 1; } else { print 0; }"
         ast = self._get_ast(code)
-        self.assertIsInstance(ast[0], IfStatement)
-        self.assertIsInstance(ast[0].condition, Literal)
-        self.assertEqual(ast[0].condition.value, True)
-        self.assertIsInstance(ast[0].then_branch, BlockStatement)
-        self.assertIsInstance(ast[0].else_branch, BlockStatement)
+        assert isinstance(ast[0], IfStatement)
+        assert isinstance(ast[0].condition, Literal)
+        assert ast[0].condition.value == True
+        assert isinstance(ast[0].then_branch, BlockStatement)
+        assert isinstance(ast[0].else_branch, BlockStatement)
 
     def test_while_ast(self):
         code = "while (true) { print 1; }"
         ast = self._get_ast(code)
-        self.assertIsInstance(ast[0], WhileStatement)
-        self.assertIsInstance(ast[0].condition, Literal)
-        self.assertEqual(ast[0].condition.value, True)
-        self.assertIsInstance(ast[0].body, BlockStatement)
+        assert isinstance(ast[0], WhileStatement)
+        assert isinstance(ast[0].condition, Literal)
+        assert ast[0].condition.value == True
+        assert isinstance(ast[0].body, BlockStatement)
 
     def test_function_declaration_ast(self):
         code = "fun test(a, b) { return a + b; }"
         ast = self._get_ast(code)
-        self.assertIsInstance(ast[0], FunctionDeclaration)
-        self.assertEqual(ast[0].name, "test")
-        self.assertEqual(ast[0].parameters, ["a", "b"])
-        self.assertIsInstance(ast[0].body, BlockStatement)
+        assert isinstance(ast[0], FunctionDeclaration)
+        assert ast[0].name == "test"
+        assert ast[0].parameters == ["a", "b"]
+        assert isinstance(ast[0].body, BlockStatement)
 
     def test_call_ast(self):
         code = "test(1, 2);"
         ast = self._get_ast(code)
-        self.assertIsInstance(ast[0], ExpressionStatement)
+        assert isinstance(ast[0], ExpressionStatement)
         call_expr = ast[0].expression
-        self.assertIsInstance(call_expr, Call)
-        self.assertIsInstance(call_expr.callee, Variable)
-        self.assertEqual(call_expr.callee.name, "test")
-        self.assertEqual(len(call_expr.arguments), 2)
-        self.assertIsInstance(call_expr.arguments[0], Literal)
-        self.assertEqual(call_expr.arguments[0].value, 1)
-        self.assertIsInstance(call_expr.arguments[1], Literal)
-        self.assertEqual(call_expr.arguments[1].value, 2)
+        assert isinstance(call_expr, Call)
+        assert isinstance(call_expr.callee, Variable)
+        assert call_expr.callee.name == "test"
+        assert len(call_expr.arguments) == 2
+        assert isinstance(call_expr.arguments[0], Literal)
+        assert call_expr.arguments[0].value == 1
+        assert isinstance(call_expr.arguments[1], Literal)
+        assert call_expr.arguments[1].value == 2
+
+    def test_binary_operator_codes(self):
+        code = "a % b <= c or d;"
+        ast = self._get_ast(code)
+        expr = ast[0].expression
+        assert expr.op == BinOp.OR
+        assert expr.left.op == BinOp.LE
+        assert expr.left.left.op == BinOp.MOD
+        assert expr.left.left.operator.value == "%"
 
+    def test_constant_folding(self):
+        ast = self._get_ast('2 * 3600 + 5; -(1 + 2); x + 1 * 2; 1 / 0; "a" + "b";')
+        folded = [stmt.expression for stmt in ast]
+        assert isinstance(folded[0], Literal)
+        assert folded[0].value == 7205
+        assert folded[1].value == -3
+        assert isinstance(folded[2], Binary)
+        assert folded[2].right.value == 2
+        # Divisão por zero fica para a execução
+        assert isinstance(folded[3], Binary)
+        assert folded[4].value == "ab"
 
-class TestSimpleLangErrors(unittest.TestCase):
-    """Testes para o tratamento de erros."""
+    def test_shared_literals(self):
+        code = "true; true; nil; nil; 1; 1; 1.0; 1000; 1000;"
+        for ast in (self._get_ast(code), self.parser.parse_ast(code)):
+            values = [stmt.expression for stmt in ast]
+            assert values[0] is values[1]
+            assert values[2] is values[3]
+            assert values[4] is values[5]
+            # 1.0 não se confunde com 1; inteiros grandes não são compartilhados
+            assert values[6] is not values[4] and values[6].value == 1.0
+            assert values[7] is not values[8]
+
+    def test_interned_names(self):
+        code = "var contador = 1; contador = contador + contador;"
+        for ast in (self._get_ast(code), self.parser.parse_ast(code)):
+            declaration, statement = ast
+            assignment = statement.expression
+            assert assignment.name is declaration.name
+            assert assignment.value.left.name is declaration.name
+            # Os nós Variable não são compartilhados: o Resolver anota cada um
+            assert assignment.value.left is not assignment.value.right
+
+    def test_nodes_have_no_dict(self):
+        ast = self._get_ast("fun f(a) { if (a) { return -a; } while (a < 1) a = f(a); } print (1 + 2);")
+        pending = list(ast)
+        while pending:
+            node = pending.pop()
+            assert not hasattr(node, "__dict__"), type(node).__name__
+            for name in type(node).__slots__:
+                value = getattr(node, name, None)
+                if isinstance(value, Node):
+                    pending.append(value)
+                elif isinstance(value, (list, tuple)):
+                    pending.extend(item for item in value if isinstance(item, Node))
+
+    def test_block_statements_are_tuples(self):
+        ast = self._get_ast("{ var a = 1; print a; }")
+        assert type(ast[0].statements) == tuple
+        assert len(ast[0].statements) == 2
+
+    def test_for_statement_ast(self):
+        ast = self._get_ast("for (var i = 0; i < 3; i = i + 1) print i;")
+        loop = ast[0]
+        assert isinstance(loop, ForStatement)
+        assert isinstance(loop.init, VarDeclaration)
+        assert loop.condition.op == BinOp.LT
+        assert isinstance(loop.increment, Assignment)
+        assert isinstance(loop.body, PrintStatement)
+
+    def test_for_statement_omitted_parts(self):
+        loop = self._get_ast("for (; ; i = i + 1) print i;")[0]
+        assert loop.init is None
+        assert loop.condition.value is True
+        assert isinstance(loop.increment, Assignment)
+        loop = self._get_ast("for (var i = 0; ; ) print i;")[0]
+        assert isinstance(loop.init, VarDeclaration)
+        assert loop.increment is None
+
+    def test_unary_operator_codes(self):
+        code = "!-a;"
+        ast = self._get_ast(code)
+        expr = ast[0].expression
+        assert expr.op == UnaryOp.NOT
+        assert expr.right.op == UnaryOp.NEG
+
+
+class TestASTBuilder:
+    """Testes para o construtor de AST em ast.py."""
+
+    @classmethod
+    def setup_class(cls):
+        cls.parser = Parser(with_positions=True)
+
+    @pytest.mark.slow
+    def test_deeply_nested_expression(self):
+        """A construção iterativa não esbarra no limite de recursão."""
+        depth = sys.getrecursionlimit() * 2
+        code = "print " + "(" * depth + "x" + ")" * depth + ";"
+        ast = build_ast(self.parser.parse(code))
+        expr = ast[0].expression
+        for _ in range(depth):
+            expr = expr.expression
+        assert expr.name == "x"
+
+    def test_positions_are_tuples(self):
+        """Os nós guardam só (linha, coluna, linha final), não o Meta do Lark."""
+        ast = build_ast(self.parser.parse("var a = 1;\nprint a + 2;"))
+        assert ast[1].token == (2, 1, 2)
+        assert ast[1].expression.token == (2, 7, 2)
+
+    def test_positions_are_optional(self):
+        """Sem with_positions o Lark não preenche linha e coluna."""
+        ast = build_ast(Parser().parse("var a = 1;\nprint a + 2;"))
+        assert ast[1].token == (None, None, None)
+
+    def test_single_statement_blocks_flattened(self):
+        """Blocos de um statement sem declarações não viram BlockStatement."""
+        ast = build_ast(self.parser.parse(
+            "while (x) { x = x - 1; } if (x) { var y = 1; } fun f(a) { return a; }"
+        ))
+        assert isinstance(ast[0].body, ExpressionStatement)
+        assert isinstance(ast[1].then_branch, BlockStatement)
+        assert isinstance(ast[2].body, BlockStatement)
+        assert isinstance(ast[2].body.statements[0], ReturnStatement)
+
+    def test_binary_chain(self):
+        """Operadores repetidos viram um BinaryChain avaliado da esquerda para a direita."""
+        ast = build_ast(self.parser.parse(
+            'var a = 1; print a + 2 + "x" + a; print a - 1 - 1;'
+        ))
+        chain = ast[1].expression
+        assert isinstance(chain, BinaryChain)
+        assert chain.op == BinOp.ADD
+        assert len(chain.operands) == 4
+        assert isinstance(ast[2].expression, BinaryChain)
+
+        with redirect_stdout(StringIO()) as captured_output:
+            Interpreter().interpret(ast)
+        assert captured_output.getvalue().strip() == "3x1\n-1"
+
+    def test_constant_folding(self):
+        """Subárvores só com literais viram um único Literal."""
+        number = lambda n: Tree("number", [Token("NUMBER", n)])
+        tree = Tree("program", [Tree("print_statement", [
+            Tree("term", [number("1"), Token("PLUS", "+"),
+                          Tree("factor", [number("2"), Token("STAR", "*"), number("3")])])
+        ])])
+        expr = build_ast(tree)[0].expression
+        assert isinstance(expr, Literal)
+        assert expr.value == 7
+
+    def test_constant_folding_keeps_division_by_zero(self):
+        """Divisão por zero não é dobrada, o erro fica para a execução."""
+        number = lambda n: Tree("number", [Token("NUMBER", n)])
+        tree = Tree("program", [Tree("print_statement", [
+            Tree("factor", [number("1"), Token("SLASH", "/"), number("0")])
+        ])])
+        expr = build_ast(tree)[0].expression
+        assert isinstance(expr, Binary)
+
+
+class TestResolver:
+    """Testes para a resolução estática de variáveis locais."""
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser, interpreter):
+        self.parser = parser
+        self.interpreter = interpreter
+
+    def _get_ast(self, code):
+        ast = transform_to_ast(self.parser.parse(code))
+        Resolver().resolve(ast)
+        return ast
+
+    def test_local_slots(self):
+        """Locais recebem (depth, slot); globais ficam sem resolução."""
+        ast = self._get_ast("""
+        var g = 1;
+        fun f(a, b) {
+            var c = a;
+            { print b; print g; }
+        }
+        """)
+        function = ast[1]
+        assert ast[0].slot is None
+        assert function.slot is None
+        assert function.slot_count == 3
+        var_c, block = function.body.statements
+        assert var_c.slot == 2
+        assert (var_c.initializer.depth, var_c.initializer.slot) == (0, 0)
+        print_b, print_g = block.statements
+        assert (print_b.expression.depth, print_b.expression.slot) == (1, 1)
+        assert print_g.expression.slot is None
+
+    def test_numeric_inference(self):
+        """Binários com operandos sempre numéricos são marcados."""
+        ast = self._get_ast("""
+        fun f(n) {
+            var i = 0;
+            var s = "";
+            while (i < n) {
+                i = i + 1;
+                s = s + i;
+            }
+            var k = 1;
+            k = "texto";
+            return k * 2;
+        }
+        """)
+        var_i, var_s, loop, var_k, assign_k, ret = ast[0].body.statements
+        assert not loop.condition.numeric  # n é um parâmetro
+        increment, concat = loop.body.statements
+        assert increment.expression.value.numeric
+        assert not concat.expression.value.numeric
+        assert not ret.value.numeric
+
+    def test_numeric_fast_path_results(self):
+        output = capture_output(self.interpreter, """
+        fun f(unused) {
+            var i = 0;
+            var x = 1.5;
+            while (i < 3) { i = i + 1; x = x * 2; }
+            print i;
+            print x;
+            print i >= 3;
+        }
+        f(1);
+        """)
+        assert output == "3\n12\ntrue"
+
+    def test_closure_binds_declaration_scope(self):
+        """Uma closure enxerga a variável visível onde foi declarada."""
+        output = capture_output(self.interpreter, """
+        var a = "global";
+        {
+            fun show_a(prefix) { print a; }
+            show_a(nil);
+            var a = "block";
+            show_a(nil);
+            print a;
+        }
+        """)
+        assert output == "global\nglobal\nblock"
+
+    def test_closure_keeps_captured_local(self):
+        """Atribuições dentro da closure alteram o local capturado."""
+        output = capture_output(self.interpreter, """
+        fun make(x) {
+            fun inner(y) { print x; x = y; }
+            return inner;
+        }
+        var f = make("um");
+        f("dois");
+        f("tres");
+        """)
+        assert output == "um\ndois"
+
+    def test_pure_function_detection(self):
+        """Só funções que dependem apenas dos argumentos são puras."""
+        ast = self._get_ast("""
+        var g = 1;
+        fun ident(n) { return n; }
+        fun recursive(n) { if (n) { return recursive(false); } return n; }
+        fun reads_global(n) { return g; }
+        fun prints(n) { print n; }
+        fun calls_other(n) { return ident(n); }
+        fun makes_closure(n) { fun inner(m) { return n; } return inner; }
+        """)
+        purity = {stmt.name: stmt.pure for stmt in ast[1:]}
+        assert purity == {
+            "ident": True,
+            "recursive": True,
+            "reads_global": False,
+            "prints": False,
+            "calls_other": False,
+            "makes_closure": False,
+        }
+
+    def test_memoized_results_respect_types(self):
+        """A memoização diferencia 1, 1.0 e true."""
+        output = capture_output(self.interpreter, """
+        fun ident(n) { return n; }
+        print ident(1);
+        print ident(true);
+        print ident(1.5);
+        print ident(1);
+        """)
+        assert output == "1\ntrue\n1.5\n1"
+
+    def test_impure_function_not_memoized(self):
+        """Funções que leem globais são reexecutadas a cada chamada."""
+        output = capture_output(self.interpreter, """
+        var g = "antes";
+        fun read(n) { return g; }
+        print read(1);
+        g = "depois";
+        print read(1);
+        """)
+        assert output == "antes\ndepois"
+
+    @pytest.mark.parametrize("engine", [Interpreter, VM, PythonBackend])
+    def test_memo_ignored_after_rebinding(self, engine):
+        """A recursão vai pelo nome: com outra função nele, a memória não vale."""
+        for code in (
+            "fun f(n) { if (n < 1) return 0; return f(n - 1) + 1; }"
+            " print f(3); var g = f; fun f(n) { return 100; } print g(3);",
+            "{ fun f(n) { if (n < 1) return 0; return f(n - 1) + 1; }"
+            " print f(3); var g = f; fun h(n) { return 100; } f = h; print g(3); }",
+        ):
+            assert capture_output(engine(), code) == "3\n101"
+
+
+class TestBytecodeVM:
+    """Testes para o compilador de bytecode e a VM."""
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser):
+        self.parser = parser
+
+    def _assert_same_output(self, code):
+        """A VM deve imprimir exatamente o mesmo que o interpretador."""
+        expected = capture_output(Interpreter(), code)
+        assert capture_output(VM(), code) == expected
+        return expected
+
+    def test_constant_folding(self):
+        chunk = Compiler().compile(transform_to_ast(self.parser.parse("print (1 + 2) * 3;")))
+        assert chunk.instruction(0) == (OpCode.LOAD_CONST, chunk.consts.index(9))
+        assert chunk.instruction(1) == (OpCode.PRINT, None)
+
+    def test_control_flow_and_locals(self):
+        output = self._assert_same_output("""
+        var total = 0;
+        for (var i = 0; i < 10; i = i + 1) {
+            if (i % 2 == 0) total = total + i; else total = total - 1;
+        }
+        print total;
+        print 1 < 2 and "sim" or "não";
+        print false or nil;
+        """)
+        assert output == "15\ntrue\nfalse"
+
+    def test_functions_and_closures(self):
+        output = self._assert_same_output("""
+        fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+        print fib(15);
+        fun counter(start) {
+            var count = start;
+            fun next(step) { count = count + step; return count; }
+            return next;
+        }
+        var c = counter(10);
+        c(1);
+        print c(2);
+        print "fib=" + fib(5);
+        """)
+        assert output == "610\n13\nfib=5"
+
+    def test_runtime_errors(self):
+        expect_error(VM(), "print -\"texto\";", SimpleLangTypeError)
+        expect_error(VM(), "var x = 0; print 1 / x;", SimpleLangDivisionByZeroError)
+        expect_error(VM(), "print nao_existe;", SimpleLangError)
+
+
+class TestJIT:
+    """Testes para a compilação de funções numéricas (lox.jit)."""
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser):
+        self.parser = parser
+
+    def _declarations(self, code):
+        ast = transform_to_ast(self.parser.parse(code))
+        Resolver().resolve(ast)
+        return {stmt.name: stmt for stmt in ast if isinstance(stmt, FunctionDeclaration)}
+
+    def _run(self, code, jit=True, memoize=True):
+        with redirect_stdout(StringIO()) as captured_output:
+            Interpreter(memoize=memoize, jit=jit).interpret(transform_to_ast(self.parser.parse(code)))
+            return captured_output.getvalue().strip()
+
+    def test_numeric_kernel_detection(self):
+        declarations = self._declarations("""
+        var g = 1;
+        fun soma(n) { var s = 0; while (n > 0) { s = s + n; n = n - 1; } return s; }
+        fun mostra(n) { print n; }
+        fun usa_global(n) { return n + g; }
+        fun chama(n) { return soma(n); }
+        """)
+        assert compile_kernel(declarations["soma"])
+        assert not compile_kernel(declarations["mostra"])
+        assert not compile_kernel(declarations["usa_global"])
+        assert not compile_kernel(declarations["chama"])
+
+    def test_same_results_as_interpreter(self):
+        code = """
+        fun f(a, b) {
+            var r = 0;
+            { var r = a * 2; a = r; }
+            if (a > b and !(b == 0)) r = a % b; else r = a / 4;
+            return r;
+        }
+        fun dobro(a) { return a + a; }
+        print f(7, 3);
+        print f(1.5, 10);
+        print dobro(4) + dobro("x");
+        """
+        assert self._run(code) == self._run(code, jit=False)
+        assert self._run(code) == "2\n0.75\n8xx"
+
+    def test_redeclaration_in_branch(self):
+        # A redeclaração fora de um bloco reaproveita o slot de `x`; no kernel
+        # precisa reaproveitar também o nome Python
+        code = """
+        fun f(n) { var x = 1; if (n > 5) var x = 2; return x; }
+        print f(1);
+        print f(9);
+        """
+        assert compile_kernel(self._declarations(code)["f"])
+        assert self._run(code) == self._run(code, jit=False)
+        assert self._run(code) == "1\n2"
+
+    def test_recursive_kernels(self):
+        code = """
+        fun fatorial(n) { if (n <= 1) return 1; return n * fatorial(n - 1); }
+        fun mdc(a, b) { if (b == 0) return a; return mdc(b, a % b); }
+        fun conta(n) { if (n > 0) return conta(n - 1) + 1; }
+        print fatorial(20);
+        print mdc(48, 18);
+        var f = fatorial;
+        fun fatorial(n) { return 0; }
+        print f(25);
+        """
+        declarations = self._declarations(code)
+        assert compile_kernel(declarations["fatorial"])
+        assert compile_kernel(declarations["mdc"])
+        # Com memoização a recursão fica no interpretador
+        assert self._run(code, memoize=False) == self._run(code, jit=False, memoize=False)
+        assert self._run(code, memoize=False) == "2432902008176640000\n6\n0"
+        # nil + 1 no kernel: o interpretador refaz a chamada e dá o erro certo
+        with pytest.raises(SimpleLangTypeError):
+            self._run(code + "print conta(3);", memoize=False)
+
+    def test_division_by_zero(self):
+        with pytest.raises(SimpleLangDivisionByZeroError):
+            self._run("fun f(a) { return 1 / a; } print f(0);")
+
+    def test_translated_function_prints_to_output(self, capsys):
+        # Passa do limite de chamadas: as últimas rodam a versão traduzida,
+        # que também precisa escrever em `output`
+        output = StringIO()
+        interpreter = Interpreter(output=output)
+        interpreter.interpret(transform_to_ast(self.parser.parse(
+            "fun p(x) { print x; } for (var i = 0; i < 55; i = i + 1) p(i);"
+        )))
+        assert interpreter.context.globals.values["p"]._compiled
+        assert output.getvalue().splitlines() == [str(i) for i in range(55)]
+        assert capsys.readouterr().out == ""
+
+    def test_hot_functions_are_translated(self):
+        code = """
+        var total = 0;
+        fun soma(n) { total = total + n; return "total=" + total; }
+        fun contador(c) { fun mais(n) { c = c + n; return c; } return mais; }
+        var mais = contador(0);
+        var i = 0;
+        var ultimo = nil;
+        while (i < 60) { ultimo = soma(i); mais(1); i = i + 1; }
+        print ultimo;
+        print mais(0);
+        """
+        interpreter = Interpreter(memoize=False)
+        with redirect_stdout(StringIO()):
+            interpreter.interpret(transform_to_ast(self.parser.parse(code)))
+        values = interpreter.context.globals.values
+        assert values["soma"]._compiled
+        # `mais` captura `c` de contador: continua no interpretador
+        assert values["mais"]._compiled is False
+        assert self._run(code) == self._run(code, jit=False)
+        assert self._run(code) == "total=1770\n60"
+
+    def test_translated_redeclaration_in_branch(self):
+        # Passa do limite de chamadas: as últimas rodam a versão traduzida
+        code = """
+        fun f(n) { var x = "a"; if (n > 5) var x = "b"; return x; }
+        var s = "";
+        var i = 0;
+        while (i < 60) { s = s + f(i % 10); i = i + 1; }
+        print s;
+        """
+        interpreter = Interpreter(memoize=False)
+        with redirect_stdout(StringIO()) as captured_output:
+            interpreter.interpret(transform_to_ast(self.parser.parse(code)))
+        assert interpreter.context.globals.values["f"]._compiled
+        assert captured_output.getvalue().strip() == "aaaaaabbbb" * 6
+
+    def test_translated_function_errors(self):
+        with pytest.raises(SimpleLangUndefinedVariableError):
+            self._run("""
+            fun f(n) { if (n > 55) return nada; return n; }
+            var i = 0; while (i < 60) { f(i); i = i + 1; }
+            """)
+
+
+class TestPythonBackend:
+    """Testes para a tradução de programas para Python (lox.transpiler)."""
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser):
+        self.parser = parser
+
+    def _assert_same_output(self, code):
+        """O código traduzido deve imprimir exatamente o mesmo que o interpretador."""
+        expected = capture_output(Interpreter(), code)
+        assert capture_output(PythonBackend(), code) == expected
+        return expected
+
+    def test_generated_code(self):
+        module = transpile(transform_to_ast(self.parser.parse("""
+        var total = 0;
+        { var i = 0; while (i < 3) { total = total + i; i = i + 1; } }
+        """)))
+        source = pyast.unparse(module)
+        assert "g_total = 0" in source
+        assert "while v0 < 3" in source
+        assert "v0 = v0 + 1" in source
+
+    def test_same_results_as_interpreter(self):
+        output = self._assert_same_output("""
+        fun fib(n) { if (n < 2) return n; return fib(n - 1) + fib(n - 2); }
+        fun contador(inicio) {
+            var c = inicio;
+            fun mais(n) { c = c + n; return c; }
+            return mais;
+        }
+        var soma = contador(10);
+        soma(1);
+        print soma(5);
+        print fib(15);
+        print "n=" + 3.0 + true;
+        print 7 % 3 == 1 and !nil;
+        { var a = 1; fun dobra(x) { a = a * 2; } dobra(0); print a; }
+        print fib;
+        """)
+        assert output == "16\n610\nn=3true\ntrue\n2\n<função fib>"
+
+    def test_closure_in_loop_falls_back(self):
+        code = """
+        var f = nil;
+        var i = 0;
+        while (i < 2) { var j = i; fun get(x) { return j; } if (i == 0) f = get; i = i + 1; }
+        print f(0);
+        """
+        with pytest.raises(NotTranspilable):
+            transpile(transform_to_ast(self.parser.parse(code)))
+        assert self._assert_same_output(code) == "0"
+
+    def test_redeclaration_in_branch(self):
+        # O nome Python do slot de `x` é o mesmo nas duas declarações
+        output = self._assert_same_output("""
+        fun f(n) { var x = 1; if (n > 5) var x = 2; return x; }
+        print f(1);
+        print f(9);
+        """)
+        assert output == "1\n2"
+
+    def test_runtime_errors(self):
+        expect_error(PythonBackend(), "print 1 / 0;", SimpleLangDivisionByZeroError)
+        expect_error(PythonBackend(), "print x;", SimpleLangUndefinedVariableError)
+        # Atribuir uma global antes da declaração é um erro, como no Interpreter
+        expect_error(PythonBackend(), "fun f(v) { y = v; } f(1); var y = 0;", SimpleLangUndefinedVariableError)
 
-    def setUp(self):
-        self.parser = Parser()
-        self.interpreter = Interpreter()
 
-    def _run_code_expect_error(self, code, error_type):
-        with self.assertRaises(error_type):
-            tree = self.parser.parse(code)
-            ast = transform_to_ast(tree)
-            self.interpreter.interpret(ast)
+class TestSimpleLangErrors:
+    """Testes para o tratamento de erros."""
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser, interpreter):
+        self.parser = parser
+        self.interpreter = interpreter
 
     def test_undefined_variable_error(self):
         code = "print undefined_var;"
-        self._run_code_expect_error(code, SimpleLangRuntimeError)
+        expect_error(self.interpreter, code, SimpleLangRuntimeError)
 
     def test_division_by_zero_error(self):
         code = "print 10 / 0;"
-        self._run_code_expect_error(code, SimpleLangDivisionByZeroError)
+        expect_error(self.interpreter, code, SimpleLangDivisionByZeroError)
+
+    def test_error_message_with_location(self):
+        error = SimpleLangError("falhou", line=3, column=7, filename="prog.sl")
+        assert str(error) == "Arquivo 'prog.sl', linha 3, coluna 7: falhou"
+        assert str(SimpleLangError("falhou")) == "falhou"
 
     def test_type_error_arithmetic(self):
         code = "print 10 + \"hello\";"
-        self._run_code_expect_error(code, SimpleLangTypeError)
+        expect_error(self.interpreter, code, SimpleLangTypeError)
 
     def test_type_error_unary(self):
         code = "print -\"hello\";"
-        self._run_code_expect_error(code, SimpleLangTypeError)
+        expect_error(self.interpreter, code, SimpleLangTypeError)
 
     def test_arity_error(self):
         code = "fun test(a) { print a; } test(1, 2);"
-        self._run_code_expect_error(code, SimpleLangRuntimeError)
+        expect_error(self.interpreter, code, SimpleLangRuntimeError)
 
     def test_syntax_error_missing_semicolon(self):
         code = "print 10"
-        with self.assertRaises(SimpleLangSyntaxError):
+        with pytest.raises(SimpleLangSyntaxError):
             self.parser.parse(code)
 
     def test_syntax_error_invalid_token(self):
         code = "var x = #;"
-        with self.assertRaises(SimpleLangSyntaxError):
+        with pytest.raises(SimpleLangSyntaxError):
             self.parser.parse(code)
 
 
-if __name__ == "__main__":
-    unittest.main(verbosity=2)
-
-
-
-
-
-class TestSimpleLangEdgeCases(unittest.TestCase):
+class TestSimpleLangEdgeCases:
     """Testes para casos extremos e comportamentos inesperados."""
 
-    def setUp(self):
-        self.parser = Parser()
-        self.interpreter = Interpreter()
-
-    def _capture_output(self, code):
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        try:
-            tree = self.parser.parse(code)
-            ast = transform_to_ast(tree)
-            self.interpreter.interpret(ast)
-            return captured_output.getvalue().strip()
-        finally:
-            sys.stdout = old_stdout
-
-    def _run_code_expect_error(self, code, error_type):
-        with self.assertRaises(error_type):
-            tree = self.parser.parse(code)
-            ast = transform_to_ast(tree)
-            self.interpreter.interpret(ast)
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, parser, interpreter):
+        self.parser = parser
+        self.interpreter = interpreter
 
     def test_empty_program(self):
         """Testa um programa vazio."""
         code = ""
-        output = self._capture_output(code)
-        self.assertEqual(output, "")
+        output = capture_output(self.interpreter, code)
+        assert output == ""
 
     def test_only_comments(self):
         """Testa um programa contendo apenas comentários."""
         code = "// Este é um comentário\n/* Este é outro comentário */\n"
-        output = self._capture_output(code)
-        self.assertEqual(output, "")
+        output = capture_output(self.interpreter, code)
+        assert output == ""
 
     def test_nested_blocks(self):
         """Testa blocos aninhados."""
@@ -487,8 +1202,8 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
         }
         print x;
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "3\n2\n1")
+        output = capture_output(self.interpreter, code)
+        assert output == "3\n2\n1"
 
     def test_function_no_return(self):
         """Testa função sem statement de retorno explícito."""
@@ -498,8 +1213,8 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
         }
         print do_nothing();
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "nil")
+        output = capture_output(self.interpreter, code)
+        assert output == "nil"
 
     def test_variable_reassignment(self):
         """Testa reatribuição de variável."""
@@ -509,14 +1224,14 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
         x = 20;
         print x;
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "10\n20")
+        output = capture_output(self.interpreter, code)
+        assert output == "10\n20"
 
     def test_string_concatenation_with_numbers(self):
         """Testa concatenação de string com números."""
         code = "print \"The answer is: \" + 42;"
-        output = self._capture_output(code)
-        self.assertEqual(output, "The answer is: 42")
+        output = capture_output(self.interpreter, code)
+        assert output == "The answer is: 42"
 
     def test_for_loop_no_init_condition_increment(self):
         """Testa for loop sem inicialização, condição ou incremento."""
@@ -527,24 +1242,41 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
             i = i + 1;
         }
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "0\n1")
+        output = capture_output(self.interpreter, code)
+        assert output == "0\n1"
+
+    def test_for_loop_return_and_scope(self):
+        """Testa return dentro do for e que a variável do for não vaza."""
+        code = """
+        fun achar(n) {
+            for (var i = 0; i < 10; i = i + 1) {
+                if (i * i > n) return i;
+            }
+            return -1;
+        }
+        var i = "fora";
+        print achar(20);
+        for (var i = 0; i < 1; i = i + 1) print i;
+        print i;
+        """
+        output = capture_output(self.interpreter, code)
+        assert output == "5\n0\nfora"
 
     def test_for_loop_infinite(self):
         """
         Testa for loop infinito (deve ser interrompido por timeout ou Ctrl+C).
-        Este teste não pode ser executado diretamente em unittest sem um mecanismo de timeout.
+        Este teste não pode ser executado diretamente sem um mecanismo de timeout.
         Será um teste manual ou via integração com timeout.
         """
         # code = "for (;;) { print \"loop\"; }"
-        # self._run_code_expect_error(code, TimeoutError) # Exemplo, TimeoutError não é padrão
+        # expect_error(self.interpreter, code, TimeoutError) # Exemplo, TimeoutError não é padrão
         pass
 
     def test_unary_minus_on_zero(self):
         """Testa operador unário de menos em zero."""
         code = "print -0;"
-        output = self._capture_output(code)
-        self.assertEqual(output, "0")
+        output = capture_output(self.interpreter, code)
+        assert output == "0"
 
     def test_unary_not_on_numbers(self):
         """Testa operador unário de negação em números."""
@@ -553,8 +1285,8 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
         print !1;
         print !100;
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "true\nfalse\nfalse")
+        output = capture_output(self.interpreter, code)
+        assert output == "true\nfalse\nfalse"
 
     def test_nested_function_calls(self):
         """Testa chamadas de função aninhadas."""
@@ -563,8 +1295,8 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
         fun mult(a, b) { return a * b; }
         print add(mult(2, 3), add(4, 5)); // (2*3) + (4+5) = 6 + 9 = 15
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "15")
+        output = capture_output(self.interpreter, code)
+        assert output == "15"
 
     def test_logical_operators_short_circuit(self):
         """Testa short-circuiting em operadores lógicos."""
@@ -579,11 +1311,25 @@ class TestSimpleLangEdgeCases(unittest.TestCase):
         print true or side_effect(); // side_effect não deve ser chamado
         print x;
         """
-        output = self._capture_output(code)
-        self.assertEqual(output, "false\n0\ntrue\n0")
-
-
-if __name__ == "__main__":
-    unittest.main(verbosity=2)
+        output = capture_output(self.interpreter, code)
+        assert output == "false\n0\ntrue\n0"
 
+    def test_return_from_nested_loop(self):
+        """`return` dentro de laços e blocos aninhados encerra a função."""
+        code = """
+        fun first(flag) {
+            while (true) {
+                {
+                    if (flag) return "found";
+                }
+                print "unreachable";
+            }
+        }
+        print first(true);
+        """
+        output = capture_output(self.interpreter, code)
+        assert output == "found"
 
+    def test_return_outside_function(self):
+        """`return` no nível global é rejeitado antes da execução."""
+        expect_error(self.interpreter, "return 1;", SimpleLangSyntaxError)
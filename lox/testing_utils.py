@@ -0,0 +1,118 @@
+"""
+Funções auxiliares dos testes de SimpleLang.
+
+Usadas por lox/testing.py e tests/test_integration.py: obtêm a AST de um
+trecho de código (com cache) e executam trechos capturando a saída.
+"""
+
+from functools import lru_cache
+from hashlib import blake2b
+from io import StringIO
+from pathlib import Path
+import os
+import pickle
+import sys
+import threading
+
+import pytest
+
+from .parser import create_parser
+from .transformer import transform_to_ast
+
+
+# ASTs dos trechos de teste, serializadas entre execuções (e entre os
+# processos do xdist). A chave é o hash do código com o dos arquivos que
+# definem a AST, então mudar a gramática ou os nós invalida o cache sozinho.
+_AST_CACHE_PATH = Path("~/.cache/lox/tests").expanduser()
+_AST_SOURCES = ("grammar.lark", "node.py", "ast.py", "transformer.py")
+
+
+@lru_cache(maxsize=None)
+def _ast_stamp():
+    stamp = blake2b(digest_size=32)
+    for name in _AST_SOURCES:
+        stamp.update((Path(__file__).parent / name).read_bytes())
+    return stamp.digest()
+
+
+def _load_or_parse(code):
+    """Lê a AST de `code` do cache em disco, analisando e gravando se faltar."""
+    key = blake2b(code.encode(), digest_size=16, key=_ast_stamp()).hexdigest()
+    path = _AST_CACHE_PATH / key
+    try:
+        return pickle.loads(path.read_bytes())
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    ast = transform_to_ast(create_parser().parse(code))
+    try:
+        _AST_CACHE_PATH.mkdir(parents=True, exist_ok=True)
+        # Grava num arquivo temporário e renomeia: outro processo nunca lê
+        # um pickle pela metade
+        temporary = path.with_name(f"{key}.{os.getpid()}.tmp")
+        temporary.write_bytes(pickle.dumps(ast, pickle.HIGHEST_PROTOCOL))
+        os.replace(temporary, path)
+    except OSError:
+        pass
+    return ast
+
+
+@lru_cache(maxsize=256)
+def compile_ast(code):
+    """
+    Retorna a AST de `code`, reaproveitando a de um trecho já analisado.
+
+    Vários testes executam o mesmo código; a AST só recebe anotações
+    determinísticas do Resolver, então pode ser executada de novo. Ela é
+    gravada antes dessas anotações (ver `_load_or_parse`).
+    """
+    return _load_or_parse(code)
+
+
+def compile_segments(segments):
+    """
+    Retorna a AST do programa formado pelos trechos `segments`, em ordem.
+
+    Cada trecho é obtido de `compile_ast` separadamente: um prelúdio comum
+    a vários testes é analisado uma vez só. Como o programa é uma sequência
+    de statements, concatenar as ASTs equivale a analisar o texto inteiro.
+    """
+    if len(segments) == 1:
+        return compile_ast(segments[0])
+    return [statement for segment in segments for statement in compile_ast(segment)]
+
+
+# Um StringIO por thread, esvaziado a cada captura em vez de recriado
+_OUTPUT = threading.local()
+
+# Com False, capture_output executa o programa com o sys.settrace desligado
+# (ver a marca `hot` em conftest.py)
+_TRACE_INTERPRETER = True
+
+
+def capture_output(interpreter, *segments):
+    """Executa os trechos em `interpreter` e retorna o que foi impresso."""
+    output = getattr(_OUTPUT, "buffer", None)
+    if output is None:
+        output = _OUTPUT.buffer = StringIO()
+    output.seek(0)
+    output.truncate(0)
+    # O buffer é passado ao interpretador em vez de trocar o sys.stdout
+    previous = interpreter.output
+    interpreter.output = output
+    trace = None if _TRACE_INTERPRETER else sys.gettrace()
+    if trace is not None:
+        sys.settrace(None)
+    try:
+        interpreter.interpret(compile_segments(segments))
+    finally:
+        interpreter.output = previous
+        if trace is not None:
+            sys.settrace(trace)
+    return output.getvalue().rstrip("\n")
+
+
+def expect_error(interpreter, code, error_type):
+    """Executa `code` em `interpreter`, que deve lançar `error_type`."""
+    with pytest.raises(error_type):
+        interpreter.interpret(compile_ast(code))
@@ -5,8 +5,20 @@ Este módulo implementa uma abordagem alternativa para construir a AST
 usando o sistema de transformação integrado do Lark.
 """
 
-from lark import Transformer, Token
+from sys import intern
+
+from lark import Transformer, Tree
 from .node import *
+from .ast import _FOLD, _UNARY_FOLD, _NO_FOLD, _literal
+
+
+def _constant(expr):
+    """Valor de `expr` se for um literal (talvez entre parênteses), senão _NO_FOLD."""
+    while type(expr) is Grouping:
+        expr = expr.expression
+    if type(expr) is Literal:
+        return expr.value
+    return _NO_FOLD
 
 
 class SimpleLangTransformer(Transformer):
@@ -15,13 +27,45 @@ class SimpleLangTransformer(Transformer):
     
     Cada método corresponde a uma regra da gramática e retorna
     o nó AST apropriado.
+    
+    Os métodos recebem os filhos como lista: com `v_args(inline=True)` o
+    Lark envolve cada chamada numa função a mais, o que deixa a
+    transformação mais lenta.
     """
     
+    def __init__(self):
+        # Nenhum terminal tem método próprio, então os tokens não precisam
+        # ser visitados
+        super().__init__(visit_tokens=False)
+        self._dispatch = {}
+    
+    def transform(self, tree):
+        """
+        Transforma `tree` em AST.
+        
+        Substitui o percurso genérico do Lark, que passa cada nó por um
+        gerador e por `_call_userfunc`: aqui os filhos são montados numa
+        list comprehension e o método da regra vem de um dicionário.
+        """
+        children = [
+            self.transform(child) if type(child) is Tree else child
+            for child in tree.children
+        ]
+        method = self._dispatch.get(tree.data)
+        if method is None:
+            method = getattr(self, tree.data, None)
+            if method is None:
+                return self.__default__(tree.data, children, tree.meta)
+            self._dispatch[tree.data] = method
+        return method(children)
+    
     # --- Programa ---
     
     def program(self, statements):
         """Retorna lista de statements do programa."""
-        return [stmt for stmt in statements if stmt is not None]
+        # Comentários e espaços são descartados pela gramática (%ignore) e
+        # nenhuma regra produz None, então a lista de filhos já é o programa
+        return statements
     
     # --- Statements ---
     
@@ -35,13 +79,13 @@ class SimpleLangTransformer(Transformer):
     
     def var_declaration(self, items):
         """Declaração de variável."""
-        name = items[0].value
+        name = intern(items[0].value)
         initializer = items[1] if len(items) > 1 else None
         return VarDeclaration(name, initializer)
     
     def function_declaration(self, items):
         """Declaração de função."""
-        name = items[0].value
+        name = intern(items[0].value)
         parameters = []
         body_index = 1
         
@@ -55,7 +99,7 @@ class SimpleLangTransformer(Transformer):
     
     def parameters(self, items):
         """Lista de parâmetros de função."""
-        return [param.value for param in items]
+        return [intern(param.value) for param in items]
     
     def if_statement(self, items):
         """If statement."""
@@ -71,30 +115,18 @@ class SimpleLangTransformer(Transformer):
         return WhileStatement(condition, body)
     
     def for_statement(self, items):
-        """For statement - convertido para while."""
-        # for (init; condition; increment) body
-        # vira: { init; while (condition) { body; increment; } }
-        init = items[0] if items[0] else None
-        condition = items[1] if items[1] else Literal(True)
-        increment = items[2] if items[2] else None
-        body = items[3]
-        
-        # Constrói o corpo do while
-        while_body_stmts = [body]
-        if increment:
-            while_body_stmts.append(ExpressionStatement(increment))
-        while_body = BlockStatement(while_body_stmts)
-        
-        # Constrói o while
-        while_stmt = WhileStatement(condition, while_body)
-        
-        # Constrói o bloco externo
-        block_stmts = []
-        if init:
-            block_stmts.append(init)
-        block_stmts.append(while_stmt)
-        
-        return BlockStatement(block_stmts)
+        """For statement."""
+        # for (init; condition; increment) body; partes omitidas chegam None
+        init, condition, increment, body = items
+        if condition is None:
+            condition = _literal(True)
+        return ForStatement(init, condition, increment, body)
+    
+    def for_init(self, items):
+        """Inicialização do for (None se omitida)."""
+        return items[0] if items else None
+    
+    for_condition = for_increment = for_init
     
     def return_statement(self, items):
         """Return statement."""
@@ -109,11 +141,9 @@ class SimpleLangTransformer(Transformer):
     
     def assignment(self, items):
         """Atribuição."""
-        if len(items) == 1:
-            return items[0]
-        name = items[0].value
-        value = items[1]
-        return Assignment(name, value)
+        # `?assignment` repassa sozinho o caso sem "=": aqui há sempre 2 itens
+        name, value = items
+        return Assignment(intern(name.value), value)
     
     def logical_or(self, items):
         """OR lógico."""
@@ -141,54 +171,44 @@ class SimpleLangTransformer(Transformer):
     
     def _build_binary_chain(self, items):
         """
-        Constrói uma cadeia de expressões binárias.
-        Espera que `items` seja uma lista de [expr, op, expr, op, expr, ...]
-        ou apenas [expr].
-        """
-        if not items:
-            return None
-        
-        # Se houver apenas um item, é uma expressão simples, não binária
-        if len(items) == 1:
-            return items[0]
-        
-        # Se houver mais de um item, assume-se que é uma cadeia de operações binárias
-        # Ex: [expr1, op1, expr2, op2, expr3]
-        left = items[0]
-        i = 1
-        while i < len(items):
-            # Verifica se o próximo item é um operador (Token) e se há um operando à direita
-            if isinstance(items[i], Token) and i + 1 < len(items):
-                operator = items[i]
-                right = items[i + 1]
-                left = Binary(left, operator, right)
-                i += 2
-            else:
-                # Se não for um operador ou não houver operando à direita, assume que é o fim da cadeia
-                # Isso pode acontecer se a gramática permitir expressões como 'a + b' sem o 'c' subsequente
-                break
+        Constrói uma cadeia de expressões binárias associativa à esquerda.
         
+        A gramática garante que `items` alterna operandos e operadores:
+        [expr, op, expr, op, expr, ...] ou apenas [expr].
+        """
+        it = iter(items)
+        left = next(it)
+        for operator, right in zip(it, it):
+            left = self._fold_binary(left, operator, right)
         return left
     
+    def _fold_binary(self, left, operator, right):
+        """Dobra operações entre literais (ex: 2 * 3600) em um único Literal."""
+        fold = _FOLD.get(operator.value)
+        if fold is not None:
+            left_value = _constant(left)
+            right_value = _constant(right)
+            if left_value is not _NO_FOLD and right_value is not _NO_FOLD:
+                folded = fold(left_value, right_value)
+                if folded is not _NO_FOLD:
+                    return _literal(folded)
+        return Binary(left, operator, right)
+    
     def unary(self, items):
         """Expressão unária."""
-        if len(items) == 1:
-            return items[0]
-        operator = items[0]
-        right = items[1]
+        operator, right = items
+        fold = _UNARY_FOLD.get(operator.value)
+        value = _constant(right)
+        if fold is not None and value is not _NO_FOLD:
+            folded = fold(value)
+            if folded is not _NO_FOLD:
+                return _literal(folded)
         return Unary(operator, right)
     
     def call(self, items):
         """Chamada de função."""
-        callee = items[0]
-        
-        # O último item pode ser a lista de argumentos ou None se não houver argumentos
-        arguments = items[1] if len(items) > 1 else []
-        
-        # Certifica-se de que arguments é uma lista, mesmo que vazia
-        if not isinstance(arguments, list):
-            arguments = [arguments] if arguments is not None else []
-
+        # A regra `arguments` sempre produz uma lista, mesmo vazia
+        callee, arguments = items
         return Call(callee, None, arguments)
     
     def arguments(self, items):
@@ -203,13 +223,13 @@ class SimpleLangTransformer(Transformer):
     
     def identifier(self, items):
         """Identificador (variável)."""
-        return Variable(items[0].value)
+        return Variable(intern(items[0].value))
     
     def number(self, items):
         """Literal numérico."""
         value = items[0].value
         num_value = float(value) if "." in value else int(value)
-        return Literal(num_value)
+        return _literal(num_value)
     
     def string(self, items):
         """Literal string."""
@@ -218,15 +238,15 @@ class SimpleLangTransformer(Transformer):
     
     def true(self, items):
         """Literal true."""
-        return Literal(True)
+        return _literal(True)
     
     def false(self, items):
         """Literal false."""
-        return Literal(False)
+        return _literal(False)
     
     def nil(self, items):
         """Literal nil."""
-        return Literal(None)
+        return _literal(None)
 
 
 def transform_to_ast(parse_tree):
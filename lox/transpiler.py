@@ -0,0 +1,411 @@
+"""
+Tradução de programas SimpleLang para código Python.
+
+Este módulo converte a AST (já anotada pelo Resolver) em uma árvore do
+módulo `ast` do Python, que é compilada com `compile()` e executada com
+`exec()`. O programa passa a rodar no interpretador de bytecode do CPython,
+sem o despacho por nó do Interpreter.
+
+Convenções do código gerado:
+
+- Variáveis globais `x` viram nomes globais `g_x` (o prefixo evita
+  conflito com palavras reservadas e com os auxiliares);
+- Cada declaração local recebe um nome próprio (`v0`, `v1`, ...), a partir
+  dos índices (depth, slot) do Resolver; funções aninhadas usam as regras
+  de closure do Python (`nonlocal`/`global`);
+- As regras da SimpleLang que diferem das do Python (soma com strings,
+  divisão por zero, formatação do print) ficam em auxiliares `_add`,
+  `_div`, `_str`, ... fornecidos por quem executa o código
+  (lox/pybackend.py para programas inteiros, SimpleLangFunction para
+  funções isoladas).
+
+A veracidade da SimpleLang (nil, false, 0 e "" são falsos) é a mesma do
+Python, então condições usam os testes nativos.
+
+Uma função também pode ser traduzida isoladamente (`compile_function`),
+para rodar dentro do Interpreter: aí as globais são lidas do dicionário do
+ambiente global (`_globals`) e as chamadas passam por `_call`, de modo que
+os valores continuam sendo os objetos da SimpleLang.
+"""
+
+import ast
+
+from .node import *
+from .resolver import Resolver
+
+
+GLOBAL_PREFIX = "g_"
+
+_COMPARE = {
+    BinOp.EQ: ast.Eq, BinOp.NE: ast.NotEq, BinOp.GT: ast.Gt,
+    BinOp.GE: ast.GtE, BinOp.LT: ast.Lt, BinOp.LE: ast.LtE,
+}
+# Aritmética marcada como numérica pelo Resolver usa o operador nativo
+_NATIVE_ARITHMETIC = {BinOp.ADD: ast.Add, BinOp.SUB: ast.Sub, BinOp.MUL: ast.Mult}
+_HELPERS = {
+    BinOp.ADD: "_add", BinOp.SUB: "_sub", BinOp.MUL: "_mul",
+    BinOp.DIV: "_div", BinOp.MOD: "_mod",
+}
+
+
+class NotTranspilable(Exception):
+    """O programa usa algo que não tem tradução fiel para Python."""
+
+
+class _Function:
+    """Função Python sendo gerada (ou o módulo, no nível de cima)."""
+
+    __slots__ = ("nonlocals", "globals", "in_loop")
+
+    def __init__(self):
+        self.nonlocals = set()
+        self.globals = set()
+        # Dentro de um while desta função (closures aí não são fiéis)
+        self.in_loop = False
+
+
+class PythonTranspiler(Visitor):
+    """
+    Gera um `ast.Module` a partir da AST da SimpleLang.
+
+    Expressões retornam nós `ast.expr`; statements retornam listas de
+    `ast.stmt`.
+    """
+
+    def __init__(self, standalone=False):
+        """
+        Args:
+            standalone (bool): Traduz uma função isolada (ver `compile_function`)
+        """
+        self.standalone = standalone
+        # Pilha de escopos locais: (slot -> nome Python, função dona)
+        self.scopes = []
+        self.function = _Function()
+        self.module = self.function
+        self.count = 0
+        # Globais declaradas incondicionalmente antes do statement atual;
+        # atribuições a elas não precisam checar se existem
+        self.defined_globals = set()
+
+    def transpile(self, statements):
+        """
+        Traduz um programa já resolvido.
+
+        Args:
+            statements (list): Lista de statements da AST
+
+        Returns:
+            ast.Module: Módulo pronto para `compile()`
+
+        Raises:
+            NotTranspilable: Se o programa não puder ser traduzido
+        """
+        body = []
+        for statement in statements:
+            if type(statement) is FunctionDeclaration:
+                self.defined_globals.add(statement.name)
+            body.extend(statement.accept(self))
+            if type(statement) is VarDeclaration:
+                self.defined_globals.add(statement.name)
+        module = ast.Module(body=body or [ast.Pass()], type_ignores=[])
+        return ast.fix_missing_locations(module)
+
+    # --- Auxiliares ---
+
+    def _new_name(self):
+        name = f"v{self.count}"
+        self.count += 1
+        return name
+
+    def _declare(self, slot, name):
+        """
+        Associa o slot do escopo atual a um nome Python.
+
+        Uma redeclaração no mesmo escopo ocupa o mesmo slot (ver
+        Resolver._declare) e recebe o mesmo nome: um nome novo ficaria sem
+        valor no caminho em que a redeclaração não é executada.
+        """
+        if slot is None:
+            return GLOBAL_PREFIX + name
+        names = self.scopes[-1][0]
+        python_name = names.get(slot)
+        if python_name is None:
+            python_name = names[slot] = self._new_name()
+        return python_name
+
+    def _lookup(self, expr):
+        """Retorna (nome Python, função dona) de uma variável."""
+        if expr.slot is None:
+            return GLOBAL_PREFIX + expr.name, None
+        if expr.depth >= len(self.scopes):
+            # Só acontece numa função isolada que captura variáveis de fora
+            raise NotTranspilable(f"variável capturada '{expr.name}'")
+        names, owner = self.scopes[-1 - expr.depth]
+        return names[expr.slot], owner
+
+    def _store_target(self, expr):
+        """
+        Nome Python para atribuir `expr`, ou None se a global precisar ser
+        checada em tempo de execução.
+        """
+        name, owner = self._lookup(expr)
+        function = self.function
+        if owner is None:
+            if self.standalone or expr.name not in self.defined_globals:
+                return None
+            if function is not self.module:
+                function.globals.add(name)
+        elif owner is not function:
+            if owner is self.module:
+                function.globals.add(name)
+            else:
+                function.nonlocals.add(name)
+        return name
+
+    def _call(self, name, *arguments):
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=list(arguments), keywords=[])
+
+    def _condition(self, expr):
+        """Traduz `expr` para um teste; só a veracidade do valor importa."""
+        expr = self._unwrap(expr)
+        if type(expr) is Binary and (expr.op == BinOp.AND or expr.op == BinOp.OR):
+            op = ast.And() if expr.op == BinOp.AND else ast.Or()
+            return ast.BoolOp(op=op, values=[self._condition(expr.left), self._condition(expr.right)])
+        if type(expr) is Unary and expr.op == UnaryOp.NOT:
+            return ast.UnaryOp(op=ast.Not(), operand=self._condition(expr.right))
+        return expr.accept(self)
+
+    def _unwrap(self, expr):
+        while type(expr) is Grouping:
+            expr = expr.expression
+        if type(expr) is BinaryChain:
+            expr = expr.as_binary()
+        return expr
+
+    def _body(self, statement):
+        body = statement.accept(self)
+        return body or [ast.Pass()]
+
+    # --- Expressões ---
+
+    def visit_binary_expr(self, expr):
+        op = expr.op
+        if op == BinOp.AND or op == BinOp.OR:
+            # O resultado é sempre um booleano, como no Interpreter
+            return self._call("bool", self._condition(expr))
+        left = expr.left.accept(self)
+        right = expr.right.accept(self)
+        if op in _COMPARE:
+            return ast.Compare(left=left, ops=[_COMPARE[op]()], comparators=[right])
+        if expr.numeric and op in _NATIVE_ARITHMETIC:
+            return ast.BinOp(left=left, op=_NATIVE_ARITHMETIC[op](), right=right)
+        if op not in _HELPERS:
+            raise NotTranspilable(f"operador desconhecido: {expr.operator}")
+        return self._call(_HELPERS[op], left, right)
+
+    def visit_binary_chain_expr(self, expr):
+        return expr.as_binary().accept(self)
+
+    def visit_grouping_expr(self, expr):
+        return expr.expression.accept(self)
+
+    def visit_literal_expr(self, expr):
+        return ast.Constant(value=expr.value)
+
+    def visit_unary_expr(self, expr):
+        if expr.op == UnaryOp.NOT:
+            return ast.UnaryOp(op=ast.Not(), operand=self._condition(expr.right))
+        if expr.op != UnaryOp.NEG:
+            raise NotTranspilable(f"operador desconhecido: {expr.operator}")
+        return self._call("_neg", expr.right.accept(self))
+
+    def visit_variable_expr(self, expr):
+        if self.standalone and expr.slot is None:
+            return ast.Subscript(
+                value=ast.Name(id="_globals", ctx=ast.Load()),
+                slice=ast.Constant(value=expr.name),
+                ctx=ast.Load(),
+            )
+        name, _ = self._lookup(expr)
+        return ast.Name(id=name, ctx=ast.Load())
+
+    def visit_assignment_expr(self, expr):
+        value = expr.value.accept(self)
+        name = self._store_target(expr)
+        if name is None:
+            return self._call("_assign_global", ast.Constant(value=expr.name), value)
+        return ast.NamedExpr(target=ast.Name(id=name, ctx=ast.Store()), value=value)
+
+    def visit_call_expr(self, expr):
+        if self.standalone:
+            return self._call("_call", expr.callee.accept(self), *[argument.accept(self) for argument in expr.arguments])
+        return ast.Call(
+            func=expr.callee.accept(self),
+            args=[argument.accept(self) for argument in expr.arguments],
+            keywords=[],
+        )
+
+    # --- Statements ---
+
+    def visit_expression_stmt(self, stmt):
+        return self._expression_statement(stmt.expression)
+
+    def _expression_statement(self, expression):
+        if type(expression) is Assignment:
+            # Como statement, a atribuição não precisa do valor de volta
+            value = expression.value.accept(self)
+            name = self._store_target(expression)
+            if name is not None:
+                return [ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=value)]
+            return [ast.Expr(value=self._call("_assign_global", ast.Constant(value=expression.name), value))]
+        return [ast.Expr(value=expression.accept(self))]
+
+    def visit_print_stmt(self, stmt):
+        return [ast.Expr(value=self._call("print", self._call("_str", stmt.expression.accept(self))))]
+
+    def visit_var_declaration_stmt(self, stmt):
+        if stmt.initializer is not None:
+            value = stmt.initializer.accept(self)
+        else:
+            value = ast.Constant(value=None)
+        name = self._declare(stmt.slot, stmt.name)
+        return [ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=value)]
+
+    def visit_block_stmt(self, stmt):
+        # Os nomes Python são únicos, então o bloco não precisa de escopo próprio
+        self.scopes.append(({}, self.function))
+        try:
+            body = []
+            for statement in stmt.statements:
+                body.extend(statement.accept(self))
+            return body
+        finally:
+            self.scopes.pop()
+
+    def visit_if_stmt(self, stmt):
+        orelse = self._body(stmt.else_branch) if stmt.else_branch else []
+        return [ast.If(test=self._condition(stmt.condition), body=self._body(stmt.then_branch), orelse=orelse)]
+
+    def visit_while_stmt(self, stmt):
+        function = self.function
+        in_loop = function.in_loop
+        function.in_loop = True
+        try:
+            return [ast.While(test=self._condition(stmt.condition), body=self._body(stmt.body), orelse=[])]
+        finally:
+            function.in_loop = in_loop
+
+    def visit_for_stmt(self, stmt):
+        function = self.function
+        in_loop = function.in_loop
+        self.scopes.append(({}, function))
+        try:
+            body = stmt.init.accept(self) if stmt.init is not None else []
+            function.in_loop = True
+            loop = self._body(stmt.body)
+            if stmt.increment is not None:
+                loop = loop + self._expression_statement(stmt.increment)
+            body.append(ast.While(test=self._condition(stmt.condition), body=loop, orelse=[]))
+            return body
+        finally:
+            function.in_loop = in_loop
+            self.scopes.pop()
+
+    def visit_function_declaration_stmt(self, stmt):
+        if self.standalone:
+            # A closure seria uma função Python, não um valor da SimpleLang
+            raise NotTranspilable("função aninhada")
+        if self.function.in_loop:
+            # Cada iteração da SimpleLang tem seu ambiente; uma closure
+            # criada no laço veria as variáveis compartilhadas do Python
+            raise NotTranspilable("função declarada dentro de um laço")
+        if stmt.slot_count is None:
+            raise NotTranspilable("declaração não resolvida")
+
+        name = self._declare(stmt.slot, stmt.name)
+        decorator = self._call(
+            "_function", ast.Constant(value=stmt.name), ast.Constant(value=stmt.pure), ast.Constant(value=name)
+        )
+        return [self._function_def(stmt, name, [decorator])]
+
+    def _function_def(self, stmt, name, decorators):
+        enclosing = self.function
+        self.function = _Function()
+        parameters = {slot: self._new_name() for slot in range(len(stmt.parameters))}
+        self.scopes.append((parameters, self.function))
+        try:
+            body = []
+            for statement in stmt.body.statements:
+                body.extend(statement.accept(self))
+            function = self.function
+        finally:
+            self.scopes.pop()
+            self.function = enclosing
+
+        declarations = []
+        if function.globals:
+            declarations.append(ast.Global(names=sorted(function.globals)))
+        if function.nonlocals:
+            declarations.append(ast.Nonlocal(names=sorted(function.nonlocals)))
+        definition = ast.FunctionDef(
+            name=name,
+            args=ast.arguments(
+                posonlyargs=[],
+                args=[ast.arg(arg=parameters[slot]) for slot in range(len(stmt.parameters))],
+                kwonlyargs=[], kw_defaults=[], defaults=[],
+            ),
+            body=declarations + (body or [ast.Pass()]),
+            decorator_list=decorators,
+            returns=None,
+        )
+        if "type_params" in ast.FunctionDef._fields:
+            # Python 3.12+
+            definition.type_params = []
+        return definition
+
+    def visit_return_stmt(self, stmt):
+        value = stmt.value.accept(self) if stmt.value is not None else ast.Constant(value=None)
+        return [ast.Return(value=value)]
+
+
+def transpile(statements):
+    """
+    Função utilitária para traduzir um programa para um módulo Python.
+
+    Args:
+        statements (list): Lista de statements da AST
+
+    Returns:
+        ast.Module: Módulo pronto para `compile()`
+
+    Raises:
+        NotTranspilable: Se o programa não puder ser traduzido
+    """
+    Resolver().resolve(statements)
+    return PythonTranspiler().transpile(statements)
+
+
+def compile_function(declaration, namespace):
+    """
+    Compila uma função isolada para uma função Python.
+
+    A função não pode capturar variáveis locais de fora nem declarar outras
+    funções. Globais e chamadas usam os auxiliares `_globals` e `_call` de
+    `namespace`, além dos auxiliares de operadores.
+
+    Args:
+        declaration (FunctionDeclaration): Declaração já resolvida
+        namespace (dict): Globais do código gerado
+
+    Returns:
+        A função compilada, ou False se a declaração não puder ser traduzida
+    """
+    if declaration.slot_count is None:
+        return False
+    try:
+        definition = PythonTranspiler(standalone=True)._function_def(declaration, "_compiled", [])
+    except NotTranspilable:
+        return False
+    module = ast.fix_missing_locations(ast.Module(body=[definition], type_ignores=[]))
+    exec(compile(module, f"<função {declaration.name}>", "exec"), namespace)
+    return namespace.pop("_compiled")
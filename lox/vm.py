@@ -0,0 +1,275 @@
+"""
+Máquina virtual de bytecode para SimpleLang.
+
+Executa o código gerado por lox/compiler.py num único laço que lê o opcode
+e o argumento da instrução da vez, sem percorrer a AST durante a execução.
+As instruções mais comuns são tratadas no próprio laço; as demais são
+despachadas por índice numa lista de handlers.
+"""
+
+from .node import *
+from .ctx import SimpleLangFunction, SimpleLangCallable, Environment, _SENTINEL
+from .compiler import Compiler, OpCode
+from .runtime import Interpreter
+from .errors import SimpleLangRuntimeError, SimpleLangTypeError, SimpleLangArityError
+
+
+# Opcodes tratados direto no laço de VM.run, como ints simples (comparar
+# com um membro de IntEnum é mais lento)
+_LOAD_CONST = int(OpCode.LOAD_CONST)
+_LOAD_LOCAL = int(OpCode.LOAD_LOCAL)
+_LOAD_GLOBAL = int(OpCode.LOAD_GLOBAL)
+_STORE_LOCAL = int(OpCode.STORE_LOCAL)
+_STORE_GLOBAL = int(OpCode.STORE_GLOBAL)
+_DEFINE_LOCAL = int(OpCode.DEFINE_LOCAL)
+_POP = int(OpCode.POP)
+_JUMP = int(OpCode.JUMP)
+_JUMP_IF_FALSE = int(OpCode.JUMP_IF_FALSE)
+_JUMP_IF_FALSE_OR_POP = int(OpCode.JUMP_IF_FALSE_OR_POP)
+_JUMP_IF_TRUE_OR_POP = int(OpCode.JUMP_IF_TRUE_OR_POP)
+_BEGIN_SCOPE = int(OpCode.BEGIN_SCOPE)
+_END_SCOPE = int(OpCode.END_SCOPE)
+_RETURN = int(OpCode.RETURN)
+_ADD = int(OpCode.ADD)
+_SUB = int(OpCode.SUB)
+_LT = int(OpCode.LT)
+_LE = int(OpCode.LE)
+_GT = int(OpCode.GT)
+_GE = int(OpCode.GE)
+
+
+class Frame:
+    """
+    Estado de um Chunk em execução visto pelos handlers: pilha de operandos
+    e ambiente atual. A posição (pc) fica numa variável local de VM.run.
+    """
+
+    __slots__ = ("consts", "stack", "environment")
+
+    def __init__(self, chunk, environment):
+        self.consts = chunk.consts
+        self.stack = []
+        self.environment = environment
+
+
+class CompiledFunction(SimpleLangFunction):
+    """
+    Função SimpleLang cujo corpo foi compilado para bytecode.
+
+    Reaproveita a memoização e a interface de SimpleLangFunction; só a
+    execução do corpo muda.
+    """
+
+    __slots__ = ("chunk",)
+
+    def __init__(self, chunk, closure: Environment, memoize=False):
+        """
+        Args:
+            chunk: Chunk com o corpo compilado (e a declaração de origem)
+            closure: Ambiente onde a função foi declarada (closure)
+            memoize (bool): Memoiza mesmo sem a função ser pura
+        """
+        super().__init__(chunk.declaration, closure, memoize)
+        self.chunk = chunk
+
+    def _invoke(self, interpreter, arguments):
+        """Executa o corpo compilado, sem consultar a memoização."""
+        if len(arguments) != self.arity_value:
+            raise SimpleLangArityError(self.name, self.arity_value, len(arguments))
+
+        if interpreter.jit:
+            value = self._run_kernel(interpreter, arguments)
+            if value is not _SENTINEL:
+                return value
+
+        # O parâmetro i ocupa o slot i
+        environment = Environment(self.closure, self.declaration.slot_count)
+        environment.slots[:len(arguments)] = arguments
+        return interpreter.run(self.chunk, environment)
+
+
+class VM(Interpreter):
+    """
+    Executa programas SimpleLang compilados para bytecode.
+
+    Herda do Interpreter as regras de operadores, veracidade e formatação,
+    de modo que os dois modos de execução se comportam da mesma forma.
+    """
+
+    def __init__(self, memoize=True, jit=True, output=None):
+        """
+        Inicializa a VM e monta a tabela de handlers indexada por OpCode.
+
+        Args:
+            memoize (bool | Iterable[str]): Reaproveita resultados de funções
+                puras (e das funções com esses nomes; ver Interpreter)
+            jit (bool): Executa funções numéricas compiladas por lox.jit
+            output: Arquivo onde `print` escreve (None: o sys.stdout atual)
+        """
+        super().__init__(memoize, jit, output)
+        # Handlers das instruções que o laço de `run` não trata diretamente
+        # (None nas posições tratadas no laço)
+        self._handlers = [getattr(self, "_op_" + opcode.name.lower(), None) for opcode in OpCode]
+
+    def interpret(self, statements):
+        """
+        Compila e executa uma lista de statements.
+
+        Args:
+            statements (list): Lista de nós AST (statements)
+        """
+        chunk = Compiler().compile(statements)
+        self.run(chunk, self.context.environment)
+
+    def run(self, chunk, environment):
+        """
+        Executa um Chunk até a instrução RETURN.
+
+        As instruções mais frequentes (constantes, variáveis, saltos, escopos
+        e aritmética entre inteiros) são tratadas no próprio laço; as demais
+        vão para a tabela de handlers.
+
+        Args:
+            chunk: Código a executar
+            environment: Ambiente inicial da execução
+
+        Returns:
+            O valor retornado pelo Chunk
+        """
+        frame = Frame(chunk, environment)
+        ops = chunk.ops
+        args = chunk.args
+        consts = chunk.consts
+        stack = frame.stack
+        push = stack.append
+        pop = stack.pop
+        handlers = self._handlers
+        binary = self._binary_handlers
+        globals_ = self.context.globals
+        global_values = globals_.values
+        env = environment
+        pc = 0
+        # Os testes seguem a frequência típica das instruções
+        while True:
+            op = ops[pc]
+            arg = args[pc]
+            pc += 1
+            if op <= _LE:
+                right = pop()
+                left = stack[-1]
+                if type(left) is int and type(right) is int:
+                    if op == _ADD:
+                        stack[-1] = left + right
+                        continue
+                    if op == _SUB:
+                        stack[-1] = left - right
+                        continue
+                    if op == _LT:
+                        stack[-1] = left < right
+                        continue
+                    if op == _LE:
+                        stack[-1] = left <= right
+                        continue
+                    if op == _GT:
+                        stack[-1] = left > right
+                        continue
+                    if op == _GE:
+                        stack[-1] = left >= right
+                        continue
+                stack[-1] = binary[op](left, right)
+            elif op == _LOAD_CONST:
+                push(consts[arg])
+            elif op == _LOAD_LOCAL:
+                depth, slot = arg
+                target = env
+                while depth:
+                    target = target.enclosing
+                    depth -= 1
+                push(target.slots[slot])
+            elif op == _LOAD_GLOBAL:
+                if arg in global_values:
+                    push(global_values[arg])
+                else:
+                    # Levanta o erro de variável indefinida
+                    push(globals_.get(arg))
+            elif op == _POP:
+                pop()
+            elif op == _STORE_LOCAL:
+                # Atribuição é uma expressão: o valor continua na pilha
+                depth, slot = arg
+                target = env
+                while depth:
+                    target = target.enclosing
+                    depth -= 1
+                target.slots[slot] = stack[-1]
+            elif op == _STORE_GLOBAL:
+                if arg in global_values:
+                    global_values[arg] = stack[-1]
+                else:
+                    globals_.assign(arg, stack[-1])
+            elif op == _JUMP_IF_FALSE:
+                # Veracidade da SimpleLang = do Python (ver Interpreter._is_truthy)
+                if not pop():
+                    pc = arg
+            elif op == _JUMP:
+                pc = arg
+            elif op == _BEGIN_SCOPE:
+                env = frame.environment = Environment(env, arg)
+            elif op == _END_SCOPE:
+                env = frame.environment = env.enclosing
+            elif op == _DEFINE_LOCAL:
+                env.slots[arg] = pop()
+            elif op == _JUMP_IF_FALSE_OR_POP:
+                # O topo já é booleano (BOOL); mantém-no se saltar
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = arg
+            elif op == _JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == _RETURN:
+                return pop()
+            else:
+                handlers[op](arg, frame)
+
+    # --- Handlers ---
+
+    def _op_define_global(self, arg, frame):
+        self.context.globals.values[arg] = frame.stack.pop()
+
+    def _op_negate(self, arg, frame):
+        stack = frame.stack
+        right = stack[-1]
+        if not isinstance(right, (int, float)):
+            raise SimpleLangTypeError(f"Operação inválida: -{self._stringify(right)}")
+        stack[-1] = -right
+
+    def _op_not(self, arg, frame):
+        stack = frame.stack
+        stack[-1] = not stack[-1]
+
+    def _op_bool(self, arg, frame):
+        stack = frame.stack
+        stack[-1] = bool(stack[-1])
+
+    def _op_function(self, arg, frame):
+        chunk = frame.consts[arg]
+        frame.stack.append(CompiledFunction(chunk, frame.environment, chunk.name in self.memoize_names))
+
+    def _op_call(self, arg, frame):
+        stack = frame.stack
+        if arg:
+            arguments = stack[-arg:]
+            del stack[-arg:]
+        else:
+            arguments = []
+        callee = stack.pop()
+        if not isinstance(callee, SimpleLangCallable):
+            raise SimpleLangRuntimeError(f"Não é possível chamar: {self._stringify(callee)}")
+        stack.append(callee.call(self, arguments))
+
+    def _op_print(self, arg, frame):
+        print(self._stringify(frame.stack.pop()), file=self.output)
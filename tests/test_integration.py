@@ -5,38 +5,82 @@ Estes testes verificam o funcionamento completo do compilador,
 desde o parsing até a execução, usando programas completos.
 """
 
-import unittest
 import sys
+import time
+from contextlib import redirect_stdout
 from io import StringIO
 from pathlib import Path
 
+import pytest
+
 # Adiciona o diretório pai ao path para importar o módulo lox
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from lox.parser import Parser
-from lox.transformer import transform_to_ast
+from lox.testing_utils import capture_output
 from lox.runtime import Interpreter
 from lox.errors import SimpleLangError
 
 
-class TestSimpleLangIntegration(unittest.TestCase):
+# Prelúdio comum a vários testes; capture_output analisa cada trecho à parte,
+# então a AST da função é reaproveitada entre eles
+REPEAT_STRING = """
+fun repeat_string(str, times) {
+    var result = "";
+    var i = 0;
+    while (i < times) {
+        result = result + str;
+        i = i + 1;
+    }
+    return result;
+}
+"""
+
+
+# Saídas esperadas dos programas de TestSimpleLangIntegration, uma linha por
+# item, reunidas aqui para facilitar a atualização
+CALCULATOR_PROGRAM_OUTPUT = ["Soma: 7", "Produto: 12", "Resultado final: 19"]
+
+FIBONACCI_ITERATIVE_OUTPUT = [
+    "fib(0) = 0",
+    "fib(1) = 1",
+    "fib(2) = 1",
+    "fib(3) = 2",
+    "fib(4) = 3",
+    "fib(5) = 5",
+]
+
+FACTORIAL_PROGRAM_OUTPUT = ["0! = 1", "1! = 1", "3! = 6", "5! = 120"]
+
+SCOPE_AND_CLOSURES_OUTPUT = ["global", "outer", "inner", "Back in outer", "Back in global"]
+
+CONTROL_FLOW_COMPLEX_OUTPUT = [
+    "5 é positivo e ímpar",
+    "-4 é negativo e par",
+    "0 é zero",
+    "8 é positivo e par",
+    "-3 é negativo e ímpar",
+]
+
+STRING_MANIPULATION_OUTPUT = ["Olá, Dr. Silva!", "Olá, Sra. Maria!", "HaHaHa", "Echo Echo "]
+
+RECURSIVE_FUNCTIONS_OUTPUT = ["GCD(48, 18) = 6", "GCD(100, 25) = 25", "2^10 = 1024", "3^4 = 81"]
+
+BOOLEAN_LOGIC_COMPLEX_OUTPUT = [
+    "Idade 25 válida: true",
+    "Idade -5 válida: false",
+    "Pode votar (20, true): true",
+    "Pode votar (16, true): false",
+    "Pode beber no BR (19): true",
+    "Pode beber nos EUA (19): false",
+]
+
+
+class TestSimpleLangIntegration:
     """Testes de integração para programas completos em SimpleLang."""
 
-    def setUp(self):
-        self.parser = Parser()
-        self.interpreter = Interpreter()
-
-    def _run_program(self, code):
-        """Executa um programa SimpleLang e retorna a saída."""
-        old_stdout = sys.stdout
-        sys.stdout = captured_output = StringIO()
-        try:
-            tree = self.parser.parse(code)
-            ast = transform_to_ast(tree)
-            self.interpreter.interpret(ast)
-            return captured_output.getvalue().strip()
-        finally:
-            sys.stdout = old_stdout
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, interpreter):
+        self.interpreter = interpreter
 
     def test_calculator_program(self):
         """Testa um programa calculadora simples."""
@@ -60,9 +104,8 @@ class TestSimpleLangIntegration(unittest.TestCase):
         var result = calculate(3, 4);
         print "Resultado final: " + result;
         """
-        output = self._run_program(code)
-        expected = "Soma: 7\nProduto: 12\nResultado final: 19"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == CALCULATOR_PROGRAM_OUTPUT
 
     def test_fibonacci_iterative(self):
         """Testa implementação iterativa de Fibonacci."""
@@ -92,10 +135,10 @@ class TestSimpleLangIntegration(unittest.TestCase):
             i = i + 1;
         }
         """
-        output = self._run_program(code)
-        expected = "fib(0) = 0\nfib(1) = 1\nfib(2) = 1\nfib(3) = 2\nfib(4) = 3\nfib(5) = 5"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == FIBONACCI_ITERATIVE_OUTPUT
 
+    @pytest.mark.hot
     def test_factorial_program(self):
         """Testa programa de cálculo de fatorial."""
         code = """
@@ -116,9 +159,8 @@ class TestSimpleLangIntegration(unittest.TestCase):
         print_factorial(3);
         print_factorial(5);
         """
-        output = self._run_program(code)
-        expected = "0! = 1\n1! = 1\n3! = 6\n5! = 120"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == FACTORIAL_PROGRAM_OUTPUT
 
     def test_scope_and_closures(self):
         """Testa escopo de variáveis e closures."""
@@ -142,9 +184,8 @@ class TestSimpleLangIntegration(unittest.TestCase):
         outer();
         print "Back in global";
         """
-        output = self._run_program(code)
-        expected = "global\nouter\ninner\nBack in outer\nBack in global"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == SCOPE_AND_CLOSURES_OUTPUT
 
     def test_control_flow_complex(self):
         """Testa estruturas de controle complexas."""
@@ -180,9 +221,8 @@ class TestSimpleLangIntegration(unittest.TestCase):
             i = i + 1;
         }
         """
-        output = self._run_program(code)
-        expected = "5 é positivo e ímpar\n-4 é negativo e par\n0 é zero\n8 é positivo e par\n-3 é negativo e ímpar"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == CONTROL_FLOW_COMPLEX_OUTPUT
 
     def test_string_manipulation(self):
         """Testa manipulação de strings."""
@@ -191,25 +231,27 @@ class TestSimpleLangIntegration(unittest.TestCase):
             return "Olá, " + title + " " + name + "!";
         }
         
-        fun repeat_string(str, times) {
-            var result = "";
-            var i = 0;
-            while (i < times) {
-                result = result + str;
-                i = i + 1;
-            }
-            return result;
-        }
-        
         print greet("Silva", "Dr.");
         print greet("Maria", "Sra.");
         print repeat_string("Ha", 3);
         print repeat_string("Echo ", 2);
         """
-        output = self._run_program(code)
-        expected = "Olá, Dr. Silva!\nOlá, Sra. Maria!\nHaHaHa\nEcho Echo "
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, REPEAT_STRING, code)
+        assert output.splitlines() == STRING_MANIPULATION_OUTPUT
+
+    @pytest.mark.parametrize("times", [3, 1000])
+    def test_repeat_string(self, times):
+        """Concatenação repetida em laço: guarda contra regressões de desempenho."""
+        code = f'print repeat_string("Ha", {times});'
+        start = time.perf_counter()
+        output = capture_output(self.interpreter, REPEAT_STRING, code)
+        elapsed = time.perf_counter() - start
+        assert output == "Ha" * times
+        # Não é um benchmark: o limite é folgado e só pega uma piora grosseira,
+        # como a concatenação passar a ser quadrática no interpretador
+        assert elapsed < 1.0
 
+    @pytest.mark.hot
     def test_recursive_functions(self):
         """Testa funções recursivas complexas."""
         code = """
@@ -240,9 +282,8 @@ class TestSimpleLangIntegration(unittest.TestCase):
         print "2^10 = " + power(2, 10);
         print "3^4 = " + power(3, 4);
         """
-        output = self._run_program(code)
-        expected = "GCD(48, 18) = 6\nGCD(100, 25) = 25\n2^10 = 1024\n3^4 = 81"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == RECURSIVE_FUNCTIONS_OUTPUT
 
     def test_boolean_logic_complex(self):
         """Testa lógica booleana complexa."""
@@ -270,44 +311,79 @@ class TestSimpleLangIntegration(unittest.TestCase):
         print "Pode beber no BR (19): " + can_drink(19, "BR");
         print "Pode beber nos EUA (19): " + can_drink(19, "US");
         """
-        output = self._run_program(code)
-        expected = "Idade 25 válida: true\nIdade -5 válida: false\nPode votar (20, true): true\nPode votar (16, true): false\nPode beber no BR (19): true\nPode beber nos EUA (19): false"
-        self.assertEqual(output, expected)
+        output = capture_output(self.interpreter, code)
+        assert output.splitlines() == BOOLEAN_LOGIC_COMPLEX_OUTPUT
+
+
+# Programas que o lote pula: test_control_flow_complex usa um literal de
+# lista ([5, -4, ...]), que a gramática ainda não reconhece
+BATCH_SKIP = {"test_control_flow_complex"}
+
+
+class TestBatch:
+    """Executa os programas de TestSimpleLangIntegration em sequência."""
+
+    def test_batch(self):
+        """
+        Roda todos os testes sem parâmetros da classe com um único
+        Interpreter, zerado com `reset` entre um programa e outro (os
+        testes individuais continuam disponíveis para depuração).
+        """
+        interpreter = Interpreter()
+        suite = TestSimpleLangIntegration()
+        suite.interpreter = interpreter
+        failures = []
+        for name, method in vars(TestSimpleLangIntegration).items():
+            if not name.startswith("test_") or method.__code__.co_argcount > 1:
+                continue
+            if name in BATCH_SKIP:
+                continue
+            interpreter.reset()
+            try:
+                method(suite)
+            except Exception as error:
+                failures.append(f"{name}: {type(error).__name__}: {error}")
+        assert not failures, failures
 
 
-class TestSimpleLangFileExecution(unittest.TestCase):
+class TestSimpleLangFileExecution:
     """Testa a execução de arquivos SimpleLang."""
 
-    def setUp(self):
-        self.examples_dir = Path(__file__).parent.parent / "examples"
+    examples_dir = Path(__file__).parent.parent / "examples"
+
+    @classmethod
+    def setup_class(cls):
+        # Os exemplos são lidos uma vez; os testes executam o código pelo
+        # mesmo caminho com cache de AST dos demais testes
+        cls.sources = {path.name: path.read_text(encoding="utf-8") for path in cls.examples_dir.glob("*.sl")}
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, interpreter):
+        self.interpreter = interpreter
+
+    def _run_example(self, name):
+        if name not in self.sources:
+            pytest.skip(f"exemplo {name} não encontrado")
+        return capture_output(self.interpreter, self.sources[name])
 
     def test_hello_world_file(self):
         """Testa execução do arquivo hello_world.sl."""
-        if (self.examples_dir / "hello_world.sl").exists():
-            from lox.cli import run_file
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = StringIO()
-            try:
-                run_file(self.examples_dir / "hello_world.sl")
-                output = captured_output.getvalue().strip()
-                self.assertEqual(output, "Hello, World!")
-            finally:
-                sys.stdout = old_stdout
+        assert self._run_example("hello_world.sl") == "Hello, World!"
 
     def test_if_else_file(self):
         """Testa execução do arquivo if_else.sl."""
-        if (self.examples_dir / "if_else.sl").exists():
-            from lox.cli import run_file
-            old_stdout = sys.stdout
-            sys.stdout = captured_output = StringIO()
-            try:
-                run_file(self.examples_dir / "if_else.sl")
-                output = captured_output.getvalue().strip()
-                self.assertEqual(output, "x é menor que y")
-            finally:
-                sys.stdout = old_stdout
+        assert self._run_example("if_else.sl") == "x é menor que y"
+
+    def test_run_file(self):
+        """Testa a leitura e execução de um arquivo pelo `run_file` da CLI."""
+        if "hello_world.sl" not in self.sources:
+            pytest.skip("exemplo hello_world.sl não encontrado")
+        from lox.cli import run_file
+        with redirect_stdout(StringIO()) as captured_output:
+            run_file(self.examples_dir / "hello_world.sl")
+        assert captured_output.getvalue().strip() == "Hello, World!"
 
 
 if __name__ == "__main__":
-    unittest.main(verbosity=2)
+    sys.exit(pytest.main([__file__, "-v"]))
 